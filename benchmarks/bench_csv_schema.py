@@ -0,0 +1,55 @@
+"""
+Compare a bare pd.read_csv of the combined submission log with the schema-driven
+loader (utils.submission_schema.read_submission_csv): read time, column count
+and in-memory footprint. --scale repeats the log's rows to show how the gap grows.
+
+Run from the project root:
+    python -m benchmarks.bench_csv_schema [--scale 1 10 50] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from utils.submission_schema import read_submission_csv
+
+COMBINED_LOG = os.path.join('data', 'combined_submission_log.csv')
+
+
+def measure(loader, path, repeat):
+    """Best-of-N read seconds plus the resulting frame's column count and deep size in MB"""
+    best = None
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = loader(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(df.columns), df.memory_usage(deep=True).sum() / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    base = pd.read_csv(COMBINED_LOG)
+    print(f"{'rows':>8} {'loader':<8} {'seconds':>8} {'columns':>8} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scale:
+            path = os.path.join(tmp, f"combined_x{scale}.csv")
+            pd.concat([base] * scale, ignore_index=True).to_csv(path, index=False)
+            rows = len(base) * scale
+            results = {}
+            for label, loader in (('bare', pd.read_csv), ('schema', read_submission_csv)):
+                seconds, columns, mb = measure(loader, path, args.repeat)
+                results[label] = mb
+                print(f"{rows:>8} {label:<8} {seconds:>8.3f} {columns:>8} {mb:>8.1f}")
+            print(f"{'':>8} schema frame is {100 * (1 - results['schema'] / results['bare']):.0f}% smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare the Excel engines available to the loaders on the master submission
+log and on a synthetic 50-sheet workbook.
+
+Run from the project root:
+    python -m benchmarks.bench_excel_engines [--repeat 3] [--sheets 50] [--rows 120]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import warnings
+from datetime import date, timedelta
+
+from utils.excel_ingest import available_engines, read_excel_sheets
+
+MASTER_LOG = os.path.join('data', 'EvolutionMasterSubmissionLog061325.xlsx')
+
+CARRIERS = [
+    'AmTrust', 'Atlas', 'Attune', 'Bristol West', 'Chubb', 'CNA', 'Employers', 'Guard',
+    'Hanover', 'Hartford', 'Hourly', 'ICW', 'KBIC', 'Kemper', 'Liberty Mutual',
+    'Markel', 'Nationwide', 'Philadelphia', 'Preferred', 'Stillwater', 'Travelers', 'UFG', 'Other'
+]
+HEADER = (['Applicant', 'Member', 'EFF DATE', 'LOB', 'SEMSEE', 'Quoted/Bound $',
+           'Policy Number', 'Bound With', 'NOTES'] + CARRIERS + ['Desc of Ops', 'WC Class Code'])
+LOBS = ['BOP', 'Pkg', 'WC', 'BA', 'GL', 'Umb', 'pkg', 'wc']
+CARRIER_TEXT = ['decl', 'declined', 'x', 'blocked', 'submitted', '-']
+
+
+def build_synthetic_workbook(path, sheets, rows, seed=42):
+    """Write a workbook shaped like the master log: one sheet per month"""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    start = date(2020, 1, 1)
+    for index in range(sheets):
+        sheet = workbook.create_sheet(f"Month {index + 1}")
+        sheet.append(HEADER)
+        for row in range(rows):
+            carriers = []
+            for _ in CARRIERS:
+                roll = rng.random()
+                if roll < 0.15:
+                    carriers.append(rng.randint(800, 40000))
+                elif roll < 0.25:
+                    carriers.append(rng.choice(CARRIER_TEXT))
+                else:
+                    carriers.append(None)
+            sheet.append([
+                f"Applicant {index}-{row} LLC",
+                rng.choice(['Buckley', 'Blue Moon', 'Pacific', 'Harbor']),
+                start + timedelta(days=30 * index + rng.randint(0, 29)),
+                rng.choice(LOBS),
+                None,
+                rng.choice([None, rng.randint(500, 20000)]),
+                None,
+                rng.choice([None, None, None, rng.choice(CARRIERS)]),
+                rng.choice(['desk decline', 'BOR', 'bound with LM', None]),
+            ] + carriers + [
+                rng.choice(['restaurant', 'plumbing contractor', 'medical office', 'retail store']),
+                rng.choice([None, 8810, 5183, '5467, 5470']),
+            ])
+    workbook.save(path)
+
+
+def time_engine(path, engine, repeat):
+    """Best-of-N seconds to open the workbook and parse every sheet serially"""
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results, _ = read_excel_sheets(path, max_workers=1, engine=engine)
+        elapsed = time.perf_counter() - start
+        rows = sum(len(result.frame) for result in results if result.frame is not None)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sheets', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=120)
+    args = parser.parse_args()
+
+    # openpyxl warns about unsupported data-validation extensions in the master log
+    warnings.simplefilter('ignore')
+
+    engines = available_engines()
+    print(f"Installed engines: {', '.join(engines)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic = os.path.join(tmp, 'synthetic.xlsx')
+        build_synthetic_workbook(synthetic, args.sheets, args.rows)
+
+        workbooks = [(f"synthetic ({args.sheets} sheets x {args.rows} rows)", synthetic)]
+        if os.path.exists(MASTER_LOG):
+            workbooks.insert(0, ('master submission log', MASTER_LOG))
+
+        for label, path in workbooks:
+            print(f"\n{label}: {os.path.getsize(path) / 1024:.0f} KB")
+            timings = {}
+            for engine in engines:
+                seconds, rows = time_engine(path, engine, args.repeat)
+                timings[engine] = seconds
+                print(f"  {engine:<10} {seconds:8.3f}s  {rows:7d} rows")
+            for engine, seconds in timings.items():
+                if engine != 'openpyxl' and 'openpyxl' in timings:
+                    print(f"  {engine} speed-up vs openpyxl: {timings['openpyxl'] / seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
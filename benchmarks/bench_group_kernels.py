@@ -0,0 +1,114 @@
+"""
+Compare the pandas idioms the analysis functions used for counts and sums
+over categorical keys (value_counts, groupby().size(), per-value boolean
+filters, Python dict accumulation, groupby sum/mean/nunique) with the numpy
+kernels in utils.group_kernels. Rows are sampled from the combined submission
+log: its LOB, Source_Sheet and month labels and the premiums of the first
+carrier columns.
+
+Run from the project root:
+    python -m benchmarks.bench_group_kernels [--rows 10000 1000000 10000000] [--repeat 3]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.carrier_quotes import CarrierMatrix
+from utils.group_kernels import encode_keys, group_counts, group_distinct, group_means, group_sums, top_k
+
+COMBINED_LOG = os.path.join('data', 'combined_submission_log.csv')
+CARRIERS = ['AmTrust', 'Chubb', 'CNA', 'Employers', 'Guard', 'Hanover', 'Hartford', 'Travelers']
+
+
+def sample_frame(base, premium, rows, rng):
+    """rows submissions drawn from the log, with categorical keys and carrier premium columns"""
+    picks = rng.integers(0, len(base), size=rows)
+    df = pd.DataFrame({col: pd.Categorical(base[col].to_numpy()[picks])
+                       for col in ('LOB', 'Source_Sheet', 'Month_Year')})
+    for j, carrier in enumerate(CARRIERS):
+        df[carrier] = premium[picks, j]
+    return df
+
+
+def dict_counts(values):
+    """Python dict accumulation, one row at a time"""
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return sorted(counts.items(), key=lambda x: x[1], reverse=True)
+
+
+def per_lob_responses(df):
+    """One boolean filter per LOB, then per-carrier response counts"""
+    return {lob: df.loc[df['LOB'] == lob, CARRIERS].notna().sum() for lob in df['LOB'].cat.categories}
+
+
+def tasks(df):
+    """(name, pandas idiom, kernel) pairs computing the same result"""
+    lob = df['LOB'].cat.codes.to_numpy()
+    sheet = df['Source_Sheet'].cat.codes.to_numpy()
+    month = df['Month_Year'].cat.codes.to_numpy()
+    n_lobs = len(df['LOB'].cat.categories)
+    n_sheets = len(df['Source_Sheet'].cat.categories)
+    n_months = len(df['Month_Year'].cat.categories)
+    premium = df[CARRIERS[0]].to_numpy()
+
+    def lob_by_sheet():
+        keys, n_keys = encode_keys([lob, sheet], [n_lobs, n_sheets])
+        return group_counts(keys, n_keys).reshape(n_lobs, n_sheets)
+
+    return [
+        ('LOB counts, value_counts', lambda: df['LOB'].value_counts(),
+         lambda: top_k(group_counts(lob, n_lobs))),
+        ('LOB counts, dict loop', lambda: dict_counts(df['LOB']),
+         lambda: top_k(group_counts(lob, n_lobs))),
+        ('LOB x sheet, groupby.size', lambda: df.groupby(['LOB', 'Source_Sheet'], observed=True).size(),
+         lob_by_sheet),
+        ('monthly trend, groupby.size', lambda: df.groupby('Month_Year', observed=True).size(),
+         lambda: group_counts(month, n_months)),
+        ('LOB x carrier, per-LOB filter', lambda: per_lob_responses(df),
+         lambda: group_sums(lob, df[CARRIERS].notna().to_numpy(), n_lobs)),
+        ('premium sum+mean, groupby', lambda: df.groupby('LOB', observed=True)[CARRIERS[0]].agg(['sum', 'mean']),
+         lambda: (group_sums(lob, premium, n_lobs), group_means(lob, premium, n_lobs))),
+        ('sheets per LOB, nunique', lambda: df.groupby('LOB', observed=True)['Source_Sheet'].nunique(),
+         lambda: group_distinct(lob, sheet, n_lobs)),
+    ]
+
+
+def timed(func, repeat):
+    """Best-of-N seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    base = pd.read_csv(COMBINED_LOG, usecols=['LOB', 'Source_Sheet', 'RCVD'] + CARRIERS, low_memory=False)
+    base['Month_Year'] = pd.to_datetime(base['RCVD'], errors='coerce').dt.strftime('%Y-%m')
+    premium = CarrierMatrix.from_frame(base, CARRIERS).premium
+    rng = np.random.default_rng(42)
+
+    print(f"{'rows':>10} {'task':<30} {'pandas s':>9} {'kernel s':>9} {'speed-up':>9}")
+    for rows in args.rows:
+        df = sample_frame(base, premium, rows, rng)
+        for name, idiom, kernel in tasks(df):
+            pandas_s = timed(idiom, args.repeat)
+            kernel_s = timed(kernel, args.repeat)
+            print(f"{rows:>10} {name:<30} {pandas_s:>9.4f} {kernel_s:>9.4f} {pandas_s / kernel_s:>8.1f}x")
+        del df
+
+
+if __name__ == "__main__":
+    main()
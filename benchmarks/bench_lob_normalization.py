@@ -0,0 +1,51 @@
+"""
+Compare the old per-row LOB apply with utils.lob_normalizer.normalize_lob as
+the number of rows grows. Rows are sampled from the LOB spellings in the
+combined submission log.
+
+Run from the project root:
+    python -m benchmarks.bench_lob_normalization [--rows 10000 1000000 5000000]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.lob_normalizer import LOB_MAPPING, normalize_lob
+
+COMBINED_LOG = os.path.join('data', 'combined_submission_log.csv')
+
+
+def apply_per_row(values):
+    """The per-row normalization process_data used before normalize_lob"""
+    values = values.fillna('Unknown').astype(str)
+    values = values.apply(lambda x: LOB_MAPPING.get(x.strip().casefold(), x.strip()))
+    return values.where(values != 'nan', 'Unknown')
+
+
+def timed(func, values):
+    start = time.perf_counter()
+    func(values)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000, 5_000_000])
+    args = parser.parse_args()
+
+    spellings = pd.read_csv(COMBINED_LOG, usecols=['LOB'])['LOB'].to_numpy()
+    rng = np.random.default_rng(42)
+
+    print(f"{'rows':>10} {'apply s':>9} {'vectorized s':>13} {'speed-up':>9}")
+    for rows in args.rows:
+        values = pd.Series(rng.choice(spellings, size=rows))
+        per_row = timed(apply_per_row, values)
+        vectorized = timed(normalize_lob, values)
+        print(f"{rows:>10} {per_row:>9.3f} {vectorized:>13.3f} {per_row / vectorized:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
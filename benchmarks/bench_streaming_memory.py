@@ -0,0 +1,71 @@
+"""
+Compare peak memory of process_new_excel_data in frame mode and streaming
+mode as the workbook grows. Each run happens in a fresh process so its peak
+RSS is measured in isolation.
+
+Run from the project root (Linux/macOS):
+    python -m benchmarks.bench_streaming_memory [--sheets 10 50 100] [--rows 120]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_excel_engines import build_synthetic_workbook
+
+
+def _peak_rss_mb(usage):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss / scale
+
+
+def run_child(path, streaming):
+    """Process one workbook and print the row count and this process's peak RSS"""
+    import logging
+    import warnings
+
+    from utils.process_excel_data import process_new_excel_data
+
+    logging.disable(logging.INFO)
+    warnings.simplefilter('ignore')
+    df = process_new_excel_data(path, max_workers=1, engine='openpyxl', streaming=streaming)
+    rows = 0 if df is None else len(df)
+    print(f"{rows} {_peak_rss_mb(resource.getrusage(resource.RUSAGE_SELF)):.1f}")
+
+
+def measure(path, streaming):
+    mode = 'stream' if streaming else 'frame'
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_streaming_memory', '--child', mode, path],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return int(output[-2]), float(output[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sheets', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--rows', type=int, default=120)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        run_child(path, streaming=(mode == 'stream'))
+        return
+
+    print(f"{'sheets':>6} {'rows':>8} {'frame MB':>9} {'stream MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for sheets in args.sheets:
+            path = os.path.join(tmp, f"synthetic_{sheets}.xlsx")
+            build_synthetic_workbook(path, sheets, args.rows)
+            rows, frame_mb = measure(path, streaming=False)
+            _, stream_mb = measure(path, streaming=True)
+            print(f"{sheets:>6} {rows:>8} {frame_mb:>9.1f} {stream_mb:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
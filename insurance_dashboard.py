@@ -1,11 +1,26 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import logging
 import os
 
+from utils.batch_search import batch_search, read_keywords
+from utils.dataset import DatasetRegistry
+from utils.search_cache import SearchCache
+from utils.search_query import (
+    QuerySyntaxError, compile_query, narrow_with_fallback, refinement_terms, search_with_fallback
+)
+from utils.search_results import SearchResult
+from utils.sheet_cache import read_sheets_incremental
+from utils.snapshot_cache import content_sha256, file_sha256
+from utils.submission_pipeline import (
+    PIPELINE_VERSION, SHEET_NAMESPACE, load_processed_file, process_submissions, tag_source_sheet
+)
+from utils.submission_schema import read_submission_csv
+
 ## SECTION: Configuration and Setup
 ## Purpose: Initialize Streamlit page and configure logging
 st.set_page_config(
@@ -80,270 +95,193 @@ logger = logging.getLogger(__name__)
 
 ## SECTION: Constants
 ## Purpose: Define carrier names and other constants
-CARRIER_COLUMNS = [
-    'AmTrust', 'Atlas', 'Attune', 'Bristol West', 'Chubb', 'CNA', 'Employers', 'Guard',
-    'Hanover', 'Hartford', 'Hourly', 'ICW', 'KBIC', 'Kemper', 'Liberty Mutual',
-    'Markel', 'Nationwide', 'Philadelphia', 'Preferred', 'Stillwater', 'Travelers', 'UFG', 'Other'
-]
+# Carrier names come from the submission log schema (utils/submission_schema.py);
+# carrier cells are parsed once per dataset into premium/status arrays (utils/carrier_quotes.py)
+
+# PIPELINE_VERSION (utils/submission_pipeline.py) versions the processed frame;
+# it is part of every dataset id and snapshot path.
+
+# Submissions listed per line of business in the business search results
+MAX_LISTED_SUBMISSIONS = 50
 
 ## SECTION: Data Loading
 ## Purpose: Load and cache the data
-@st.cache_data
 def process_excel_file(file_input):
     """Process Excel file and return DataFrame. Works with both file paths and uploaded files."""
     try:
-        # Handle both string file paths and uploaded files
-        if isinstance(file_input, str):
-            xl = pd.ExcelFile(file_input)
-        else:
-            xl = pd.ExcelFile(file_input)
-            
+        # Only new or changed sheets are parsed (in parallel when the workbook is large
+        # enough); unchanged sheets come from their cached partitions
+        sheet_results, total_seconds = read_sheets_incremental(file_input, SHEET_NAMESPACE, tag_source_sheet)
+        
         # Print sheet names for debugging
-        st.write(f"Found sheets: {xl.sheet_names}")
+        st.write(f"Found sheets: {[result.name for result in sheet_results]}")
         
         all_data = []
-        for sheet in xl.sheet_names:
-            try:
-                df = pd.read_excel(xl, sheet_name=sheet)
-                df['Source_Sheet'] = sheet
-                st.write(f"Processed sheet {sheet} with {len(df)} rows")
-                all_data.append(df)
-            except Exception as sheet_error:
-                st.warning(f"Error processing sheet {sheet}: {str(sheet_error)}")
+        for result in sheet_results:
+            if result.error is not None:
+                st.warning(f"Error processing sheet {result.name}: {result.error}")
                 continue
+            df = result.frame
+            source = "cached" if result.cached else "parsed"
+            st.write(f"Processed sheet {result.name} with {len(df)} rows ({source} in {result.seconds:.2f}s)")
+            all_data.append(df)
         
         # Combine all sheets
         if all_data:
             combined_df = pd.concat(all_data, ignore_index=True)
-            st.write(f"Combined {len(all_data)} sheets, total {len(combined_df)} rows")
+            st.write(f"Combined {len(all_data)} sheets, total {len(combined_df)} rows in {total_seconds:.2f}s")
             return combined_df
         return None
     except Exception as e:
         st.error(f"Error processing Excel file: {str(e)}")
         return None
 
-@st.cache_data
 def process_data(df):
     """Process and clean the DataFrame"""
     try:
-        # Convert date columns to datetime with better error handling
-        date_columns = ['RCVD', 'EFF DATE', 'Effective Date']
-        for col in date_columns:
-            if col in df.columns:
-                # First, ensure the column exists and has data
-                if not df[col].empty:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
-                    
-                    # Handle invalid dates by setting them to a reasonable default
-                    # For records with invalid dates, use the EFF DATE if available, or set to today
-                    if col == 'RCVD' and df[col].isna().any():
-                        # If RCVD is missing but EFF DATE exists, use EFF DATE
-                        if 'EFF DATE' in df.columns and not df['EFF DATE'].empty:
-                            mask = df[col].isna() & df['EFF DATE'].notna()
-                            df.loc[mask, col] = df.loc[mask, 'EFF DATE']
-                        
-                        # For remaining invalid dates, set to a reasonable default (today)
-                        remaining_invalid = df[col].isna()
-                        if remaining_invalid.any():
-                            df.loc[remaining_invalid, col] = pd.Timestamp.now()
-                else:
-                    # If column is empty, create with today's date
-                    df[col] = pd.Timestamp.now()
-        
-        # Clean up and standardize LOB column
-        df['LOB'] = df['LOB'].fillna('Unknown').astype(str)
-        
-        # Create standardization mapping for LOB values
-        lob_mapping = {
-            'bop': 'BOP/PKG', 'BOP': 'BOP/PKG', 'pkg': 'BOP/PKG',
-            'PKG': 'BOP/PKG', 'Pkg': 'BOP/PKG', 'BOP/Pkg': 'BOP/PKG',
-            'BOP/PKG': 'BOP/PKG', 'pkg/umb': 'BOP/PKG/UMB',
-            'BOP / Umb': 'BOP/PKG/UMB', 'umb': 'UMB', 'Umb': 'UMB',
-            'UMB': 'UMB', 'wc': 'WC', 'WC': 'WC', 'ba': 'BA', 'BA': 'BA'
-        }
-        
-        # Apply standardization
-        df['LOB'] = df['LOB'].apply(lambda x: lob_mapping.get(x.strip(), x.strip()))
-        df.loc[df['LOB'] == 'nan', 'LOB'] = 'Unknown'
-        
-        # Standardize WC Class Code columns
-        wc_code_columns = ['WC Class Code', 'Workers Comp Class Code', 'Work Comp Class']
-        df['WC_Class_Code'] = None
-        for col in wc_code_columns:
-            if col in df.columns:
-                mask = df['WC_Class_Code'].isnull() & df[col].notna()
-                df.loc[mask, 'WC_Class_Code'] = df.loc[mask, col]
-        
-        # Clean up WC_Class_Code
-        df['WC_Class_Code'] = df['WC_Class_Code'].fillna('Unknown')
-        
-        # Add month-year column for trending
-        try:
-            if 'RCVD' in df.columns and not df['RCVD'].empty:
-                # Ensure RCVD is datetime before using .dt accessor
-                df['RCVD'] = pd.to_datetime(df['RCVD'], errors='coerce')
-                df['Month_Year'] = df['RCVD'].dt.to_period('M')
-            else:
-                df['Month_Year'] = pd.Period.now('M')
-        except Exception as e:
-            # Fallback: create Month_Year with current month
-            df['Month_Year'] = pd.Period.now('M')
-        
-        return df
+        # The processing itself is Streamlit-free so the CLI tools share it
+        return process_submissions(df)
     except Exception as e:
         st.error(f"Error processing data: {str(e)}")
         return None
 
+def load_processed_local_file(file_path, loader, digest=None):
+    """Load a local data file, reusing the processed snapshot when the file is unchanged"""
+    return load_processed_file(file_path, loader, process_data, digest)
+
+@st.cache_resource
+def shared_datasets():
+    """Process-wide LRU registry of processed datasets shared by every session"""
+    return DatasetRegistry()
+
+@st.cache_resource
+def shared_search_cache():
+    """Process-wide LRU cache of business search results shared by every session"""
+    return SearchCache()
+
+def dataset_key(digest):
+    """Datasets are addressed by the SHA-256 of their source bytes and the pipeline version"""
+    return f"{digest}:v{PIPELINE_VERSION}"
+
+def load_local_dataset(file_path, loader):
+    """Return the shared dataset for a local data file, loading it on first use"""
+    # The file is hashed once: the digest keys both the dataset and its snapshot
+    digest = file_sha256(file_path)
+    return shared_datasets().get_or_build(
+        dataset_key(digest), lambda: load_processed_local_file(file_path, loader, digest), file_path
+    )
+
+def upload_dataset_id(uploaded_file):
+    """Dataset id for an uploaded file; each upload is hashed once per session"""
+    digests = st.session_state.setdefault('upload_digests', {})
+    if uploaded_file.file_id not in digests:
+        digests[uploaded_file.file_id] = content_sha256(uploaded_file.getvalue())
+    return dataset_key(digests[uploaded_file.file_id])
+
 ## SECTION: Analysis Functions
-def analyze_carrier_responses(df):
+def analyze_carrier_responses(counts):
     """Analyze carrier quote patterns"""
     results = {}
-    for carrier in CARRIER_COLUMNS:
-        if carrier in df.columns:
-            quote_count = df[carrier].notna().sum()
-            total_submissions = len(df)
-            quote_percentage = (quote_count / total_submissions) * 100 if total_submissions > 0 else 0
-            results[carrier] = {
-                'total_quotes': quote_count,
-                'quote_percentage': round(quote_percentage, 2),
-                'total_submissions': total_submissions
-            }
+    # counts is the count cube slice of the current filters (utils/count_cube.py)
+    total_submissions = counts.total
+    response_counts = counts.responses()
+    for carrier, quote_count in response_counts.items():
+        quote_percentage = (quote_count / total_submissions) * 100 if total_submissions > 0 else 0
+        results[carrier] = {
+            'total_quotes': quote_count,
+            'quote_percentage': round(quote_percentage, 2),
+            'total_submissions': total_submissions
+        }
     return results
 
-def analyze_lob_patterns(df):
+def analyze_lob_patterns(counts):
     """Analyze patterns by Line of Business"""
+    # One tidy (LOB, Carrier) table for every LOB at once, largest LOBs first
+    lob_carriers = counts.lob_carrier_counts()
+    
     results = {}
-    for lob in df['LOB'].unique():
-        lob_data = df[df['LOB'] == lob]
-        carrier_responses = {}
-        for carrier in CARRIER_COLUMNS:
-            if carrier in df.columns:
-                quote_count = lob_data[carrier].notna().sum()
-                if quote_count > 0:
-                    carrier_responses[carrier] = quote_count
+    for lob, group in lob_carriers.groupby('LOB', sort=False):
+        responded = group[group['Responses'] > 0]
         results[lob] = {
-            'total_submissions': len(lob_data),
-            'carrier_responses': carrier_responses
+            'total_submissions': int(group['Submissions'].iloc[0]),
+            'carrier_responses': dict(zip(responded['Carrier'], responded['Responses']))
         }
     return results
 
-def analyze_wc_data(df):
+def analyze_wc_data(counts):
     """Analyze Workers Compensation specific patterns"""
-    if 'WC' not in df['LOB'].unique():
+    # The WC rows of the same (LOB, Carrier) table analyze_lob_patterns uses
+    lob_carriers = counts.lob_carrier_counts()
+    wc_carriers = lob_carriers[lob_carriers['LOB'] == 'WC']
+    if wc_carriers.empty:
         return None
     
-    wc_data = df[df['LOB'] == 'WC']
-    
     results = {
-        'total_wc_submissions': len(wc_data),
-        'class_codes': wc_data['WC Class Code'].value_counts().to_dict() if 'WC Class Code' in wc_data.columns else {},
+        'total_wc_submissions': int(wc_carriers['Submissions'].iloc[0]),
+        'class_codes': counts.for_lob('WC').class_code_counts().to_dict(),
         'carrier_responses': {}
     }
     
-    for carrier in CARRIER_COLUMNS:
-        if carrier in df.columns:
-            quote_count = wc_data[carrier].notna().sum()
-            if quote_count > 0:
-                results['carrier_responses'][carrier] = quote_count
+    responded = wc_carriers[wc_carriers['Responses'] > 0]
+    results['carrier_responses'] = dict(zip(responded['Carrier'], responded['Responses']))
     
     return results
 
-def analyze_business_type(df, search_term):
+def sidebar_mask(dataset, date_rows, selected_lobs, selected_sheets, class_codes=None):
+    """
+    Boolean mask over all dataset rows for the sidebar filters, built from the
+    dataset's filter bitmaps and cached per filter combination (read-only).
+    class_codes, when given, limits WC rows to those codes.
+    """
+    fingerprint = (date_rows.start, date_rows.stop, frozenset(selected_lobs), frozenset(selected_sheets),
+                   frozenset(class_codes) if class_codes is not None else None)
+    
+    def build():
+        mask = dataset.filters.mask({'LOB': selected_lobs, 'Source_Sheet': selected_sheets}, date_rows)
+        if class_codes is not None:
+            # Union of the selected codes' row ids; non-WC records are always included
+            mask &= dataset.class_codes.filter_mask(class_codes, len(dataset))
+        return mask
+    
+    return dataset.filters.cached_mask(fingerprint, build)
+
+def view_mask(df, dataset):
+    """Boolean mask over all dataset rows selecting the rows of a filtered view"""
+    mask = np.zeros(len(dataset), dtype=bool)
+    mask[df.index] = True
+    return mask
+
+def analyze_business_type(df, search_term, dataset, row_mask=None, fuzzy=False, previous=None):
     """Analyze submissions and quotes for specific business types"""
-    # Search in all relevant columns
-    search_cols = [
-        'Desc of Ops', 'Description of Operations', 'Applicant', 
-        'Description', 'Business Description', 'Notes',
-        'Comments', 'Business Type'
-    ]
-    
-    # Create mask for search term
-    mask = pd.Series(False, index=df.index)
-    for col in search_cols:
-        if col in df.columns:
-            # Support wildcards by replacing * with .* for regex
-            search_pattern = search_term.replace('*', '.*')
-            mask = mask | df[col].fillna('').astype(str).str.lower().str.contains(search_pattern.lower(), regex=True)
-    
-    # Filter data
-    matched_data = df[mask]
-    
-    if len(matched_data) == 0:
+    # Look the terms up in the dataset's text index, then keep rows that pass the filters
+    # (row_mask is the filter mask over all dataset rows; df's index stands in when omitted)
+    if row_mask is None:
+        row_mask = view_mask(df, dataset)
+    scores = None
+    complete = True
+    if fuzzy:
+        # Typo-tolerant: the closest-matching submissions, best first
+        rows, scores = dataset.trigram_index.search(search_term, row_mask=row_mask)
+    else:
+        # Field-scoped boolean query, run as set operations over the dataset's indexes.
+        # previous is this session's last (plan, rows) under the same filters: a query
+        # that only narrows it ('plu' -> 'plum', an added AND term) re-filters those rows.
+        parts = refinement_terms(previous[0], compile_query(search_term)) if previous else None
+        if parts is not None:
+            rows, complete = narrow_with_fallback(search_term, previous[1], parts, dataset)
+        else:
+            # (a query past its time budget falls back to a simple word search)
+            rows, complete = search_with_fallback(search_term, dataset)
+            rows = rows[row_mask[rows]]
+    if len(rows) == 0:
         return None
     
-    # Get all unique LOB patterns
-    all_lobs = matched_data['LOB'].unique().tolist()
-    
-    # Get carrier quote information and bound information
-    carrier_info = []
-    for _, row in matched_data.iterrows():
-        quotes = {}
-        for carrier in CARRIER_COLUMNS:
-            if carrier in row and pd.notna(row[carrier]):
-                quotes[carrier] = row[carrier]
-        
-        # Check for bound status in Bound With column
-        bound_info = ''
-        if pd.notna(row.get('Bound With', '')):
-            bound_carrier = str(row['Bound With']).strip()
-            if bound_carrier:
-                bound_info = f"Bound: {bound_carrier}"
-        
-        # If no bound info in Bound With, check Notes
-        if not bound_info and 'Notes' in row and pd.notna(row['Notes']):
-            notes = str(row['Notes']).lower()
-            if 'bound' in notes:
-                if 'lm' in notes or 'liberty mutual' in notes:
-                    bound_info = 'Bound: Liberty Mutual'
-                elif 'amtrust' in notes:
-                    bound_info = 'Bound: AmTrust'
-                else:
-                    bound_info = 'Bound'
-        
-        carrier_info.append({
-            'quotes': quotes,
-            'bound': bound_info,
-            'bound_carrier': row.get('Bound With', '') if pd.notna(row.get('Bound With', '')) else ''
-        })
-    
-    # Analyze results
-    results = {
-        'total_matches': len(matched_data),
-        'lob_distribution': matched_data['LOB'].value_counts().to_dict(),
-        'carrier_responses': {},
-        'bound_distribution': {},
-        'submissions': [],
-        'all_lobs': all_lobs
-    }
-    
-    # Track bound policies by carrier
-    bound_counts = {}
-    
-    # Combine submission data with carrier info
-    for (_, row), carrier_data in zip(matched_data.iterrows(), carrier_info):
-        submission = {
-            'Applicant': row['Applicant'],
-            'LOB': row['LOB'],
-            'RCVD': row['RCVD'],
-            'Source_Sheet': row['Source_Sheet'],
-            'quotes': carrier_data['quotes'],
-            'bound': carrier_data['bound'],
-            'bound_carrier': carrier_data['bound_carrier']
-        }
-        results['submissions'].append(submission)
-        
-        # Track bound carriers
-        if carrier_data['bound_carrier']:
-            carrier = carrier_data['bound_carrier']
-            bound_counts[carrier] = bound_counts.get(carrier, 0) + 1
-    
-    results['bound_distribution'] = bound_counts
-    
-    return results
+    # Columnar result: summaries are reductions over its arrays
+    return SearchResult.from_rows(dataset, rows, scores, complete)
 
-def create_wc_analysis_section(df):
+def create_wc_analysis_section(counts):
     """Create Workers Compensation analysis section"""
-    wc_data = analyze_wc_data(df)
+    wc_data = analyze_wc_data(counts)
     
     if wc_data and wc_data['total_wc_submissions'] > 0:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
@@ -359,9 +297,8 @@ def create_wc_analysis_section(df):
         with col2:
             if wc_data['class_codes']:
                 st.write("Top Class Codes:")
-                for code, count in dict(sorted(wc_data['class_codes'].items(), 
-                                            key=lambda x: x[1], 
-                                            reverse=True)[:5]).items():
+                # class_codes is already largest first
+                for code, count in list(wc_data['class_codes'].items())[:5]:
                     st.write(f"- Code {code}: {count} submissions")
         
         # Carrier response chart for WC
@@ -389,9 +326,32 @@ def create_wc_analysis_section(df):
         
         st.markdown('</div>', unsafe_allow_html=True)
 
-def create_business_search_section(df, search_term):
+def create_business_search_section(df, search_term, dataset, row_mask=None, fuzzy=False):
     """Create analysis section for business type search"""
-    results = analyze_business_type(df, search_term)
+    if row_mask is None:
+        row_mask = view_mask(df, dataset)
+    # Complete results are shared across reruns and sessions for the same data, query and filters
+    cache = shared_search_cache()
+    key = cache.key(dataset.dataset_id, search_term, row_mask, 'fuzzy' if fuzzy else 'exact')
+    # Search-as-you-type: the session's last exact search under the same data and filters
+    scope = (key[0], key[3])
+    last_search = st.session_state.get('last_search')
+    previous = None
+    if not fuzzy and last_search and last_search['scope'] == scope:
+        previous = (last_search['plan'], last_search['rows'])
+    try:
+        results = cache.get_or_compute(
+            key, lambda: analyze_business_type(df, search_term, dataset, row_mask, fuzzy, previous)
+        )
+        if not fuzzy and (results is None or results.complete):
+            st.session_state.last_search = {
+                'scope': scope,
+                'plan': compile_query(search_term),
+                'rows': results.row_ids if results is not None else np.empty(0, dtype=np.int64)
+            }
+    except QuerySyntaxError as e:
+        st.error(f"Could not understand the search: {e}")
+        return
     
     if results is None:
         st.warning("No matches found for your search term.")
@@ -399,10 +359,12 @@ def create_business_search_section(df, search_term):
     
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader(f"🔍 Business Type Analysis: '{search_term}'")
+    if not results.complete:
+        st.warning("This search took too long, so it was simplified to a plain word search. "
+                   "Results may be broader than the full query.")
     
     # Sort LOBs by frequency and create dropdown
-    lob_counts = pd.Series(results['lob_distribution'])
-    sorted_lobs = lob_counts.sort_values(ascending=False)
+    sorted_lobs = results.lob_counts()
     
     # Create a dropdown for LOB filtering
     selected_lob = st.selectbox(
@@ -415,124 +377,75 @@ def create_business_search_section(df, search_term):
     selected_lob_name = selected_lob.split(" (")[0] if selected_lob != "All Lines" else None
     
     # Filter submissions based on selected LOB
-    filtered_submissions = results['submissions']
-    if selected_lob_name:
-        filtered_submissions = [s for s in results['submissions'] if s['LOB'] == selected_lob_name]
-    
-    # Collect all carrier quotes for summary
-    all_quotes = {}
-    quote_amounts = {}  # Track actual quote amounts
-    bound_info = {}  # Track bound policies
-    
-    for submission in filtered_submissions:
-        # Track quotes
-        for carrier, amount in submission['quotes'].items():
-            if carrier not in all_quotes:
-                all_quotes[carrier] = []
-                quote_amounts[carrier] = []
-            all_quotes[carrier].append(submission)
-            if isinstance(amount, (int, float)):
-                quote_amounts[carrier].append(amount)
-        
-        # Track bound policies
-        if submission['bound_carrier']:
-            carrier = submission['bound_carrier']
-            if carrier not in bound_info:
-                bound_info[carrier] = []
-            bound_info[carrier].append(submission)
+    selected = results.for_lob(selected_lob_name) if selected_lob_name else results
+    carrier_df = selected.carrier_summary()
     
     # Display carrier quote summary
-    if all_quotes:
+    if not carrier_df.empty:
         st.write(f"### 🏛️ Carrier Analysis {f'for {selected_lob_name}' if selected_lob_name else ''}")
         
         # Create metrics
         cols = st.columns(4)
         with cols[0]:
-            st.metric("Total Matching Submissions", len(filtered_submissions))
+            st.metric("Total Matching Submissions", len(selected))
         with cols[1]:
-            st.metric("Carriers Providing Quotes", len(all_quotes))
+            st.metric("Carriers Providing Quotes", len(carrier_df))
         with cols[2]:
-            total_quotes = sum(len(quotes) for quotes in all_quotes.values())
-            st.metric("Total Quotes Provided", total_quotes)
+            st.metric("Total Quotes Provided", selected.total_quotes)
         with cols[3]:
-            total_bound = sum(len(policies) for policies in bound_info.values())
-            st.metric("Total Bound Policies", total_bound)
+            st.metric("Total Bound Policies", int(selected.bound_counts().sum()))
         
-        # Create carrier quote visualization
-        carrier_data = []
-        for carrier, submissions in all_quotes.items():
-            avg_quote = None
-            if quote_amounts[carrier]:
-                avg_quote = sum(quote_amounts[carrier]) / len(quote_amounts[carrier])
-            
-            bound_count = len(bound_info.get(carrier, []))
-            
-            carrier_data.append({
-                'Carrier': carrier,
-                'Number of Quotes': len(submissions),
-                'Average Quote': avg_quote if avg_quote else 0,
-                'Quote Rate': (len(submissions) / len(filtered_submissions)) * 100,
-                'Bound Policies': bound_count,
-                'Win Rate': (bound_count / len(submissions) * 100) if len(submissions) > 0 else 0
-            })
+        # Create three columns for charts
+        chart_cols = st.columns(2)
         
-        if carrier_data:
-            carrier_df = pd.DataFrame(carrier_data)
-            
-            # Create three columns for charts
-            chart_cols = st.columns(2)
-            
-            with chart_cols[0]:
-                # Quote frequency chart
-                fig1 = px.bar(
-                    carrier_df.sort_values('Number of Quotes', ascending=False),
+        with chart_cols[0]:
+            # Quote frequency chart
+            fig1 = px.bar(
+                carrier_df.sort_values('Number of Quotes', ascending=False),
+                x='Carrier',
+                y='Number of Quotes',
+                title=f'Carrier Quote Frequency for {search_term}',
+                color='Quote Rate',
+                color_continuous_scale='Viridis',
+                labels={'Quote Rate': 'Quote Rate (%)'}
+            )
+            fig1.update_layout(
+                xaxis_tickangle=-45,
+                plot_bgcolor='white',
+                paper_bgcolor='white',
+                margin=dict(t=50, l=50, r=20, b=50)
+            )
+            st.plotly_chart(fig1, use_container_width=True)
+        
+        with chart_cols[1]:
+            # Win rate chart for carriers with bound policies
+            win_rate_df = carrier_df[carrier_df['Bound Policies'] > 0].sort_values('Win Rate', ascending=False)
+            if not win_rate_df.empty:
+                fig2 = px.bar(
+                    win_rate_df,
                     x='Carrier',
-                    y='Number of Quotes',
-                    title=f'Carrier Quote Frequency for {search_term}',
-                    color='Quote Rate',
+                    y='Win Rate',
+                    title=f'Carrier Win Rates for {search_term}',
+                    color='Win Rate',
                     color_continuous_scale='Viridis',
-                    labels={'Quote Rate': 'Quote Rate (%)'}
+                    labels={'Win Rate': 'Win Rate (%)'},
+                    hover_data=['Number of Quotes', 'Bound Policies']
                 )
-                fig1.update_layout(
+                fig2.update_layout(
                     xaxis_tickangle=-45,
                     plot_bgcolor='white',
                     paper_bgcolor='white',
-                    margin=dict(t=50, l=50, r=20, b=50)
+                    margin=dict(t=50, l=50, r=20, b=50),
+                    yaxis_tickformat='.1f'
                 )
-                st.plotly_chart(fig1, use_container_width=True)
-            
-            with chart_cols[1]:
-                # Win rate chart for carriers with bound policies
-                win_rate_df = carrier_df[carrier_df['Bound Policies'] > 0].sort_values('Win Rate', ascending=False)
-                if not win_rate_df.empty:
-                    fig2 = px.bar(
-                        win_rate_df,
-                        x='Carrier',
-                        y='Win Rate',
-                        title=f'Carrier Win Rates for {search_term}',
-                        color='Win Rate',
-                        color_continuous_scale='Viridis',
-                        labels={'Win Rate': 'Win Rate (%)'},
-                        hover_data=['Number of Quotes', 'Bound Policies']
-                    )
-                    fig2.update_layout(
-                        xaxis_tickangle=-45,
-                        plot_bgcolor='white',
-                        paper_bgcolor='white',
-                        margin=dict(t=50, l=50, r=20, b=50),
-                        yaxis_tickformat='.1f'
-                    )
-                    st.plotly_chart(fig2, use_container_width=True)
+                st.plotly_chart(fig2, use_container_width=True)
     
     # Lines of Business Distribution
     if not selected_lob_name:
         st.write("### 📊 Lines of Business Distribution")
         
         # Create pie chart for LOB distribution
-        lob_data = pd.DataFrame(
-            list(results['lob_distribution'].items()),
-            columns=['LOB', 'Count']
-        ).sort_values('Count', ascending=False)
+        lob_data = pd.DataFrame({'LOB': sorted_lobs.index, 'Count': sorted_lobs.values})
         
         # Create two columns
         lob_cols = st.columns([2, 1])
@@ -549,60 +462,41 @@ def create_business_search_section(df, search_term):
         
         with lob_cols[1]:
             st.write("#### LOB Breakdown:")
-            for lob, count in lob_data.iterrows():
-                st.write(f"- **{count['LOB']}**: {count['Count']} submissions ({(count['Count']/len(results['submissions'])*100):.1f}%)")
+            for lob, count in sorted_lobs.items():
+                st.write(f"- **{lob}**: {count} submissions ({(count/len(results)*100):.1f}%)")
     
     # Detailed matches with quote information
     st.write("### 📋 Matching Submissions")
     
-    # Group submissions by LOB for better organization
-    lob_grouped = {}
-    for submission in filtered_submissions:
-        lob = submission['LOB']
-        if lob not in lob_grouped:
-            lob_grouped[lob] = []
-        lob_grouped[lob].append(submission)
-    
-    # Display submissions grouped by LOB
-    for lob, submissions in sorted(lob_grouped.items(), key=lambda x: len(x[1]), reverse=True):
-        st.write(f"\n#### {lob} ({len(submissions)} submissions)")
+    # Display submissions grouped by LOB, largest group first; the carrier summaries of
+    # all LOBs come from one grouped pass over the results
+    lob_summary = selected.lob_carrier_summary()
+    lob_summaries = dict(tuple(lob_summary.groupby('LOB', sort=False)))
+    for lob, group in selected.lob_groups():
+        st.write(f"\n#### {lob} ({len(group)} submissions)")
         
         # Add a summary for this LOB
-        lob_carriers = {}
-        bound_carriers = {}
-        for submission in submissions:
-            # Track quotes
-            for carrier, amount in submission['quotes'].items():
-                if carrier not in lob_carriers:
-                    lob_carriers[carrier] = {'count': 0, 'amounts': [], 'bound': 0}
-                lob_carriers[carrier]['count'] += 1
-                if isinstance(amount, (int, float)):
-                    lob_carriers[carrier]['amounts'].append(amount)
-            
-            # Track bound policies
-            if submission['bound_carrier']:
-                carrier = submission['bound_carrier']
-                if carrier not in bound_carriers:
-                    bound_carriers[carrier] = 0
-                bound_carriers[carrier] += 1
-                if carrier in lob_carriers:
-                    lob_carriers[carrier]['bound'] += 1
-        
-        # Display LOB summary
+        lob_carriers = lob_summaries.get(lob, lob_summary.iloc[:0]).sort_values(
+            'Number of Quotes', ascending=False, kind='stable')
         st.write("**Carrier Summary:**")
-        for carrier, data in sorted(lob_carriers.items(), key=lambda x: x[1]['count'], reverse=True):
-            avg_amount = f", Avg: ${sum(data['amounts'])/len(data['amounts']):,.2f}" if data['amounts'] else ""
-            bound_info = f", Bound: {data['bound']}" if data['bound'] > 0 else ""
-            st.write(f"- {carrier}: {data['count']} quotes{avg_amount}{bound_info}")
-        
-        if bound_carriers:
+        for carrier, count, priced, average, bound in zip(
+                lob_carriers['Carrier'], lob_carriers['Number of Quotes'], lob_carriers['Priced Quotes'],
+                lob_carriers['Average Quote'], lob_carriers['Bound Policies']):
+            avg_amount = f", Avg: ${average:,.2f}" if priced else ""
+            bound_info = f", Bound: {bound}" if bound > 0 else ""
+            st.write(f"- {carrier}: {count} quotes{avg_amount}{bound_info}")
+        
+        bound_carriers = group.bound_counts()
+        if not bound_carriers.empty:
             st.write("\n**Bound Policies:**")
-            for carrier, count in sorted(bound_carriers.items(), key=lambda x: x[1], reverse=True):
+            for carrier, count in bound_carriers.items():
                 st.write(f"- {carrier}: {count} bound")
         
-        # Display individual submissions
-        for submission in submissions:
-            with st.expander(f"**{submission['Applicant']}**"):
+        # Display individual submissions (broad searches list only the first few per LOB)
+        for i in range(min(len(group), MAX_LISTED_SUBMISSIONS)):
+            submission = group.submission(i)
+            match_label = f" ({submission['match_score']:.0%} match)" if 'match_score' in submission else ""
+            with st.expander(f"**{submission['Applicant']}**{match_label}"):
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
@@ -618,7 +512,7 @@ def create_business_search_section(df, search_term):
                     st.write("**💰 Carrier Quotes:**")
                     quote_items = []
                     for carrier, amount in submission['quotes'].items():
-                        if isinstance(amount, (int, float)):
+                        if carrier in submission['premiums']:
                             quote_items.append(f"- {carrier}: ${amount:,.2f}")
                         else:
                             quote_items.append(f"- {carrier}: {amount}")
@@ -632,9 +526,38 @@ def create_business_search_section(df, search_term):
                     st.write("❌ No quotes received")
                 
                 st.write("---")
+        if len(group) > MAX_LISTED_SUBMISSIONS:
+            st.caption(f"Showing the first {MAX_LISTED_SUBMISSIONS} of {len(group)} {lob} submissions. "
+                       "Refine the search to see the rest.")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+def create_batch_search_section(dataset, row_mask):
+    """Per-keyword appetite table for a list of trades (same as python -m utils.batch_search)"""
+    with st.expander("📋 Batch Trade Search", expanded=False):
+        with st.form("batch_search"):
+            text = st.text_area(
+                "Trades to look up (one search per line)",
+                placeholder="plumb*\nroof*\ndesc:restaurant* AND lob:BOP*",
+                height=150
+            )
+            submitted = st.form_submit_button("Run batch search")
+        keywords = read_keywords(text.splitlines())
+        if not submitted or not keywords:
+            return
+        table = batch_search(dataset, keywords, row_mask)
+        st.dataframe(
+            table.style.format({'Bind Rate': '{:.1f}%'}),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.download_button(
+            "Download as CSV",
+            table.to_csv(index=False),
+            file_name="batch_trade_search.csv",
+            mime="text/csv"
+        )
+
 ## SECTION: Visualization Functions
 def create_carrier_quote_chart(carrier_data):
     """Create bar chart for carrier quote patterns"""
@@ -661,9 +584,9 @@ def create_carrier_quote_chart(carrier_data):
     )
     return fig
 
-def create_lob_distribution_chart(df):
+def create_lob_distribution_chart(counts):
     """Create pie chart for LOB distribution"""
-    lob_counts = df['LOB'].value_counts()
+    lob_counts = counts.lob_counts()
     fig = px.pie(
         values=lob_counts.values,
         names=lob_counts.index,
@@ -676,15 +599,10 @@ def create_lob_distribution_chart(df):
     )
     return fig
 
-def create_trend_chart(df):
+def create_trend_chart(counts):
     """Create trend chart showing submissions over time"""
-    # Convert Period to string for plotting
-    monthly_counts = df.groupby('Month_Year').size().reset_index()
-    monthly_counts['Month_Year'] = monthly_counts['Month_Year'].astype(str)
-    monthly_counts.columns = ['Month_Year', 'Count']
-    
-    # Sort by date
-    monthly_counts = monthly_counts.sort_values('Month_Year')
+    # Submissions per month label ('2024-03'), already in month order
+    monthly_counts = counts.month_counts().rename_axis('Month_Year').reset_index(name='Count')
     
     fig = px.line(
         monthly_counts,
@@ -714,24 +632,26 @@ def main():
         </div>
     """, unsafe_allow_html=True)
     
-    # Initialize session state for DataFrame if it doesn't exist
-    if 'df' not in st.session_state:
-        st.session_state.df = None
+    # Sessions hold only the id of a shared dataset, never their own copy of the data
+    datasets = shared_datasets()
+    if datasets.get(st.session_state.get('dataset_id')) is None:
+        st.session_state.dataset_id = None
         # Try to load local files first
         if os.path.exists('data/combined_submission_log.csv'):
             try:
                 st.info("Found local CSV file, attempting to load...")
-                df = pd.read_csv('data/combined_submission_log.csv')
-                st.session_state.df = process_data(df)
-                st.success("Loaded local CSV file successfully!")
+                dataset = load_local_dataset('data/combined_submission_log.csv', read_submission_csv)
+                if dataset is not None:
+                    st.session_state.dataset_id = dataset.dataset_id
+                    st.success("Loaded local CSV file successfully!")
             except Exception as e:
                 st.error(f"Error loading local CSV: {str(e)}")
         elif os.path.exists('data/EvolutionMasterSubmissionLog061325.xlsx'):
             try:
                 st.info("Found local Excel file, attempting to load...")
-                df = process_excel_file('data/EvolutionMasterSubmissionLog061325.xlsx')
-                if df is not None:
-                    st.session_state.df = process_data(df)
+                dataset = load_local_dataset('data/EvolutionMasterSubmissionLog061325.xlsx', process_excel_file)
+                if dataset is not None:
+                    st.session_state.dataset_id = dataset.dataset_id
                     st.success("Loaded local Excel file successfully!")
             except Exception as e:
                 st.error(f"Error loading local Excel: {str(e)}")
@@ -742,46 +662,61 @@ def main():
                                    help="Upload either the Excel file or the combined CSV file")
     
     if uploaded_file is not None:
-        try:
+        def process_upload():
             if uploaded_file.name.endswith('.xlsx'):
                 # Process Excel file
                 st.info("Processing uploaded Excel file...")
                 df = process_excel_file(uploaded_file)
-                if df is not None:
-                    st.success("Excel file processed successfully!")
-                    st.session_state.df = process_data(df)
+                if df is None:
+                    return None
+                st.success("Excel file processed successfully!")
+                return process_data(df)
             
-            elif uploaded_file.name.endswith('.csv'):
+            if uploaded_file.name.endswith('.csv'):
                 # Read CSV directly into DataFrame
                 st.info("Processing uploaded CSV file...")
-                df = pd.read_csv(uploaded_file)
+                df = read_submission_csv(uploaded_file)
                 st.success("CSV file uploaded successfully!")
-                st.session_state.df = process_data(df)
-            
-            if st.session_state.df is None:
+                return process_data(df)
+            return None
+        
+        try:
+            # Identical uploads (from any session) are processed once and then served from the cache
+            dataset = datasets.get_or_build(upload_dataset_id(uploaded_file), process_upload,
+                                            uploaded_file.name)
+            if dataset is None:
                 st.error("Error processing the uploaded file.")
                 return
+            st.session_state.dataset_id = dataset.dataset_id
         
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
             return
     
     # Check if we have data to display
-    if st.session_state.df is None:
+    dataset = datasets.get(st.session_state.dataset_id)
+    if dataset is None:
         st.info("Please upload either an Excel file or the combined CSV file to begin analysis.")
         return
     
-    # Use the DataFrame from session state for all analysis
-    df = st.session_state.df
+    # Every analysis below works on a view of the shared, read-only dataset
+    df = dataset.view()
     
     # Business Type Search - Moved to top
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("🔍 Quick Business Search")
     search_term = st.text_input(
         "Search by Business Type/Description",
-        help="Enter keywords to search in business descriptions and names (e.g., 'plumb*' for plumbing)",
+        help="Enter keywords to search in business descriptions, names and notes. Words match by prefix and every word must match (e.g., 'plumb*' for plumbing)",
         placeholder="Type business description (e.g., plumb*, restaurant*, etc.)"
     )
+    match_mode = st.radio(
+        "Match mode",
+        ["Exact words", "Fuzzy (typo-tolerant)"],
+        horizontal=True,
+        help="Fuzzy matching also finds misspelled words (e.g., 'plumbng', 'resturant') and ranks the closest submissions first",
+        key="match_mode"
+    )
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Help Box
@@ -793,6 +728,9 @@ def main():
         1. 🔍 **Business Search**:
            - Type a business description in the search box above
            - Use * for wildcard searches (e.g., 'plumb*' for plumbing)
+           - Quote phrases ("auto repair") and combine terms with AND, OR, NOT and parentheses
+           - Limit a term to a field: desc:, applicant:, notes:, lob:, member:, sheet:, bound:, class:
+             (e.g., desc:plumb* AND lob:WC NOT notes:decline)
            - Results will show matching submissions and carrier preferences
         
         2. 📅 **Date Range Selection**:
@@ -840,11 +778,10 @@ def main():
                                     list(date_options.keys()),
                                     index=0)  # Default to "All Time"
     
-    # Ensure RCVD is datetime for date range calculations
+    # Date range bounds: the dataset is sorted by RCVD, so these are its first and last rows
     try:
-        df['RCVD'] = pd.to_datetime(df['RCVD'], errors='coerce')
-        min_date = df['RCVD'].min()
-        max_date = df['RCVD'].max()
+        min_date = df['RCVD'].iloc[0]
+        max_date = df['RCVD'].iloc[-1]
         
         # If dates are invalid, use default range
         if pd.isna(min_date) or pd.isna(max_date):
@@ -869,6 +806,13 @@ def main():
         start_date = end_date - date_options[selected_range]
         date_range = (start_date, end_date)
     
+    # Two binary searches over the sorted RCVD day numbers give the rows in the date range
+    try:
+        date_rows = dataset.dates.row_slice(date_range[0], date_range[1])
+    except Exception as e:
+        # Fallback (e.g. a custom range with only its start picked so far): no date filter
+        date_rows = slice(0, len(dataset))
+    
     # Source Sheet Filter
     with st.sidebar.expander("📑 Data Source", expanded=False):
         all_sheets = sorted(df['Source_Sheet'].unique())
@@ -898,29 +842,10 @@ def main():
     # WC Class Code filter (only show if WC is selected)
     if 'WC' in selected_lobs:
         with st.sidebar.expander("👷 WC Class Codes", expanded=True):
-            # Get WC class codes from the correct column name
-            wc_data = df[df['LOB'] == 'WC']
-            wc_codes = wc_data['WC Class Code'].dropna()
-            
-            # Convert to strings and clean up
-            wc_codes_clean = []
-            for code in wc_codes:
-                if pd.notna(code):
-                    # Handle both single codes and comma-separated codes
-                    code_str = str(code).strip()
-                    if ',' in code_str:
-                        # Split comma-separated codes
-                        individual_codes = [c.strip() for c in code_str.split(',')]
-                        wc_codes_clean.extend(individual_codes)
-                    else:
-                        wc_codes_clean.append(code_str)
-            
-            # Remove duplicates and sort
-            available_class_codes = sorted(list(set(wc_codes_clean)))
-            
-            # Add "All" option and "Unknown" if there are records without class codes
-            options = ["All"] + available_class_codes
-            if len(wc_data) > len(wc_codes):
+            # Codes come from the dataset's class-code index (comma-separated codes are split)
+            class_codes = dataset.class_codes
+            options = ["All"] + class_codes.codes
+            if class_codes.has_unknown:
                 options.append("Unknown")
             
             selected_class_codes = st.multiselect(
@@ -930,81 +855,38 @@ def main():
                 key="wc_class_codes"
             )
         
-        # Apply filters including class codes
-        try:
-            # Ensure RCVD is datetime before filtering
-            df['RCVD'] = pd.to_datetime(df['RCVD'], errors='coerce')
-            mask = (
-                (df['RCVD'].dt.date >= pd.to_datetime(date_range[0]).date()) &
-                (df['RCVD'].dt.date <= pd.to_datetime(date_range[1]).date()) &
-                (df['LOB'].isin(selected_lobs)) &
-                (df['Source_Sheet'].isin(selected_sheets))
-            )
-        except Exception as e:
-            # Fallback: just filter by LOB and Source_Sheet
-            mask = (
-                (df['LOB'].isin(selected_lobs)) &
-                (df['Source_Sheet'].isin(selected_sheets))
-            )
-        
-        # Apply WC class code filter if specific codes are selected
-        if 'WC' in selected_lobs and "All" not in selected_class_codes:
-            wc_mask = pd.Series(False, index=df.index)
-            
-            for _, row in df.iterrows():
-                if row['LOB'] == 'WC':
-                    row_class_code = str(row['WC Class Code']) if pd.notna(row['WC Class Code']) else 'Unknown'
-                    
-                    # Check if any selected class code matches this row
-                    if 'Unknown' in selected_class_codes and pd.isna(row['WC Class Code']):
-                        wc_mask.iloc[row.name] = True
-                    else:
-                        # Handle comma-separated codes
-                        if ',' in row_class_code:
-                            row_codes = [c.strip() for c in row_class_code.split(',')]
-                            if any(code in selected_class_codes for code in row_codes):
-                                wc_mask.iloc[row.name] = True
-                        else:
-                            if row_class_code in selected_class_codes:
-                                wc_mask.iloc[row.name] = True
-                else:
-                    # Non-WC records are always included
-                    wc_mask.iloc[row.name] = True
-            
-            mask = mask & wc_mask
-    else:
-        # Apply filters without class codes
-        try:
-            # Ensure RCVD is datetime before filtering
-            df['RCVD'] = pd.to_datetime(df['RCVD'], errors='coerce')
-            mask = (
-                (df['RCVD'].dt.date >= pd.to_datetime(date_range[0]).date()) &
-                (df['RCVD'].dt.date <= pd.to_datetime(date_range[1]).date()) &
-                (df['LOB'].isin(selected_lobs)) &
-                (df['Source_Sheet'].isin(selected_sheets))
-            )
-        except Exception as e:
-            # Fallback: just filter by LOB and Source_Sheet
-            mask = (
-                (df['LOB'].isin(selected_lobs)) &
-                (df['Source_Sheet'].isin(selected_sheets))
-            )
     
-    filtered_df = df[mask]
+    # Date slice AND the LOB / sheet bitmaps (AND the WC class codes when specific codes are
+    # selected); an unchanged filter combination is served from the dataset's mask cache
+    class_codes = None
+    if 'WC' in selected_lobs and "All" not in selected_class_codes:
+        class_codes = selected_class_codes
+    mask = pd.Series(sidebar_mask(dataset, date_rows, selected_lobs, selected_sheets, class_codes),
+                     index=df.index)
+    
+    # Cards and charts read the dataset's count cube; only the search and the raw data
+    # table below work on rows
+    counts = dataset.cube.query({'LOB': selected_lobs, 'Source_Sheet': selected_sheets}, date_rows,
+                                class_codes)
     
     # If there's a search term, show the business search analysis first
     if search_term:
-        create_business_search_section(filtered_df, search_term)
+        create_business_search_section(df, search_term, dataset, mask.to_numpy(),
+                                       fuzzy=match_mode.startswith("Fuzzy"))
+    
+    # Several trades at once, under the same filters
+    create_batch_search_section(dataset, mask.to_numpy())
     
     # Key Metrics
     st.markdown('<div style="margin-bottom: 30px;">', unsafe_allow_html=True)
     col1, col2, col3, col4 = st.columns(4)
+    response_counts = counts.responses()
     
     with col1:
         st.markdown(f"""
             <div class="metric-card">
                 <h3>📊 Total Submissions</h3>
-                <h2 style="color: #1e3c72;">{len(filtered_df)}</h2>
+                <h2 style="color: #1e3c72;">{counts.total}</h2>
                 <p>From {len(selected_sheets)} sheets</p>
             </div>
         """, unsafe_allow_html=True)
@@ -1013,12 +895,12 @@ def main():
         st.markdown(f"""
             <div class="metric-card">
                 <h3>🏢 Lines of Business</h3>
-                <h2 style="color: #1e3c72;">{len(filtered_df['LOB'].unique())}</h2>
+                <h2 style="color: #1e3c72;">{len(counts.lob_counts())}</h2>
             </div>
         """, unsafe_allow_html=True)
     
     with col3:
-        active_carriers = sum(1 for c in CARRIER_COLUMNS if filtered_df[c].notna().sum() > 0)
+        active_carriers = int((response_counts > 0).sum())
         st.markdown(f"""
             <div class="metric-card">
                 <h3>🏛️ Active Carriers</h3>
@@ -1027,7 +909,7 @@ def main():
         """, unsafe_allow_html=True)
     
     with col4:
-        avg_quotes = sum(filtered_df[c].notna().sum() for c in CARRIER_COLUMNS) / len(filtered_df) if len(filtered_df) > 0 else 0
+        avg_quotes = response_counts.sum() / counts.total if counts.total > 0 else 0
         st.markdown(f"""
             <div class="metric-card">
                 <h3>📈 Avg Quotes/Submission</h3>
@@ -1040,14 +922,14 @@ def main():
     # Trend Analysis
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("📈 Submission Trends")
-    trend_chart = create_trend_chart(filtered_df)
+    trend_chart = create_trend_chart(counts)
     st.plotly_chart(trend_chart, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Carrier Analysis
     st.markdown('<div class="chart-container">', unsafe_allow_html=True)
     st.subheader("🏛️ Carrier Quote Analysis")
-    carrier_data = analyze_carrier_responses(filtered_df)
+    carrier_data = analyze_carrier_responses(counts)
     carrier_chart = create_carrier_quote_chart(carrier_data)
     st.plotly_chart(carrier_chart, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
@@ -1058,8 +940,8 @@ def main():
     
     with col1:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        if len(filtered_df) > 0:
-            lob_chart = create_lob_distribution_chart(filtered_df)
+        if counts.total > 0:
+            lob_chart = create_lob_distribution_chart(counts)
             st.plotly_chart(lob_chart)
         else:
             st.warning("No data available for selected filters")
@@ -1067,7 +949,7 @@ def main():
     
     with col2:
         st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        lob_patterns = analyze_lob_patterns(filtered_df)
+        lob_patterns = analyze_lob_patterns(counts)
         st.write("📋 Detailed LOB Breakdown")
         for lob, data in lob_patterns.items():
             with st.expander(f"📌 {lob} - {data['total_submissions']} submissions"):
@@ -1080,14 +962,14 @@ def main():
     
     # Workers Compensation specific analysis
     if 'WC' in selected_lobs:
-        create_wc_analysis_section(filtered_df)
+        create_wc_analysis_section(counts)
     
     # Detailed Data View
     st.subheader("🔍 Detailed Submission Data")
     show_data = st.checkbox("Show Raw Data Analysis")
     if show_data:
         st.dataframe(
-            filtered_df,
+            df[mask],
             use_container_width=True,
             column_config={
                 "RCVD": st.column_config.DateColumn("Received Date"),
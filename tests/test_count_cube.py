@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import SubmissionDataset
+from utils.submission_pipeline import process_submissions
+
+CARRIERS = ['Chubb', 'Guard', 'Travelers']
+LOBS = ['WC', 'GL', 'BOP/PKG', 'Auto']
+SHEETS = ['Sheet A', 'Sheet B', 'Sheet C']
+
+
+def sample_dataset(rows=300, seed=11):
+    rng = np.random.default_rng(seed)
+    cells = np.array([np.nan, np.nan, 1200, '$950', 'decl', 'Declined', 'x', None], dtype=object)
+    raw = pd.DataFrame({
+        'Applicant': [f"Applicant {i}" for i in range(rows)],
+        'LOB': rng.choice(LOBS, rows),
+        'Source_Sheet': rng.choice(SHEETS, rows),
+        'RCVD': pd.Timestamp('2024-10-20') + pd.to_timedelta(rng.integers(0, 150, rows), unit='D'),
+        'WC Class Code': rng.choice(np.array([8810, 5183, 8380, np.nan], dtype=object), rows),
+    })
+    for carrier in CARRIERS:
+        raw[carrier] = rng.choice(cells, rows)
+    return SubmissionDataset('test', process_submissions(raw))
+
+
+def responded(cells):
+    return cells.notna()
+
+
+def quoted(cells):
+    return pd.to_numeric(cells.astype(str).str.replace('$', '', regex=False), errors='coerce').notna()
+
+
+def declined(cells):
+    return cells.notna() & cells.astype(str).str.lower().str.contains('decl')
+
+
+class CountCubeSlices(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = sample_dataset()
+        cls.df = cls.dataset.view()
+
+    def views(self):
+        """(cube slice, the same rows selected with pandas) for a range of sidebar filters"""
+        df = self.df
+        codes = df['WC_Class_Code'].astype(str)
+        for start, end in [('2024-10-01', '2025-06-30'), ('2024-11-15', '2025-01-20'), ('2024-12-03', '2024-12-03'),
+                           ('2026-01-01', '2026-02-01')]:
+            rows = self.dataset.dates.row_slice(start, end)
+            in_dates = np.zeros(len(df), dtype=bool)
+            in_dates[rows] = True
+            for lobs, sheets, class_codes in [(LOBS, SHEETS, None), (['WC', 'GL'], ['Sheet B'], None),
+                                              (LOBS, SHEETS, ['8810', 'Unknown']), (['WC'], SHEETS, ['5183']),
+                                              ([], SHEETS, None)]:
+                keep = in_dates & df['LOB'].isin(lobs).to_numpy() & df['Source_Sheet'].isin(sheets).to_numpy()
+                if class_codes is not None:
+                    keep &= ((df['LOB'] != 'WC') | codes.isin(class_codes)).to_numpy()
+                cube_slice = self.dataset.cube.query({'LOB': lobs, 'Source_Sheet': sheets}, rows, class_codes)
+                yield cube_slice, df[keep], (start, end, lobs, sheets, class_codes)
+
+    def test_totals_and_responses(self):
+        for cube_slice, view, label in self.views():
+            self.assertEqual(cube_slice.total, len(view), label)
+            expected = pd.Series({carrier: int(responded(view[carrier]).sum()) for carrier in CARRIERS})
+            pd.testing.assert_series_equal(cube_slice.responses()[CARRIERS], expected, check_dtype=False,
+                                           check_names=False, obj=str(label))
+
+    def test_lob_and_month_counts(self):
+        for cube_slice, view, label in self.views():
+            lob_counts = cube_slice.lob_counts()
+            self.assertEqual(lob_counts.to_dict(), view['LOB'].astype(str).value_counts().to_dict(), label)
+            self.assertTrue(lob_counts.is_monotonic_decreasing, label)
+            expected = view.groupby(view['Month_Year'].astype(str)).size()
+            self.assertEqual(cube_slice.month_counts().to_dict(), expected.to_dict(), label)
+
+    def test_lob_carrier_counts(self):
+        for cube_slice, view, label in self.views():
+            table = cube_slice.lob_carrier_counts().set_index(['LOB', 'Carrier'])
+            for (lob, carrier), row in table.iterrows():
+                cells = view.loc[view['LOB'] == lob, carrier]
+                self.assertEqual(row['Submissions'], len(cells), label)
+                self.assertEqual(row['Responses'], responded(cells).sum(), label)
+                self.assertEqual(row['Quoted'], quoted(cells).sum(), label)
+                self.assertEqual(row['Declined'], declined(cells).sum(), label)
+            self.assertEqual(set(table.index.get_level_values('LOB')), set(view['LOB'].astype(str)), label)
+
+    def test_for_lob_and_class_codes(self):
+        for cube_slice, view, label in self.views():
+            wc = view[view['LOB'] == 'WC']
+            self.assertEqual(cube_slice.for_lob('WC').total, len(wc), label)
+            self.assertEqual(cube_slice.for_lob('Nope').total, 0, label)
+            self.assertEqual(cube_slice.class_code_counts().to_dict(), wc['WC Class Code'].value_counts().to_dict(),
+                             label)
+
+
+if __name__ == '__main__':
+    unittest.main()
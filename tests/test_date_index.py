@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.date_index import DAY_COLUMN, DateIndex, sort_by_received
+
+
+def sample_frame(rows=200, seed=7):
+    rng = np.random.default_rng(seed)
+    received = pd.Timestamp('2024-11-01') + pd.to_timedelta(rng.integers(0, 120 * 24 * 60, rows), unit='min')
+    received = pd.Series(received)
+    received[rng.random(rows) < 0.1] = pd.NaT
+    return pd.DataFrame({'RCVD': received, 'n': np.arange(rows)})
+
+
+class DateIndexRanges(unittest.TestCase):
+
+    def setUp(self):
+        self.raw = sample_frame()
+        self.df = sort_by_received(self.raw.copy())
+        self.index = DateIndex.from_frame(self.df)
+
+    def test_sort_is_stable_by_received_day(self):
+        expected = self.raw.assign(day=self.raw['RCVD'].dt.floor('D')).sort_values(
+            'day', kind='stable', na_position='first')
+        np.testing.assert_array_equal(self.df['n'], expected['n'])
+        self.assertTrue(self.df[DAY_COLUMN].is_monotonic_increasing)
+
+    def test_row_slice_matches_pandas_filter(self):
+        day = self.df['RCVD'].dt.normalize()
+        for start, end in [('2024-11-01', '2025-02-28'), ('2024-12-15', '2024-12-15'), ('2024-12-31', '2025-01-02'),
+                           ('2023-01-01', '2024-10-31'), ('2025-03-01', '2025-12-31'), ('2025-01-10', '2025-01-05')]:
+            expected = np.flatnonzero(((day >= start) & (day <= end)).to_numpy())
+            rows = np.arange(len(self.df))[self.index.row_slice(start, end)]
+            np.testing.assert_array_equal(rows, expected, f"{start}..{end}")
+
+    def test_times_and_datetimes_select_whole_days(self):
+        by_string = self.index.row_slice('2024-12-01', '2024-12-31')
+        self.assertEqual(self.index.row_slice(pd.Timestamp('2024-12-01 18:30'), pd.Timestamp('2024-12-31 00:01')),
+                         by_string)
+
+    def test_day_column_or_received_dates(self):
+        np.testing.assert_array_equal(DateIndex.from_frame(self.df.drop(columns=DAY_COLUMN)).days, self.index.days)
+
+    def test_without_received_dates_every_range_is_all_rows(self):
+        index = DateIndex.from_frame(self.df[['n']])
+        self.assertEqual(index.row_slice('2024-01-01', '2024-01-31'), slice(0, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.category_index import CategoryIndex
+from utils.filter_bitmaps import FilterBitmaps
+
+
+def sample_frame(rows=101, seed=3):
+    rng = np.random.default_rng(seed)
+    lob = pd.Series(rng.choice(['WC', 'GL', 'BOP', 'Auto', 'Umbrella', None], rows), dtype=object)
+    sheet = pd.Series(rng.choice(['Jan', 'Feb', 'Mar', None], rows, p=[0.4, 0.3, 0.2, 0.1]), dtype=object)
+    return pd.DataFrame({'LOB': lob.astype('category'), 'Source_Sheet': sheet.astype('category')})
+
+
+class FilterBitmapMasks(unittest.TestCase):
+
+    def setUp(self):
+        self.df = sample_frame()
+        self.bitmaps = FilterBitmaps.from_categories(CategoryIndex.from_frame(self.df), len(self.df))
+
+    def expected(self, selections, rows=slice(None)):
+        """The same filter with pandas isin"""
+        keep = pd.Series(True, index=self.df.index)
+        for column, selected in selections.items():
+            keep &= self.df[column].isin(selected)
+        in_rows = np.zeros(len(self.df), dtype=bool)
+        in_rows[rows] = True
+        return keep.to_numpy() & in_rows
+
+    def test_masks_match_pandas(self):
+        selections = [
+            {},
+            {'LOB': ['WC']},
+            {'LOB': ['WC', 'GL', 'BOP', 'Auto']},
+            {'LOB': ['WC', 'GL', 'BOP', 'Auto', 'Umbrella']},
+            {'LOB': []},
+            {'LOB': ['Nope']},
+            {'Source_Sheet': ['Jan', 'Mar']},
+            {'LOB': ['GL', 'Umbrella'], 'Source_Sheet': ['Feb']},
+            {'LOB': ['WC', 'GL', 'BOP'], 'Source_Sheet': ['Jan', 'Feb', 'Mar']},
+        ]
+        for rows in [slice(None), slice(0, 0), slice(3, 5), slice(5, 90), slice(16, 24), slice(60, None)]:
+            for selection in selections:
+                np.testing.assert_array_equal(self.bitmaps.mask(selection, rows), self.expected(selection, rows),
+                                              f"{selection} {rows}")
+
+    def test_columns_without_bitmaps_do_not_filter(self):
+        np.testing.assert_array_equal(self.bitmaps.mask({'Member': ['Buckley']}), np.ones(len(self.df), dtype=bool))
+
+    def test_cached_masks_are_shared_and_read_only(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return self.bitmaps.mask({'LOB': ['WC']})
+
+        first = self.bitmaps.cached_mask('wc', compute)
+        self.assertIs(self.bitmaps.cached_mask('wc', compute), first)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(first.flags.writeable)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.group_kernels import encode_keys, group_counts, group_distinct, group_means, group_sums, top_k
+
+
+def sample_frame(rows=500, seed=5):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'lob': pd.Categorical(rng.choice(['WC', 'GL', 'BOP', 'Auto', None], rows),
+                              categories=['Auto', 'BOP', 'GL', 'Umbrella', 'WC']),
+        'sheet': pd.Categorical(rng.choice(['Jan', 'Feb', 'Mar'], rows)),
+        'premium': rng.choice([np.nan, 100.0, 250.5, 1200.0, 0.0], rows),
+        'other': rng.normal(1000, 200, rows),
+    })
+    df.loc[rng.random(rows) < 0.2, 'other'] = np.nan
+    return df
+
+
+class GroupKernels(unittest.TestCase):
+
+    def setUp(self):
+        self.df = sample_frame()
+        self.lob = self.df['lob'].cat.codes.to_numpy()
+        self.n_lobs = len(self.df['lob'].cat.categories)
+        self.sheet = self.df['sheet'].cat.codes.to_numpy()
+        self.n_sheets = len(self.df['sheet'].cat.categories)
+
+    def by_lob(self, series):
+        """Per-LOB pandas aggregate in category order, including LOBs that never occur"""
+        return series.reindex(self.df['lob'].cat.categories).to_numpy()
+
+    def test_group_counts(self):
+        expected = self.by_lob(self.df.groupby('lob', observed=False).size())
+        np.testing.assert_array_equal(group_counts(self.lob, self.n_lobs), expected)
+        weighted = self.by_lob(self.df.groupby('lob', observed=False)['other'].sum())
+        np.testing.assert_allclose(group_counts(self.lob, self.n_lobs, weights=self.df['other'].fillna(0)), weighted)
+
+    def test_encode_keys(self):
+        keys, n_keys = encode_keys([self.lob, self.sheet], [self.n_lobs, self.n_sheets])
+        self.assertEqual(n_keys, self.n_lobs * self.n_sheets)
+        expected = self.df.groupby(['lob', 'sheet'], observed=False).size().to_numpy()
+        np.testing.assert_array_equal(group_counts(keys, n_keys), expected)
+        # A missing code in any array leaves the row out
+        np.testing.assert_array_equal(keys < 0, self.df['lob'].isna().to_numpy())
+
+    def test_group_sums(self):
+        expected = self.by_lob(self.df.groupby('lob', observed=False)['premium'].sum())
+        np.testing.assert_allclose(group_sums(self.lob, self.df['premium'], self.n_lobs), expected)
+        both = self.df.groupby('lob', observed=False)[['premium', 'other']].sum()
+        np.testing.assert_allclose(group_sums(self.lob, self.df[['premium', 'other']].to_numpy(), self.n_lobs),
+                                   both.reindex(self.df['lob'].cat.categories).to_numpy())
+
+    def test_group_means(self):
+        expected = self.by_lob(self.df.groupby('lob', observed=False)['other'].mean())
+        np.testing.assert_allclose(group_means(self.lob, self.df['other'], self.n_lobs), expected)
+        both = self.df.groupby('lob', observed=False)[['premium', 'other']].mean()
+        np.testing.assert_allclose(group_means(self.lob, self.df[['premium', 'other']].to_numpy(), self.n_lobs),
+                                   both.reindex(self.df['lob'].cat.categories).to_numpy())
+
+    def test_group_distinct(self):
+        expected = self.by_lob(self.df.groupby('lob', observed=False)['sheet'].nunique())
+        np.testing.assert_array_equal(group_distinct(self.lob, self.sheet, self.n_lobs), expected)
+        # Sparse values take the np.unique path instead of the dense table
+        codes, _ = pd.factorize(self.df['other'])
+        expected = self.by_lob(self.df.groupby('lob', observed=False)['other'].nunique())
+        np.testing.assert_array_equal(group_distinct(self.lob, codes, self.n_lobs), expected)
+
+    def test_top_k(self):
+        counts = group_counts(self.lob, self.n_lobs)
+        sizes = self.df.groupby('lob', observed=True).size()
+        expected = sorted(sizes.index, key=lambda lob: (-sizes[lob], list(sizes.index).index(lob)))
+        order = top_k(counts)
+        self.assertEqual([self.df['lob'].cat.categories[i] for i in order], expected)
+        np.testing.assert_array_equal(top_k(counts, 2), order[:2])
+        # Ties keep position order; zero counts are left out
+        np.testing.assert_array_equal(top_k(np.array([3, 0, 5, 3, 0, 5])), [2, 5, 0, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
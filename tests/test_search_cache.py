@@ -0,0 +1,50 @@
+import unittest
+from collections import namedtuple
+
+import numpy as np
+
+from utils.search_cache import SearchCache
+
+# Stand-in for a SearchResult: the cache only needs nbytes and complete
+Result = namedtuple('Result', ['nbytes', 'complete'])
+
+
+class SearchCacheStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SearchCache(max_bytes=1 << 20)
+        self.key = SearchCache.key('dataset:v5', 'plumb*', np.ones(10, dtype=bool))
+        self.calls = 0
+
+    def compute(self, result):
+        def run():
+            self.calls += 1
+            return result
+        return run
+
+    def test_complete_results_are_stored(self):
+        result = Result(nbytes=100, complete=True)
+        self.assertIs(self.cache.get_or_compute(self.key, self.compute(result)), result)
+        self.assertIs(self.cache.get_or_compute(self.key, self.compute(result)), result)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_no_match_results_are_stored(self):
+        self.assertIsNone(self.cache.get_or_compute(self.key, self.compute(None)))
+        self.assertIsNone(self.cache.get_or_compute(self.key, self.compute(None)))
+        self.assertEqual(self.calls, 1)
+
+    def test_incomplete_results_are_not_stored(self):
+        simplified = Result(nbytes=100, complete=False)
+        self.assertIs(self.cache.get_or_compute(self.key, self.compute(simplified)), simplified)
+        self.assertEqual(len(self.cache), 0)
+
+        # The next request runs the query again and can store a complete result
+        full = Result(nbytes=100, complete=True)
+        self.assertIs(self.cache.get_or_compute(self.key, self.compute(full)), full)
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(len(self.cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
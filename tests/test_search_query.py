@@ -0,0 +1,118 @@
+import re
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import SubmissionDataset
+from utils.search_query import (
+    MAX_QUERY_LENGTH, MAX_QUERY_TERMS, QuerySyntaxError, parse_query, run_query
+)
+from utils.submission_pipeline import process_submissions
+
+
+def sample_dataset():
+    raw = pd.DataFrame({
+        'Applicant': ['Acme Plumbing', 'Roof Kings', 'Auto Repair Shop', 'Joe Plumber', 'Bakery Inc',
+                      'Repair Auto Body'],
+        'Desc of Ops': ['plumbing contractor', 'roof repair', 'auto repair', 'residential plumbing', 'bakery',
+                        'body shop'],
+        'LOB': ['WC', 'GL', 'WC', 'WC', 'GL', 'Auto'],
+        'Member': ['Buckley', 'Pacific', 'Buckley', 'Pacific', 'Buckley', 'Pacific'],
+        'RCVD': pd.date_range('2025-01-01', periods=6, freq='7D'),
+        'Source_Sheet': ['Jan 2025'] * 3 + ['Feb 2025'] * 3,
+        'NOTES': ['declined', 'Bound LM', '', 'quoted', np.nan, 'bound with HF'],
+        'WC Class Code': [5183, np.nan, 8380, np.nan, np.nan, np.nan],
+    })
+    return SubmissionDataset('test', process_submissions(raw))
+
+
+def term(value, field=None):
+    return ('term', field, value, None)
+
+
+class ParseQuery(unittest.TestCase):
+
+    def test_and_binds_tighter_than_or(self):
+        self.assertEqual(parse_query('a OR b c'), ('or', [term('a'), ('and', [term('b'), term('c')])]))
+        self.assertEqual(parse_query('a AND b OR c'), ('or', [('and', [term('a'), term('b')]), term('c')]))
+
+    def test_not_binds_tightest(self):
+        self.assertEqual(parse_query('NOT a b'), ('and', [('not', term('a')), term('b')]))
+        self.assertEqual(parse_query('a NOT NOT b'), ('and', [term('a'), ('not', ('not', term('b')))]))
+
+    def test_parentheses_group(self):
+        self.assertEqual(parse_query('(a OR b) c'), ('and', [('or', [term('a'), term('b')]), term('c')]))
+
+    def test_fields(self):
+        self.assertEqual(parse_query('LOB:WC'), term('WC', 'lob'))
+        self.assertEqual(parse_query('desc:plumb*'), term('plumb*', 'desc'))
+        # Unknown fields are plain text
+        self.assertEqual(parse_query('dba:acme'), term('dba:acme'))
+
+    def test_quoted_phrases(self):
+        _, field, value, phrase = parse_query('desc:"auto repair"')
+        self.assertEqual((field, value), ('desc', 'auto repair'))
+        self.assertIsNotNone(phrase.search('Auto - Repair'))
+        self.assertIsNone(phrase.search('repair auto'))
+
+    def test_syntax_errors(self):
+        for query in ['', '&', '(a', 'a)', 'a OR', 'AND a', 'NOT', '()', 'x' * (MAX_QUERY_LENGTH + 1),
+                      ' '.join(['a'] * (MAX_QUERY_TERMS + 1))]:
+            with self.assertRaises(QuerySyntaxError, msg=query[:20]):
+                parse_query(query)
+
+
+class RunQuery(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset = sample_dataset()
+        cls.df = cls.dataset.view()
+
+    def words(self, prefix, columns=('Applicant', 'Desc of Ops', 'NOTES')):
+        """Row mask of a word prefix in any of the columns, the pandas way"""
+        pattern = r'(?<!\w)' + re.escape(prefix)
+        return pd.concat([self.df[col].astype('string').str.contains(pattern, case=False).fillna(False)
+                          for col in columns], axis=1).any(axis=1)
+
+    def assertRows(self, query, mask):
+        np.testing.assert_array_equal(run_query(query, self.dataset, budget=None), np.flatnonzero(mask), query)
+
+    def test_terms_and_operators(self):
+        plumb, repair, auto = self.words('plumb'), self.words('repair'), self.words('auto')
+        self.assertRows('plumb', plumb)
+        self.assertRows('plumb OR repair', plumb | repair)
+        self.assertRows('repair auto', repair & auto)
+        self.assertRows('repair NOT auto', repair & ~auto)
+        self.assertRows('NOT plumb', ~plumb)
+        self.assertRows('plumb OR repair NOT auto', plumb | (repair & ~auto))
+        self.assertRows('(plumb OR repair) NOT auto', (plumb | repair) & ~auto)
+
+    def test_field_scoping(self):
+        self.assertRows('desc:plumb', self.words('plumb', ['Desc of Ops']))
+        self.assertRows('name:repair', self.words('repair', ['Applicant']))
+        self.assertRows('notes:bound', self.words('bound', ['NOTES']))
+        self.assertRows('lob:wc', self.df['LOB'] == 'WC')
+        self.assertRows('member:buckley lob:GL', (self.df['Member'] == 'Buckley') & (self.df['LOB'] == 'GL'))
+        self.assertRows('sheet:*2025', self.df['Source_Sheet'].astype(str).str.endswith('2025'))
+        # Class codes are searched on WC submissions only
+        wc = self.df['LOB'] == 'WC'
+        self.assertRows('class:8380', wc & (self.df['WC_Class_Code'] == '8380'))
+        self.assertRows('class:5*', wc & self.df['WC_Class_Code'].str.startswith('5'))
+        self.assertRows('class:unknown', wc & (self.df['WC_Class_Code'] == 'Unknown'))
+        self.assertRows('bound:LM', self.df['bound_carrier'] == 'Liberty Mutual')
+        self.assertRows('carrier:"the hartford"', self.df['bound_carrier'] == 'Hartford')
+
+    def test_quoted_phrases(self):
+        phrase = self.df['Desc of Ops'].str.contains(r'\bauto\W+repair\b', case=False)
+        self.assertRows('desc:"auto repair"', phrase)
+        self.assertRows('"repair auto"', self.df['Applicant'].str.contains(r'\brepair\W+auto\b', case=False))
+
+    def test_bare_wildcard_matches_every_row(self):
+        self.assertRows('*', np.ones(len(self.df), dtype=bool))
+        self.assertRows('* lob:WC', self.df['LOB'] == 'WC')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import pandas as pd
+
+from utils.process_excel_data import process_new_excel_data
+from utils.submission_schema import read_submission_csv
+
+
+def write_workbook(path):
+    """A two-sheet workbook shaped like the master log"""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for month, day in (('JULY', 1), ('AUGUST', 4)):
+        sheet = workbook.create_sheet(month.title())
+        sheet.append(['APPLICANT', 'AGENCY', 'RCVD', 'EFF DATE', 'LOB', 'Chubb'])
+        sheet.append([month, None, None, None, None, None])
+        sheet.append([f"{month.title()} Plumbing LLC", 'Buckley', datetime(2025, 7, day),
+                      datetime(2025, 8, day), 'WC', 1250])
+        sheet.append([f"{month.title()} Bakery", 'Pacific', datetime(2025, 7, day + 1),
+                      datetime(2025, 8, day + 1), 'BOP', 'decl'])
+    workbook.save(path)
+
+
+class ReadSubmissionCsvDates(unittest.TestCase):
+
+    def test_round_trips_csv_written_by_process_excel_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'log.xlsx')
+            write_workbook(path)
+            processed = process_new_excel_data(path, max_workers=1, engine='openpyxl')
+            csv = processed.to_csv(index=False)
+
+        loaded = read_submission_csv(io.StringIO(csv))
+        self.assertEqual(loaded['RCVD'].notna().sum(), 4)
+        pd.testing.assert_series_equal(loaded['RCVD'], processed['RCVD'], check_names=False)
+        pd.testing.assert_series_equal(loaded['EFF DATE'], processed['EFF DATE'], check_names=False)
+
+    def test_parses_other_date_formats(self):
+        csv = 'Applicant,RCVD\nA,2025-01-15 00:00:00\nB,2025-07-01 00:00:00.000000000\nC,1/15/2025\nD,2025-02-03\n'
+        loaded = read_submission_csv(io.StringIO(csv))
+        expected = pd.to_datetime(['2025-01-15', '2025-07-01', '2025-01-15', '2025-02-03'])
+        self.assertEqual(list(loaded['RCVD']), list(expected))
+
+    def test_warns_when_many_dates_fail(self):
+        csv = 'Applicant,RCVD\nA,2025-01-15 00:00:00\nB,not a date\n'
+        with self.assertLogs('utils.submission_schema', level='WARNING'):
+            loaded = read_submission_csv(io.StringIO(csv))
+        self.assertTrue(pd.isna(loaded['RCVD'].iloc[1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
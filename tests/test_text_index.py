@@ -0,0 +1,62 @@
+import re
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.text_index import ALL_FIELDS, TextIndex, tokenize
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'Applicant': ['Acme Plumbing LLC', 'Plumb Line Inc', 'Roofers R Us', np.nan,
+                      'Café Crème', 'plumbers & pipes', '123 Repairs', 'Bakery'],
+        'Desc of Ops': ['Residential plumbing', np.nan, 'Roof repair; re-plumbing', 'PLUMBING contractor',
+                        'Coffee shop', '', 'Auto repair 8810', 'Bakery and café'],
+    })
+
+
+def prefix_rows(df, columns, prefix):
+    """Rows with a word starting with prefix in any of the columns, the pandas way"""
+    pattern = r'(?<!\w)' + re.escape(prefix)
+    hits = pd.concat([df[col].astype('string').str.casefold().str.contains(pattern, regex=True).fillna(False)
+                      for col in columns], axis=1).any(axis=1)
+    return np.flatnonzero(hits.to_numpy())
+
+
+class TextIndexPrefixRanges(unittest.TestCase):
+
+    def setUp(self):
+        self.df = sample_frame()
+        self.index = TextIndex.from_frame(self.df, ['Applicant', 'Desc of Ops'])
+
+    def test_terms_are_sorted_distinct_tokens(self):
+        tokens = {token for col in ('Applicant', 'Desc of Ops') for value in self.df[col] for token in tokenize(value)}
+        self.assertEqual(self.index.terms, sorted(tokens))
+
+    def test_prefix_range_spans_terms_with_the_prefix(self):
+        for prefix in ['plumb', 'p', 'ro', 'caf', 'zzz', '8', '']:
+            lo, hi = self.index.prefix_range(prefix)
+            self.assertEqual(self.index.terms[lo:hi], [term for term in self.index.terms if term.startswith(prefix)],
+                             prefix)
+
+    def test_rows_for_prefix_match_pandas(self):
+        for prefix in ['plumb', 'plumbing', 'p', 'repair', 'caf', 'crème', '88', 'zzz']:
+            for field, columns in [(ALL_FIELDS, ['Applicant', 'Desc of Ops']), ('Applicant', ['Applicant']),
+                                   ('Desc of Ops', ['Desc of Ops'])]:
+                np.testing.assert_array_equal(self.index.rows_for_prefix(prefix, field),
+                                              prefix_rows(self.df, columns, prefix), f"{prefix} in {field}")
+
+    def test_match_term_wildcards(self):
+        # '*' inside a term matches any run of characters within one word
+        expected = [i for i in range(len(self.df))
+                    if any(re.fullmatch(r'.*plumb.*', token) for col in ('Applicant', 'Desc of Ops')
+                           for token in tokenize(self.df[col][i]))]
+        np.testing.assert_array_equal(self.index.match_term('*plumb'), expected)
+        np.testing.assert_array_equal(self.index.match_term('plumb*'), self.index.rows_for_prefix('plumb'))
+        np.testing.assert_array_equal(self.index.match_term('r*pair'),
+                                      prefix_rows(self.df, ['Applicant', 'Desc of Ops'], 'repair'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.text_index import TextIndex, tokenize
+from utils.trigram_index import TrigramIndex, trigrams
+
+COLUMNS = ['Applicant', 'Desc of Ops']
+
+
+def sample_frame():
+    return pd.DataFrame({
+        'Applicant': ['Acme Plumbing LLC', 'Plumb Line Inc', 'Roofers R Us', np.nan,
+                      'Plumber Joe', 'Bakery Bros', 'Electric Co', 'Pipe & Plumbing'],
+        'Desc of Ops': ['Residential plumbing', 'Plumbing contractor', 'Roofing repair', 'Plumbng service',
+                        np.nan, 'Bakery', 'Electrical contractor', 'Plumbing repair'],
+        'NOTES': ['plumbing', 'x', 'x', 'x', 'x', 'x', 'x', 'x'],
+    })
+
+
+def dice(a, b):
+    a, b = set(trigrams(a)), set(trigrams(b))
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def brute_force(df, query, threshold):
+    """Every row scored by its best word per query word, averaged over the query words"""
+    words = tokenize(query)
+    rows, scores = [], []
+    for i in range(len(df)):
+        row_words = {word for col in COLUMNS for word in tokenize(df[col][i])}
+        best = [max([dice(word, row_word) for row_word in row_words if dice(word, row_word) >= threshold],
+                    default=None) for word in words]
+        if all(score is not None for score in best):
+            rows.append(i)
+            scores.append(sum(best) / len(words))
+    order = np.lexsort((rows, -np.array(scores)))
+    return np.array(rows)[order], np.array(scores)[order]
+
+
+class TrigramIndexSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.df = sample_frame()
+        text_index = TextIndex.from_frame(self.df, COLUMNS + ['NOTES'])
+        self.index = TrigramIndex.from_text_index(text_index, COLUMNS)
+
+    def test_only_words_of_the_fuzzy_columns_are_indexed(self):
+        words = {word for col in COLUMNS for value in self.df[col] for word in tokenize(value)}
+        indexed = {self.index.text_index.terms[i] for i in self.index.term_positions}
+        self.assertEqual(indexed, words)
+
+    def test_similar_terms_match_brute_force_dice(self):
+        terms = self.index.text_index.terms
+        for word in ['plumbng', 'roof', 'bakry', 'qqq']:
+            positions, scores = self.index.similar_terms(word, 0.4)
+            found = {terms[i]: score for i, score in zip(positions, scores)}
+            expected = {terms[i]: dice(word, terms[i]) for i in self.index.term_positions
+                        if dice(word, terms[i]) >= 0.4}
+            self.assertEqual(found.keys(), expected.keys(), word)
+            for term, score in expected.items():
+                self.assertAlmostEqual(found[term], score)
+            self.assertTrue(np.all(np.diff(scores) <= 0), word)
+
+    def test_search_matches_brute_force(self):
+        for query in ['plumbng', 'plumbing contractr', 'bakery', 'elctric', 'zzzz']:
+            rows, scores = self.index.search(query, threshold=0.4)
+            expected_rows, expected_scores = brute_force(self.df, query, 0.4)
+            np.testing.assert_array_equal(rows, expected_rows, query)
+            np.testing.assert_allclose(scores, expected_scores, err_msg=query)
+
+    def test_row_mask_and_top_k(self):
+        rows, _ = self.index.search('plumbing')
+        mask = np.zeros(len(self.df), dtype=bool)
+        mask[::2] = True
+        masked, _ = self.index.search('plumbing', row_mask=mask)
+        np.testing.assert_array_equal(masked, [row for row in rows if mask[row]])
+        top, _ = self.index.search('plumbing', top_k=2)
+        np.testing.assert_array_equal(top, rows[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import re
+import unittest
+
+import pandas as pd
+
+from utils.wildcard import WildcardPattern, compile_wildcard
+
+TEXTS = pd.Series(['plumbing', 'plumb', 'replumbing', 'plum', 'p', '', 'a*b', 'a.b', 'axb', 'aaab',
+                   'plumbing plumbing', '(x)+', 'abcabc', 'ab'])
+
+PATTERNS = ['plumb', 'plumb*', '*plumb', '*plumb*', 'p*g', '*', '**', '', 'a.b', 'a*b', 'a**b',
+            '(x)+', 'a*a*b', '*abc', 'ab*ab*', 'abc*abc', 'abcabc*abc']
+
+
+def regex(pattern):
+    """The same pattern as a regular expression: '*' is '.*', everything else literal"""
+    return '.*'.join(re.escape(piece) for piece in pattern.split('*'))
+
+
+class WildcardPatternMatching(unittest.TestCase):
+
+    def test_fullmatch_agrees_with_pandas(self):
+        for pattern in PATTERNS:
+            expected = TEXTS.str.fullmatch(regex(pattern)).tolist()
+            found = [WildcardPattern(pattern).fullmatch(text) for text in TEXTS]
+            self.assertEqual(found, expected, pattern)
+
+    def test_match_prefix_agrees_with_pandas(self):
+        for pattern in PATTERNS:
+            expected = TEXTS.str.match(regex(pattern)).tolist()
+            found = [WildcardPattern(pattern).match_prefix(text) for text in TEXTS]
+            self.assertEqual(found, expected, pattern)
+
+    def test_prefix_and_has_wildcard(self):
+        self.assertEqual(WildcardPattern('plu*ing').prefix, 'plu')
+        self.assertEqual(WildcardPattern('*ing').prefix, '')
+        self.assertTrue(WildcardPattern('a**').has_wildcard)
+        self.assertFalse(WildcardPattern('a.b').has_wildcard)
+
+    def test_long_runs_of_stars_stay_fast(self):
+        # Would backtrack badly as the regex 'a.*a.*...b' against a run of 'a'
+        pattern = WildcardPattern('a*' * 30 + 'b')
+        self.assertFalse(pattern.fullmatch('a' * 5000))
+        self.assertTrue(pattern.fullmatch('a' * 5000 + 'b'))
+
+    def test_compiled_patterns_are_shared(self):
+        self.assertIs(compile_wildcard('roof*'), compile_wildcard('roof*'))
+
+
+if __name__ == '__main__':
+    unittest.main()
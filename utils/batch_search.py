@@ -0,0 +1,142 @@
+"""
+Carrier appetite stats for a list of trades in one run: every keyword is
+looked up in the dataset's search indexes (no pass over the text columns per
+keyword) and all per-keyword statistics come from one grouped reduction.
+
+Run from the project root:
+    python -m utils.batch_search trades.txt [--data data/combined_submission_log.csv] [--output appetite.csv]
+
+trades.txt holds one search per line (any query the search box accepts, e.g.
+'plumb*' or 'desc:roof* AND lob:WC'); blank lines and lines starting with '#'
+are skipped.
+"""
+import argparse
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.carrier_quotes import BLANK
+from utils.dataset import SubmissionDataset
+from utils.group_kernels import encode_keys, group_counts, top_k
+from utils.search_query import QuerySyntaxError, search_with_fallback
+from utils.submission_pipeline import load_processed_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_FILE = 'data/combined_submission_log.csv'
+
+# Labels listed in the 'Top LOBs' and 'Top Carriers' columns
+TOP_LABELS = 3
+
+COLUMNS = ['Keyword', 'Matches', 'Top LOBs', 'Quoting Carriers', 'Top Carriers',
+           'Quotes', 'Bound', 'Bind Rate', 'Note']
+
+
+def read_keywords(lines):
+    """Searches from text lines, skipping blanks, comments and repeats"""
+    keywords = []
+    for line in lines:
+        keyword = line.strip()
+        if keyword and not keyword.startswith('#') and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+def _top(counts, labels):
+    """'label (count), ...' for the largest non-zero counts"""
+    return ', '.join(f"{labels[i]} ({counts[i]})" for i in top_k(counts, TOP_LABELS))
+
+
+def batch_search(dataset, keywords, row_mask=None):
+    """
+    One row per keyword: matching submissions, their top LOBs, how many
+    carriers responded and the top responding carriers, total quotes (any
+    response, as the dashboard counts them),
+    bound submissions and bind rate (bound / matches, %). row_mask (a boolean
+    array over all dataset rows) restricts the submissions considered.
+    Keywords that are not valid queries get 0 matches and a Note.
+    """
+    notes = [''] * len(keywords)
+    row_parts = []
+    for k, keyword in enumerate(keywords):
+        try:
+            rows, complete = search_with_fallback(keyword, dataset)
+        except QuerySyntaxError as e:
+            notes[k] = f"Invalid search: {e}"
+            rows, complete = np.empty(0, dtype=np.int64), True
+        if not complete:
+            notes[k] = "Simplified after exceeding the time budget"
+        if row_mask is not None:
+            rows = rows[row_mask[rows]]
+        row_parts.append(np.asarray(rows, dtype=np.int64))
+
+    # All matches in one array, grouped by keyword
+    matches = np.array([len(rows) for rows in row_parts], dtype=np.int64)
+    rows = np.concatenate(row_parts) if row_parts else np.empty(0, dtype=np.int64)
+    keyword_ids = np.repeat(np.arange(len(keywords)), matches)
+    starts = np.concatenate([[0], np.cumsum(matches)[:-1]]).astype(np.int64)
+
+    frame = dataset.view()
+    lob = frame['LOB'].astype('category')
+    lob_labels = list(lob.cat.categories)
+    lob_codes = lob.cat.codes.to_numpy()[rows]
+    keys, n_keys = encode_keys([keyword_ids, lob_codes], [len(keywords), len(lob_labels)])
+    lob_counts = group_counts(keys, n_keys).reshape(len(keywords), len(lob_labels))
+
+    # A quote is any non-blank carrier cell, like CubeSlice.responses()
+    responded = (dataset.carriers.status[rows] != BLANK).astype(np.int64)
+    carrier_quotes = np.zeros((len(keywords), responded.shape[1]), dtype=np.int64)
+    has_rows = matches > 0
+    if rows.size:
+        carrier_quotes[has_rows] = np.add.reduceat(responded, starts[has_rows], axis=0)
+
+    is_bound = (frame['bound_source'] != '').to_numpy()
+    bound = group_counts(keyword_ids[is_bound[rows]], len(keywords))
+
+    table = pd.DataFrame({
+        'Keyword': keywords,
+        'Matches': matches,
+        'Top LOBs': [_top(counts, lob_labels) for counts in lob_counts],
+        'Quoting Carriers': (carrier_quotes > 0).sum(axis=1),
+        'Top Carriers': [_top(counts, dataset.carriers.columns) for counts in carrier_quotes],
+        'Quotes': carrier_quotes.sum(axis=1),
+        'Bound': bound,
+        'Bind Rate': np.divide(bound * 100.0, matches, out=np.zeros(len(keywords)), where=has_rows),
+        'Note': notes,
+    })
+    return table[COLUMNS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('keywords', help="file with one search per line ('-' for stdin)")
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE, help='submission log (.csv or .xlsx)')
+    parser.add_argument('--output', help='write the table to this CSV file instead of printing it')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+    if args.keywords == '-':
+        keywords = read_keywords(sys.stdin)
+    else:
+        with open(args.keywords, encoding='utf-8') as handle:
+            keywords = read_keywords(handle)
+
+    frame = load_processed_file(args.data)
+    if frame is None:
+        sys.exit(f"Could not load {args.data}")
+    table = batch_search(SubmissionDataset(args.data, frame, args.data), keywords)
+    # One decimal, as the dashboard shows it
+    table['Bind Rate'] = table['Bind Rate'].round(1)
+
+    if args.output:
+        table.to_csv(args.output, index=False)
+        logger.info(f"Wrote {len(table)} keywords to {args.output}")
+    else:
+        with pd.option_context('display.max_rows', None, 'display.width', 200, 'display.max_colwidth', 60):
+            print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
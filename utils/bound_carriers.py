@@ -0,0 +1,90 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.submission_schema import CARRIER_COLUMNS
+
+# Free-text carrier names (case-folded, single-spaced) -> carrier column name
+CARRIER_ALIASES = {carrier.casefold(): carrier for carrier in CARRIER_COLUMNS if carrier != 'Other'}
+CARRIER_ALIASES.update({
+    'lm': 'Liberty Mutual',
+    'liberty': 'Liberty Mutual',
+    'lib mut': 'Liberty Mutual',
+    'libmut': 'Liberty Mutual',
+    'hf': 'Hartford',
+    'the hartford': 'Hartford',
+    'hartord': 'Hartford',
+    'c n a': 'CNA',
+    'gaurd': 'Guard',
+    'travelres': 'Travelers',
+    'amt': 'AmTrust',
+    'phly': 'Philadelphia',
+    'phly e&s': 'Philadelphia',
+    'preferred employers': 'Preferred',
+})
+
+# bound_source values
+SOURCE_BOUND_WITH = 'Bound With'
+SOURCE_NOTES = 'Notes'
+
+NOTES_COLUMNS = ['NOTES', 'Notes']
+
+_WHITESPACE = re.compile(r'\s+')
+# Text following the word 'bound' in a note: 'Bound LM', 'bound with HF', 'Bound: Guard'
+_AFTER_BOUND = r'\bbound\b[\s:\-]*(?:with\s+)?(.*)'
+# A known carrier name at the start of that text, longest names first so 'liberty mutual' beats 'liberty'
+_LEADING_CARRIER = (r'^(' + '|'.join(re.escape(alias) for alias in sorted(CARRIER_ALIASES, key=len, reverse=True))
+                    + r')(?![a-z0-9])')
+
+
+def normalize_carrier_name(value):
+    """Carrier column name for a free-text carrier; unknown names keep their text, tidied"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    text = _WHITESPACE.sub(' ', str(value)).strip()
+    return CARRIER_ALIASES.get(text.casefold(), text)
+
+
+def normalize_carrier_names(values):
+    """normalize_carrier_name over a column, mapping each distinct value once"""
+    codes, uniques = pd.factorize(values.to_numpy(), use_na_sentinel=True)
+    names = np.array([normalize_carrier_name(value) for value in uniques] + [''], dtype=object)
+    return pd.Series(names[codes], index=values.index)
+
+
+def _notes(df):
+    """The notes text of each row, from whichever notes columns exist"""
+    notes = pd.Series(np.nan, index=df.index, dtype=object)
+    for col in NOTES_COLUMNS:
+        if col in df.columns:
+            notes = notes.where(notes.notna(), df[col])
+    return notes.astype(object)
+
+
+def resolve_bound_carriers(df):
+    """
+    Work out which carrier each submission was bound with.
+
+    'Bound With' wins when filled. Otherwise a note mentioning 'bound' marks
+    the submission bound, with the carrier taken from a known name right after
+    the word ('Bound LM' -> Liberty Mutual). Returns (bound_carrier,
+    bound_source) as categoricals; both are '' for submissions not bound, and
+    bound_carrier is '' when a note says bound but names no known carrier.
+    """
+    if 'Bound With' in df.columns:
+        bound_with = normalize_carrier_names(df['Bound With'])
+    else:
+        bound_with = pd.Series('', index=df.index, dtype=object)
+    has_bound_with = bound_with != ''
+
+    notes = _notes(df).fillna('').astype(str).str.lower()
+    after_bound = notes.str.extract(_AFTER_BOUND, expand=False)
+    notes_bound = after_bound.notna() & ~has_bound_with
+    notes_carrier = after_bound.str.strip().str.extract(_LEADING_CARRIER, expand=False).map(CARRIER_ALIASES)
+
+    bound_carrier = bound_with.where(has_bound_with, notes_carrier.where(notes_bound, '').fillna(''))
+    bound_source = np.select([has_bound_with.to_numpy(), notes_bound.to_numpy()],
+                             [SOURCE_BOUND_WITH, SOURCE_NOTES], '')
+    return (bound_carrier.astype('category'),
+            pd.Series(bound_source, index=df.index).astype('category'))
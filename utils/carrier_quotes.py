@@ -0,0 +1,124 @@
+import numbers
+
+import numpy as np
+import pandas as pd
+
+# Status codes stored in CarrierMatrix.status
+BLANK = 0      # nothing recorded for this carrier
+QUOTED = 1     # a premium amount
+DECLINED = 2   # 'decl', 'declined', 'desk decline', ...
+OTHER = 3      # any other note: 'x', 'blocked', 'submitted', ...
+
+STATUS_LABELS = {BLANK: 'blank', QUOTED: 'quoted', DECLINED: 'declined', OTHER: 'other'}
+N_STATUSES = len(STATUS_LABELS)
+
+# Rows per bincount in group_status_counts (bounds its temporary arrays)
+GROUP_CHUNK_ROWS = 65536
+
+# Lower-cased text containing one of these marks a declination
+DECLINE_MARKERS = ('decl',)
+
+
+def parse_carrier_cell(value):
+    """Return (premium, status) for one raw carrier cell; premium is NaN unless quoted"""
+    if value is None:
+        return np.nan, BLANK
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        if np.isnan(value):
+            return np.nan, BLANK
+        if np.isinf(value):
+            return np.nan, OTHER
+        return float(value), QUOTED
+    text = str(value).strip()
+    if not text:
+        # Whitespace is still an entry in the cell, as pandas' notna() counts it
+        return np.nan, OTHER
+    try:
+        premium = float(text.replace('$', '').replace(',', ''))
+        # Text like 'nan' or 'inf' parses as a float but is not a premium
+        if np.isfinite(premium):
+            return premium, QUOTED
+    except ValueError:
+        pass
+    lowered = text.lower()
+    if any(marker in lowered for marker in DECLINE_MARKERS):
+        return np.nan, DECLINED
+    return np.nan, OTHER
+
+
+class CarrierMatrix:
+    """
+    Every carrier cell of a frame parsed once into two row-aligned arrays:
+    premium (float64, NaN unless quoted) and status (int8 status codes).
+    Row i of each array is row i of the frame; column j is columns[j].
+    """
+
+    def __init__(self, columns, premium, status):
+        self.columns = list(columns)
+        self.premium = premium
+        self.status = status
+
+    @classmethod
+    def from_frame(cls, df, carriers):
+        """Parse the carrier columns present in df, each distinct cell value only once"""
+        columns = [carrier for carrier in carriers if carrier in df.columns]
+        premium = np.full((len(df), len(columns)), np.nan, dtype=np.float64)
+        status = np.zeros((len(df), len(columns)), dtype=np.int8)
+        for j, carrier in enumerate(columns):
+            codes, uniques = pd.factorize(df[carrier].to_numpy(), use_na_sentinel=True)
+            parsed = [parse_carrier_cell(value) for value in uniques]
+            # Missing cells have code -1, which picks the trailing blank entry
+            unique_premium = np.array([p for p, _ in parsed] + [np.nan], dtype=np.float64)
+            unique_status = np.array([s for _, s in parsed] + [BLANK], dtype=np.int8)
+            premium[:, j] = unique_premium[codes]
+            status[:, j] = unique_status[codes]
+        return cls(columns, premium, status)
+
+    @property
+    def nbytes(self):
+        return self.premium.nbytes + self.status.nbytes
+
+    def take(self, rows):
+        """(premium, status) for the given row positions, e.g. a filtered frame's index"""
+        rows = np.asarray(rows)
+        return self.premium[rows], self.status[rows]
+
+
+def group_status_counts(codes, n_groups, status):
+    """
+    Carrier responses per group in one pass: counts[g, j, s] is the number of
+    rows with group code g whose cell for carrier j has status s. codes are
+    integer group codes per row of status (e.g. LOB category codes); rows
+    with a negative code are left out.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    n_carriers = status.shape[1]
+    counts = np.zeros(n_groups * n_carriers * N_STATUSES, dtype=np.int64)
+    # Each (row, carrier) cell adds one to bin (code, carrier, status)
+    carrier_bins = np.arange(n_carriers, dtype=np.int64) * N_STATUSES
+    for start in range(0, len(codes), GROUP_CHUNK_ROWS):
+        chunk = codes[start:start + GROUP_CHUNK_ROWS]
+        keep = chunk >= 0
+        bins = (chunk[keep, None] * (n_carriers * N_STATUSES) + carrier_bins
+                + status[start:start + GROUP_CHUNK_ROWS][keep])
+        counts += np.bincount(bins.ravel(), minlength=len(counts))
+    return counts.reshape(n_groups, n_carriers, N_STATUSES)
+
+
+def tidy_status_counts(counts, labels, carriers, key='LOB'):
+    """
+    group_status_counts output as a long frame with one row per (group,
+    carrier): Submissions in the group, and the carrier's Responses
+    (non-blank cells), Quoted, Declined and Other counts.
+    """
+    n_groups, n_carriers, _ = counts.shape
+    submissions = counts[:, 0].sum(axis=1) if n_carriers else np.zeros(n_groups, dtype=np.int64)
+    return pd.DataFrame({
+        key: np.repeat(np.asarray(labels, dtype=object), n_carriers),
+        'Carrier': np.tile(np.asarray(carriers, dtype=object), n_groups),
+        'Submissions': np.repeat(submissions, n_carriers),
+        'Responses': (counts.sum(axis=2) - counts[:, :, BLANK]).ravel(),
+        'Quoted': counts[:, :, QUOTED].ravel(),
+        'Declined': counts[:, :, DECLINED].ravel(),
+        'Other': counts[:, :, OTHER].ravel(),
+    })
@@ -0,0 +1,80 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.bound_carriers import normalize_carrier_name
+from utils.wildcard import compile_wildcard
+
+# Low-cardinality columns indexed for field-scoped search
+INDEXED_COLUMNS = ['LOB', 'Member', 'Source_Sheet', 'bound_carrier']
+
+# Searched values are spelled the way the column stores them ('LM' -> 'Liberty Mutual')
+VALUE_NORMALIZERS = {'bound_carrier': normalize_carrier_name}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def value_key(value):
+    """Case-folded, single-spaced form used to compare category values"""
+    return _WHITESPACE.sub(' ', str(value)).strip().casefold()
+
+
+class CategoryIndex:
+    """
+    Row ids grouped by category for the indexed columns. For each column the
+    rows are sorted by category code, so the rows of category k are
+    rows[offsets[k]:offsets[k + 1]] (sorted). Row ids are positions in the dataset.
+    """
+
+    def __init__(self, columns):
+        # column -> (categories, offsets, rows)
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        indexed = {}
+        for col in (columns or INDEXED_COLUMNS):
+            if col not in df.columns:
+                continue
+            values = df[col]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            codes = values.cat.codes.to_numpy()
+            order = np.argsort(codes, kind='stable')
+            # Missing values (code -1) sort first and fall outside every category's range
+            offsets = np.searchsorted(codes[order], np.arange(len(values.cat.categories) + 1))
+            indexed[col] = (list(values.cat.categories), offsets, order.astype(np.int32))
+        return cls(indexed)
+
+    @property
+    def nbytes(self):
+        return sum(offsets.nbytes + rows.nbytes for _, offsets, rows in self.columns.values())
+
+    def categories(self, column):
+        return self.columns[column][0] if column in self.columns else []
+
+    def rows_for_codes(self, column, codes):
+        """Sorted row ids of the given category codes"""
+        if column not in self.columns:
+            return np.empty(0, dtype=np.int32)
+        _, offsets, rows = self.columns[column]
+        parts = [rows[offsets[code]:offsets[code + 1]] for code in codes]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        if len(parts) == 1:
+            return parts[0]
+        return np.unique(np.concatenate(parts))
+
+    def rows_for_value(self, column, value):
+        """
+        Sorted row ids whose value equals value, ignoring case and spacing;
+        '*' in value is a wildcard ('*2025' matches every 2025 sheet). Carrier
+        abbreviations are expanded for bound_carrier ('LM', '"lib mut"').
+        """
+        if column in VALUE_NORMALIZERS:
+            value = VALUE_NORMALIZERS[column](value)
+        pattern = compile_wildcard(value_key(value))
+        codes = [k for k, category in enumerate(self.categories(column))
+                 if pattern.fullmatch(value_key(category))]
+        return self.rows_for_codes(column, codes)
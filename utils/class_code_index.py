@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+UNKNOWN_CODE = 'Unknown'
+
+
+def normalize_class_codes(values):
+    """Split comma-separated class codes and tidy each one ('8834.0' -> '8834')"""
+    return (values.astype(str).str.split(',').explode().str.strip()
+            .str.replace(r'\.0$', '', regex=True))
+
+
+class ClassCodeIndex:
+    """
+    Inverted index of WC class codes: every in-scope row (LOB == 'WC') is
+    exploded into (row_id, class_code) pairs at ingest and grouped into a
+    sorted array of row ids per code. Row ids are positions in the dataset.
+    """
+
+    def __init__(self, postings, unknown_rows, scope_rows):
+        self.postings = postings
+        self.unknown_rows = unknown_rows
+        self.scope_rows = scope_rows
+        self.codes = sorted(postings)
+
+    @classmethod
+    def from_frame(cls, df, lob='WC', column='WC_Class_Code'):
+        in_scope = (df['LOB'] == lob).to_numpy() if 'LOB' in df.columns else np.zeros(len(df), dtype=bool)
+        scope_rows = np.flatnonzero(in_scope)
+        if column not in df.columns or len(scope_rows) == 0:
+            return cls({}, scope_rows, scope_rows)
+
+        values = pd.Series(df[column].to_numpy()[scope_rows], index=scope_rows, dtype=object)
+        known = values.notna() & (values.astype(str).str.strip() != UNKNOWN_CODE)
+        unknown_rows = scope_rows[~known.to_numpy()]
+
+        exploded = normalize_class_codes(values[known])
+        exploded = exploded[exploded != '']
+        # Group row ids by code: stable sort on the code ids keeps each posting list sorted
+        code_ids, uniques = pd.factorize(exploded.to_numpy())
+        order = np.argsort(code_ids, kind='stable')
+        row_ids = exploded.index.to_numpy(dtype=np.int64)[order]
+        bounds = np.cumsum(np.bincount(code_ids, minlength=len(uniques)))[:-1]
+        postings = {code: np.unique(rows) for code, rows in zip(uniques, np.split(row_ids, bounds))}
+        return cls(postings, unknown_rows, scope_rows)
+
+    @property
+    def nbytes(self):
+        return (sum(rows.nbytes for rows in self.postings.values())
+                + self.unknown_rows.nbytes + self.scope_rows.nbytes)
+
+    @property
+    def has_unknown(self):
+        return len(self.unknown_rows) > 0
+
+    def rows_for(self, codes):
+        """Sorted row ids having any of the given codes (UNKNOWN_CODE selects rows without one)"""
+        parts = [self.postings[code] for code in codes if code in self.postings]
+        if UNKNOWN_CODE in codes:
+            parts.append(self.unknown_rows)
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def filter_mask(self, codes, n_rows):
+        """
+        Boolean mask over all n_rows dataset rows: in-scope rows pass only when
+        they have one of the codes, rows outside the scope always pass.
+        """
+        mask = np.ones(n_rows, dtype=bool)
+        mask[self.scope_rows] = False
+        mask[self.rows_for(codes)] = True
+        return mask
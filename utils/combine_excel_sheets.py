@@ -1,42 +1,48 @@
 import pandas as pd
 import logging
 
+from utils.sheet_cache import read_sheets_incremental
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def combine_excel_sheets(excel_file):
+def prepare_sheet(df, sheet):
+    """Tag a parsed sheet with its source and normalize the Bound With column"""
+    # Add sheet name as source
+    df['Source_Sheet'] = sheet
+    
+    # Ensure Bound With column exists and is properly handled
+    if 'Bound With' not in df.columns:
+        df['Bound With'] = None
+    
+    # Clean up the Bound With column
+    df['Bound With'] = df['Bound With'].fillna('')
+    return df
+
+def combine_excel_sheets(excel_file, max_workers=None, engine=None):
     """Combine all sheets from Excel file into a single DataFrame"""
     logger.info(f"Reading Excel file: {excel_file}")
     
-    # Read all sheets
-    xl = pd.ExcelFile(excel_file)
-    logger.info(f"Found sheets: {xl.sheet_names}")
+    # Read all sheets. Only new or changed sheets are parsed (in parallel worker
+    # processes when worthwhile); unchanged sheets come from cached partitions.
+    sheet_results, total_seconds = read_sheets_incremental(
+        excel_file, 'combine', prepare_sheet, max_workers=max_workers, engine=engine
+    )
+    logger.info(f"Found sheets: {[result.name for result in sheet_results]}")
     
     all_data = []
-    for sheet in xl.sheet_names:
-        try:
-            df = pd.read_excel(xl, sheet_name=sheet)
-            logger.info(f"Sheet '{sheet}': {len(df)} rows")
-            
-            # Add sheet name as source
-            df['Source_Sheet'] = sheet
-            
-            # Ensure Bound With column exists and is properly handled
-            if 'Bound With' not in df.columns:
-                df['Bound With'] = None
-            
-            # Clean up the Bound With column
-            df['Bound With'] = df['Bound With'].fillna('')
-            
-            all_data.append(df)
-            
-        except Exception as e:
-            logger.error(f"Error reading sheet '{sheet}': {str(e)}")
+    for result in sheet_results:
+        if result.error is not None:
+            logger.error(f"Error reading sheet '{result.name}': {result.error}")
+            continue
+        source = "cached" if result.cached else "parsed"
+        logger.info(f"Sheet '{result.name}': {len(result.frame)} rows ({source} in {result.seconds:.2f}s)")
+        all_data.append(result.frame)
     
     # Combine all sheets
     if all_data:
         combined_df = pd.concat(all_data, ignore_index=True)
-        logger.info(f"Combined data: {len(combined_df)} total rows")
+        logger.info(f"Combined data: {len(combined_df)} total rows, sheets read in {total_seconds:.2f}s")
         
         # Save to CSV
         output_file = 'combined_submission_log.csv'
@@ -0,0 +1,219 @@
+import numpy as np
+import pandas as pd
+
+from utils.carrier_quotes import BLANK, group_status_counts, tidy_status_counts
+from utils.group_kernels import group_counts, group_sums, top_k
+
+# Line of business whose rows are split by WC class code
+CLASS_CODE_LOB = 'WC'
+
+
+def _codes(values):
+    """(codes, labels) of a column; missing values get code -1"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), list(values.cat.categories)
+    codes, labels = pd.factorize(values, use_na_sentinel=True)
+    return codes.astype(np.int64), list(labels)
+
+
+class CountCube:
+    """
+    Submission and carrier response counts aggregated once per dataset over
+    cells of (month, LOB, source sheet, WC class-code group), with a count per
+    carrier and quote status in every cell. The dashboard's metric cards and
+    charts read slices of the cube, so their cost depends on the number of
+    cells rather than the number of rows.
+
+    The dataset is sorted by date, so every month is a run of consecutive
+    rows and a date range covers whole runs except at its two ends; rows of
+    those cut runs are counted directly (cell_of_row gives their cell).
+    """
+
+    def __init__(self, carriers, status, class_codes, run_starts, run_months, months, cell_of_row,
+                 run_cells, cell_lob, cell_sheet, cell_group, lobs, sheets, group_rows, group_labels,
+                 counts, status_counts):
+        self.carriers = carriers
+        # Row-level carrier status matrix (shared with the dataset's CarrierMatrix)
+        self.status = status
+        self.class_codes = class_codes
+        # Run r is rows run_starts[r]:run_starts[r + 1], all in month months[run_months[r]]
+        self.run_starts = run_starts
+        self.run_months = run_months
+        self.months = months
+        self.cell_of_row = cell_of_row
+        # Cells are ordered by run: run r owns cells run_cells[r]:run_cells[r + 1]
+        self.run_cells = run_cells
+        self.cell_lob = cell_lob
+        self.cell_sheet = cell_sheet
+        # Class-code group of WC cells (-1 for other LOBs); group_rows holds one row of each group
+        self.cell_group = cell_group
+        self.lobs = lobs
+        self.sheets = sheets
+        self.group_rows = group_rows
+        self.group_labels = group_labels
+        self.counts = counts
+        self.status_counts = status_counts
+
+    @classmethod
+    def from_frame(cls, df, carriers, status, class_codes):
+        """Cube of df, given its carrier columns and status matrix and its ClassCodeIndex"""
+        n_rows = len(df)
+        month_codes, months = _codes(df['Month_Year'])
+        breaks = np.flatnonzero(month_codes[1:] != month_codes[:-1]) + 1
+        run_starts = np.concatenate([[0], breaks, [n_rows]]) if n_rows else np.zeros(1, dtype=np.int64)
+        run_months = month_codes[run_starts[:-1]]
+        run_of_row = np.repeat(np.arange(len(run_months)), np.diff(run_starts))
+
+        lob_codes, lobs = _codes(df['LOB'])
+        sheet_codes, sheets = _codes(df['Source_Sheet'])
+
+        # WC rows are grouped by class code as recorded and as normalized for the
+        # class-code filter; every row of a group passes or fails the filter together
+        group_codes = np.full(n_rows, -1, dtype=np.int64)
+        group_rows = np.empty(0, dtype=np.int64)
+        group_labels = np.empty(0, dtype=object)
+        wc_rows = np.flatnonzero(lob_codes == lobs.index(CLASS_CODE_LOB)) if CLASS_CODE_LOB in lobs else []
+        if len(wc_rows):
+            raw = df['WC Class Code'] if 'WC Class Code' in df.columns else pd.Series(None, index=df.index)
+            normalized = df['WC_Class_Code'] if 'WC_Class_Code' in df.columns else raw
+            keys = pd.DataFrame({'raw': raw.to_numpy()[wc_rows], 'normalized': normalized.to_numpy()[wc_rows]})
+            wc_groups = keys.groupby(['raw', 'normalized'], sort=False, dropna=False).ngroup().to_numpy()
+            group_codes[wc_rows] = wc_groups
+            _, first = np.unique(wc_groups, return_index=True)
+            group_rows = wc_rows[first]
+            group_labels = keys['raw'].to_numpy()[first]
+
+        # One cell per distinct (run, LOB, sheet, class group), numbered in run order
+        keys = pd.DataFrame({'run': run_of_row, 'lob': lob_codes, 'sheet': sheet_codes, 'group': group_codes})
+        cell_of_row = keys.groupby(['run', 'lob', 'sheet', 'group'], sort=True).ngroup().to_numpy().astype(np.int32)
+        _, first = np.unique(cell_of_row, return_index=True)
+        n_cells = len(first)
+        run_cells = np.searchsorted(run_of_row[first], np.arange(len(run_months) + 1))
+
+        counts = group_counts(cell_of_row, n_cells)
+        status_counts = group_status_counts(cell_of_row, n_cells, status)
+        return cls(list(carriers), status, class_codes, run_starts, run_months, months, cell_of_row,
+                   run_cells, lob_codes[first], sheet_codes[first], group_codes[first], lobs, sheets,
+                   group_rows, group_labels, counts, status_counts)
+
+    @property
+    def nbytes(self):
+        arrays = (self.run_starts, self.run_months, self.cell_of_row, self.run_cells, self.cell_lob,
+                  self.cell_sheet, self.cell_group, self.group_rows, self.group_labels, self.counts,
+                  self.status_counts)
+        return sum(values.nbytes for values in arrays)
+
+    def _add_rows(self, counts, status_counts, start, stop):
+        """Add the counts of rows start:stop to per-cell totals"""
+        if stop <= start:
+            return
+        cells = self.cell_of_row[start:stop]
+        counts += group_counts(cells, len(counts))
+        status_counts += group_status_counts(cells, len(counts), self.status[start:stop])
+
+    def query(self, selections, rows=slice(None), class_codes=None):
+        """
+        Counts of the rows inside the row slice rows having one of the selected
+        values of each {column: selected values} dimension ('LOB',
+        'Source_Sheet'), with WC rows limited to class_codes when given.
+        """
+        start, stop, _ = rows.indices(len(self.cell_of_row))
+        counts = np.zeros(len(self.counts), dtype=np.int64)
+        status_counts = np.zeros(self.status_counts.shape, dtype=np.int64)
+        # Runs wholly inside start:stop are first_run:end_run
+        first_run = int(np.searchsorted(self.run_starts, start, side='left'))
+        end_run = int(np.searchsorted(self.run_starts, stop, side='right')) - 1
+        if first_run < end_run:
+            lo, hi = self.run_cells[first_run], self.run_cells[end_run]
+            counts[lo:hi] = self.counts[lo:hi]
+            status_counts[lo:hi] = self.status_counts[lo:hi]
+            self._add_rows(counts, status_counts, start, self.run_starts[first_run])
+            self._add_rows(counts, status_counts, self.run_starts[end_run], stop)
+        else:
+            self._add_rows(counts, status_counts, start, stop)
+
+        keep = np.ones(len(counts), dtype=bool)
+        for column, cell_codes, labels in (('LOB', self.cell_lob, self.lobs),
+                                           ('Source_Sheet', self.cell_sheet, self.sheets)):
+            if column in selections:
+                selected = set(selections[column])
+                keep &= np.isin(cell_codes, [k for k, label in enumerate(labels) if label in selected])
+        if class_codes is not None:
+            # Cells of other LOBs (group -1) pick the trailing True: they always pass
+            group_pass = np.isin(self.group_rows, self.class_codes.rows_for(class_codes))
+            keep &= np.append(group_pass, True)[self.cell_group]
+        counts[~keep] = 0
+        status_counts[~keep] = 0
+        return CubeSlice(self, counts, status_counts)
+
+
+class CubeSlice:
+    """Per-cell counts of one filtered view of the dataset, with the summaries the dashboard shows"""
+
+    def __init__(self, cube, counts, status_counts):
+        self.cube = cube
+        self.counts = counts
+        self.status_counts = status_counts
+        self._lob_carrier_counts = None
+
+    @property
+    def total(self):
+        """Number of submissions"""
+        return int(self.counts.sum())
+
+    def responses(self):
+        """Per-carrier count of responses (non-blank cells), as a Series in carrier order"""
+        responded = self.status_counts.sum(axis=0)
+        responded[:, BLANK] = 0
+        return pd.Series(responded.sum(axis=1), index=self.cube.carriers)
+
+    def _lob_totals(self):
+        return group_counts(self.cube.cell_lob, len(self.cube.lobs), weights=self.counts).astype(np.int64)
+
+    def lob_counts(self):
+        """Submissions per LOB, largest first, without LOBs that do not occur"""
+        totals = self._lob_totals()
+        order = top_k(totals)
+        return pd.Series(totals[order], index=[self.cube.lobs[k] for k in order], dtype=np.int64)
+
+    def lob_carrier_counts(self):
+        """
+        Tidy (LOB, Carrier) table of submissions and responses by status (see
+        tidy_status_counts) for the LOBs that occur, largest LOB first. All
+        LOBs are summed from the cells in one pass; the table is kept for reuse.
+        """
+        if self._lob_carrier_counts is None:
+            cube = self.cube
+            n_cells, n_carriers, n_statuses = self.status_counts.shape
+            matrix = group_sums(cube.cell_lob, self.status_counts.reshape(n_cells, n_carriers * n_statuses),
+                                len(cube.lobs)).astype(np.int64).reshape(len(cube.lobs), n_carriers, n_statuses)
+            # Largest first; equal counts keep category order
+            order = top_k(self._lob_totals())
+            self._lob_carrier_counts = tidy_status_counts(matrix[order], np.asarray(cube.lobs, dtype=object)[order],
+                                                          cube.carriers)
+        return self._lob_carrier_counts
+
+    def month_counts(self):
+        """Submissions per month label ('2024-03'), in month order, for months that occur"""
+        cube = self.cube
+        # Every run has at least one cell, so reduceat sums exactly each run's cells
+        run_totals = np.add.reduceat(self.counts, cube.run_cells[:-1]) if len(self.counts) else self.counts
+        month_totals = group_counts(cube.run_months, len(cube.months), weights=run_totals).astype(np.int64)
+        counts = pd.Series(month_totals, index=[str(month) for month in cube.months])
+        return counts[counts > 0].sort_index()
+
+    def for_lob(self, lob):
+        """The slice restricted to one line of business"""
+        keep = self.cube.cell_lob == (self.cube.lobs.index(lob) if lob in self.cube.lobs else -2)
+        return CubeSlice(self.cube, np.where(keep, self.counts, 0),
+                         np.where(keep[:, None, None], self.status_counts, 0))
+
+    def class_code_counts(self):
+        """Submissions per recorded WC class code, largest first (rows without one excluded)"""
+        cube = self.cube
+        group_totals = group_counts(cube.cell_group, len(cube.group_rows), weights=self.counts)
+        # Groups differing only in the normalized code share their recorded label
+        label_codes, labels = pd.factorize(cube.group_labels, use_na_sentinel=True)
+        totals = group_counts(label_codes, len(labels), weights=group_totals).astype(np.int64)
+        order = top_k(totals)
+        return pd.Series(totals[order], index=labels[order], dtype=np.int64)
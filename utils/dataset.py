@@ -0,0 +1,175 @@
+import logging
+import os
+import time
+
+import pandas as pd
+
+from utils.carrier_quotes import CarrierMatrix
+from utils.category_index import CategoryIndex
+from utils.class_code_index import ClassCodeIndex
+from utils.count_cube import CountCube
+from utils.date_index import DAY_COLUMN, DateIndex, fill_missing_received, sort_by_received
+from utils.filter_bitmaps import FilterBitmaps
+from utils.lru_cache import LRUCache
+from utils.submission_schema import CARRIER_COLUMNS
+from utils.text_index import TextIndex
+from utils.trigram_index import TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for processed datasets kept by a DatasetRegistry. It is further
+# capped at a quarter of the container's memory limit, when there is one.
+DEFAULT_DATASET_CACHE_MB = 160
+CONTAINER_MEMORY_SHARE = 0.25
+
+# cgroup v2 and v1 files holding the container's memory limit
+CGROUP_MEMORY_LIMIT_FILES = ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes')
+
+
+def container_memory_limit():
+    """The cgroup memory limit in bytes, or None when unlimited or unknown"""
+    for path in CGROUP_MEMORY_LIMIT_FILES:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v2 writes 'max', v1 a huge number when there is no limit
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+        return None
+    return None
+
+
+def configured_cache_bytes(variable='DATASET_CACHE_MB', default_mb=DEFAULT_DATASET_CACHE_MB):
+    """
+    Memory budget in bytes from an environment variable in MB. Without one,
+    default_mb capped at CONTAINER_MEMORY_SHARE of the container's memory limit.
+    """
+    value = os.environ.get(variable, '').strip()
+    if value:
+        try:
+            return max(float(value), 0) * 1024 * 1024
+        except ValueError:
+            logger.warning(f"Ignoring invalid {variable} value: {value}")
+    budget = default_mb * 1024 * 1024
+    limit = container_memory_limit()
+    if limit is not None:
+        budget = min(budget, limit * CONTAINER_MEMORY_SHARE)
+    return budget
+
+
+class SubmissionDataset:
+    """
+    A processed submission log shared read-only by every session in the process.
+    Sessions keep only dataset_id and work on view(), never on the frame itself.
+
+    The frame always has a 0..n-1 RangeIndex, so the index of any filtered view
+    gives row positions into the precomputed arrays and indexes (carriers,
+    class_codes, categories, filters, cube, text_index, trigram_index), and is
+    sorted by RCVD so a date range is a contiguous slice of rows (dates).
+    """
+
+    def __init__(self, dataset_id, frame, source=None):
+        # Submissions without any received date count as received today
+        frame = fill_missing_received(frame)
+        # Processed frames arrive sorted; anything else is sorted once here
+        if 'RCVD' in frame.columns and (DAY_COLUMN not in frame.columns
+                                        or not frame[DAY_COLUMN].is_monotonic_increasing):
+            frame = sort_by_received(frame)
+        if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0 or frame.index.step != 1:
+            frame = frame.reset_index(drop=True)
+        self.dataset_id = dataset_id
+        self.source = source
+        self.created = time.time()
+        self._frame = frame
+        self._nbytes = None
+        # RCVD day numbers for date-range slicing
+        self.dates = DateIndex.from_frame(frame)
+        # Carrier cells parsed once into premium/status arrays
+        self.carriers = CarrierMatrix.from_frame(frame, CARRIER_COLUMNS)
+        # WC class code -> row ids
+        self.class_codes = ClassCodeIndex.from_frame(frame)
+        # LOB / Member / sheet / bound carrier -> row ids
+        self.categories = CategoryIndex.from_frame(frame)
+        # Packed per-value row bitmaps for the sidebar filters
+        self.filters = FilterBitmaps.from_categories(self.categories, len(frame))
+        # Submission / response counts per (month, LOB, sheet, class-code group) cell
+        self.cube = CountCube.from_frame(frame, self.carriers.columns, self.carriers.status, self.class_codes)
+        # Search terms -> row ids for the Quick Business Search
+        self.text_index = TextIndex.from_frame(frame)
+        # Word trigrams for typo-tolerant search
+        self.trigram_index = TrigramIndex.from_text_index(self.text_index)
+
+    def __len__(self):
+        return len(self._frame)
+
+    @property
+    def nbytes(self):
+        """Deep memory footprint of the frame and its arrays, computed once"""
+        if self._nbytes is None:
+            self._nbytes = (int(self._frame.memory_usage(deep=True).sum())
+                            + self.carriers.nbytes + self.dates.nbytes + self.class_codes.nbytes
+                            + self.categories.nbytes + self.filters.nbytes + self.cube.nbytes
+                            + self.text_index.nbytes + self.trigram_index.nbytes)
+        return self._nbytes
+
+    def view(self):
+        """
+        A shallow copy of the shared frame: it costs no data copy, and assigning a
+        column on it (df['x'] = ...) never reaches the shared frame. Filtering
+        with a mask produces a new frame as usual.
+        """
+        return self._frame.copy(deep=False)
+
+
+class DatasetRegistry:
+    """
+    Datasets shared by all sessions, keyed by dataset_id (the content hash of
+    the source file plus the pipeline version). Least recently used datasets
+    are dropped once the registry exceeds its memory budget; a session whose
+    dataset was dropped simply rebuilds it.
+    """
+
+    def __init__(self, max_bytes=None):
+        self._cache = LRUCache(max_bytes=configured_cache_bytes() if max_bytes is None else max_bytes,
+                               sizeof=lambda dataset: dataset.nbytes)
+
+    def __contains__(self, dataset_id):
+        return dataset_id in self._cache
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, dataset_id):
+        """Return the dataset with this id, or None"""
+        if dataset_id is None:
+            return None
+        return self._cache.get(dataset_id)
+
+    def add(self, dataset):
+        """
+        Register a dataset and return the registered instance. If another session
+        registered the same id first, that instance wins so only one copy is kept.
+        """
+        registered = self._cache.setdefault(dataset.dataset_id, dataset)
+        if registered is dataset:
+            logger.info(f"Registered dataset {dataset.dataset_id} ({len(dataset)} rows, "
+                        f"{dataset.nbytes / 1e6:.1f} MB); cache {self.stats()}")
+        return registered
+
+    def get_or_build(self, dataset_id, build, source=None):
+        """
+        Return the registered dataset for dataset_id, building it with build()
+        (which returns a processed frame or None) when it is not registered yet.
+        """
+        dataset = self.get(dataset_id)
+        if dataset is not None:
+            return dataset
+        frame = build()
+        if frame is None:
+            return None
+        return self.add(SubmissionDataset(dataset_id, frame, source))
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+
+# Received date of each row as a day number (days since 1970-01-01)
+DAY_COLUMN = 'RCVD_Day'
+
+
+def day_numbers(dates):
+    """int64 day numbers of a datetime column (missing dates sort first)"""
+    return pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+
+def day_number(value):
+    """Day number of a date, datetime or date string"""
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype(np.int64))
+
+
+def sort_by_received(df):
+    """
+    The frame in RCVD order (stable, so same-day rows keep their order) with
+    its day column. Frames without RCVD are returned unchanged.
+    """
+    if 'RCVD' not in df.columns:
+        return df
+    days = day_numbers(df['RCVD'])
+    order = np.argsort(days, kind='stable')
+    df = df.iloc[order].reset_index(drop=True)
+    df[DAY_COLUMN] = days[order]
+    return df
+
+
+def fill_missing_received(df):
+    """
+    The frame with submissions lacking a received date dated today (and
+    re-sorted). Processed frames keep them NaT so a persisted snapshot doesn't
+    fix the day it was built as their date.
+    """
+    if 'RCVD' not in df.columns:
+        return df
+    missing = df['RCVD'].isna().to_numpy()
+    if not missing.any():
+        return df
+    df = df.copy()
+    now = pd.Timestamp.now()
+    df.loc[missing, 'RCVD'] = now
+    if 'Month_Year' in df.columns:
+        df.loc[missing, 'Month_Year'] = now.to_period('M')
+    return sort_by_received(df)
+
+
+class DateIndex:
+    """
+    Day numbers of a dataset that is sorted by RCVD. Any date range is then a
+    contiguous block of rows found with two binary searches. Without an RCVD
+    column (days is None) every range covers all rows.
+    """
+
+    def __init__(self, days):
+        self.days = days
+
+    @classmethod
+    def from_frame(cls, df):
+        if DAY_COLUMN in df.columns:
+            return cls(df[DAY_COLUMN].to_numpy(dtype=np.int64))
+        if 'RCVD' in df.columns:
+            return cls(day_numbers(df['RCVD']))
+        return cls(None)
+
+    @property
+    def nbytes(self):
+        return 0 if self.days is None else self.days.nbytes
+
+    def row_slice(self, start, end):
+        """Rows received from start through end (whole days, both inclusive)"""
+        if self.days is None:
+            return slice(0, None)
+        lo = np.searchsorted(self.days, day_number(start), side='left')
+        hi = np.searchsorted(self.days, day_number(end), side='right')
+        return slice(int(lo), int(max(lo, hi)))
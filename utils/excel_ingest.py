@@ -0,0 +1,150 @@
+import importlib.util
+import io
+import logging
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Result of parsing one worksheet. frame is None when the sheet failed to parse;
+# cached is True when the frame came from a cached partition instead of the workbook.
+SheetResult = namedtuple('SheetResult', ['name', 'frame', 'seconds', 'error', 'cached'],
+                         defaults=(False,))
+
+# Workbooks with fewer sheets than this are parsed serially; spinning up
+# worker processes costs more than it saves on small files
+PARALLEL_MIN_SHEETS = 4
+
+# Workers are started fresh rather than forked: a fork inside Streamlit's
+# multi-threaded server can copy a lock another thread holds and deadlock the child
+POOL_START_METHOD = 'spawn'
+
+# Excel engines pandas can use, fastest first, with the module each one needs.
+# calamine (Rust) decodes xlsx several times faster than openpyxl but is optional.
+ENGINE_MODULES = {
+    'calamine': 'python_calamine',
+    'openpyxl': 'openpyxl',
+}
+DEFAULT_ENGINE = 'openpyxl'
+
+# Workbook opened once per worker process by _init_worker
+_worker_workbook = None
+
+
+def available_engines():
+    """Return the installed Excel engines, fastest first"""
+    return [engine for engine, module in ENGINE_MODULES.items()
+            if importlib.util.find_spec(module) is not None]
+
+
+def resolve_engine(preferred=None):
+    """
+    Pick the Excel engine to use: the requested one (argument or EXCEL_ENGINE)
+    if installed, otherwise the fastest installed engine, otherwise openpyxl.
+    """
+    installed = available_engines()
+    preferred = preferred or os.environ.get('EXCEL_ENGINE', '').strip().lower() or None
+    if preferred:
+        if preferred in installed:
+            return preferred
+        logger.warning(f"Excel engine '{preferred}' is not available, falling back")
+    return installed[0] if installed else DEFAULT_ENGINE
+
+
+def configured_workers():
+    """
+    Worker count from EXCEL_INGEST_WORKERS (0 or 1 = serial), defaulting to
+    serial: spawning workers costs seconds, more than a typical workbook takes
+    to parse.
+    """
+    value = os.environ.get('EXCEL_INGEST_WORKERS', '').strip()
+    if value:
+        try:
+            return max(int(value), 1)
+        except ValueError:
+            logger.warning(f"Ignoring invalid EXCEL_INGEST_WORKERS value: {value}")
+    return 1
+
+
+def _as_reusable_source(source):
+    """Return a source every worker can open: a path or the raw workbook bytes"""
+    if isinstance(source, (str, os.PathLike, bytes)):
+        return source
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source.read()
+
+
+def _open_workbook(source, engine):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    return pd.ExcelFile(source, engine=engine)
+
+
+def _parse_sheet(workbook, sheet_name):
+    start = time.perf_counter()
+    try:
+        frame = pd.read_excel(workbook, sheet_name=sheet_name)
+        return SheetResult(sheet_name, frame, time.perf_counter() - start, None)
+    except Exception as e:
+        return SheetResult(sheet_name, None, time.perf_counter() - start, str(e))
+
+
+def _init_worker(source, engine):
+    global _worker_workbook
+    _worker_workbook = _open_workbook(source, engine)
+
+
+def _parse_sheet_in_worker(sheet_name):
+    return _parse_sheet(_worker_workbook, sheet_name)
+
+
+def list_sheet_names(source, engine=None):
+    """Return the sheet names of a workbook in workbook order"""
+    return _open_workbook(_as_reusable_source(source), resolve_engine(engine)).sheet_names
+
+
+def read_excel_sheets(source, sheet_names=None, max_workers=None, engine=None):
+    """
+    Parse the sheets of a workbook, using a process pool when workers are
+    configured and there are enough sheets and cores. Results always come back in workbook order so the
+    combined data is identical to a serial read.
+
+    The engine defaults to the fastest installed one (see resolve_engine).
+    Workers are spawned, so a script calling this needs the usual
+    `if __name__ == "__main__":` guard.
+
+    Returns (list of SheetResult, total wall-clock seconds).
+    """
+    start = time.perf_counter()
+    source = _as_reusable_source(source)
+    engine = resolve_engine(engine)
+    workbook = None
+    if sheet_names is None:
+        workbook = _open_workbook(source, engine)
+        sheet_names = workbook.sheet_names
+
+    # More workers than cores or sheets would only add spawn cost
+    workers = min(max_workers or configured_workers(), os.cpu_count() or 1, len(sheet_names))
+    if workers > 1 and len(sheet_names) >= PARALLEL_MIN_SHEETS:
+        logger.info(f"Parsing {len(sheet_names)} sheets with {workers} worker processes ({engine})")
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source, engine),
+                                 mp_context=multiprocessing.get_context(POOL_START_METHOD)) as executor:
+            # executor.map yields in submission order, which keeps the merge deterministic
+            results = list(executor.map(_parse_sheet_in_worker, sheet_names))
+    else:
+        workbook = workbook or _open_workbook(source, engine)
+        results = [_parse_sheet(workbook, sheet_name) for sheet_name in sheet_names]
+
+    total_seconds = time.perf_counter() - start
+    for result in results:
+        logger.info(f"Parsed sheet '{result.name}' in {result.seconds:.3f}s")
+    logger.info(f"Parsed {len(results)} sheets in {total_seconds:.3f}s total ({engine})")
+    return results, total_seconds
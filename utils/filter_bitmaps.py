@@ -0,0 +1,87 @@
+import numpy as np
+
+from utils.lru_cache import LRUCache
+
+# Sidebar filter dimensions (all of them are in the dataset's CategoryIndex)
+FILTER_COLUMNS = ['LOB', 'Source_Sheet']
+
+# Combined filter masks kept per dataset
+MASK_CACHE_ENTRIES = 32
+
+
+class FilterBitmaps:
+    """
+    One packed bitmap (np.packbits, one bit per dataset row) per value of each
+    filter dimension, built once per dataset. Filtering ORs the bitmaps of the
+    selected values within a dimension and ANDs the dimensions, eight rows per
+    byte; combined masks are cached by the caller's filter fingerprint.
+    """
+
+    def __init__(self, dimensions, n_rows):
+        # column -> (value -> bitmap number, bitmaps); bitmap 0 holds rows with no value
+        self.dimensions = dimensions
+        self.n_rows = n_rows
+        self._masks = LRUCache(max_entries=MASK_CACHE_ENTRIES)
+
+    @classmethod
+    def from_categories(cls, categories, n_rows, columns=None):
+        """Bitmaps from a CategoryIndex, whose rows are already grouped by value"""
+        dimensions = {}
+        scratch = np.zeros(n_rows, dtype=bool)
+        for col in (columns or FILTER_COLUMNS):
+            if col not in categories.columns:
+                continue
+            labels, offsets, rows = categories.columns[col]
+            # Rows without a value sort first, ahead of offsets[0]
+            bounds = np.concatenate([[0], offsets])
+            bitmaps = np.empty((len(bounds) - 1, (n_rows + 7) // 8), dtype=np.uint8)
+            for k in range(len(bounds) - 1):
+                members = rows[bounds[k]:bounds[k + 1]]
+                scratch[members] = True
+                bitmaps[k] = np.packbits(scratch)
+                scratch[members] = False
+            dimensions[col] = ({label: k + 1 for k, label in enumerate(labels)}, bitmaps)
+        return cls(dimensions, n_rows)
+
+    @property
+    def nbytes(self):
+        return sum(bitmaps.nbytes for _, bitmaps in self.dimensions.values())
+
+    def _dimension(self, column, selected, lo, hi):
+        """Packed bytes lo:hi of the rows having any of the selected values"""
+        position, bitmaps = self.dimensions[column]
+        chosen = np.zeros(len(bitmaps), dtype=bool)
+        chosen[[position[value] for value in selected if value in position]] = True
+        # With most values selected, OR the few others and invert
+        if chosen.sum() * 2 > len(bitmaps):
+            return ~np.bitwise_or.reduce(bitmaps[~chosen, lo:hi], axis=0)
+        return np.bitwise_or.reduce(bitmaps[chosen, lo:hi], axis=0)
+
+    def mask(self, selections, rows=slice(None)):
+        """
+        Boolean mask over all rows: inside the row slice rows, and for every
+        {column: selected values} dimension having one of its selected values.
+        Dimensions not in selections do not filter.
+        """
+        start, stop, _ = rows.indices(self.n_rows)
+        lo, hi = start // 8, -(-stop // 8)
+        packed = np.full(max(hi - lo, 0), 0xFF, dtype=np.uint8)
+        for column, selected in selections.items():
+            if column in self.dimensions:
+                packed &= self._dimension(column, selected, lo, hi)
+        mask = np.zeros(self.n_rows, dtype=bool)
+        if stop > start:
+            mask[start:stop] = np.unpackbits(packed)[start - lo * 8:stop - lo * 8].view(bool)
+        return mask
+
+    def cached_mask(self, fingerprint, compute):
+        """
+        The mask stored under fingerprint, computing it with compute() on a
+        miss. Cached masks are read-only since every session shares them.
+        """
+        mask = self._masks.get(fingerprint)
+        if mask is None:
+            mask = compute()
+            mask.flags.writeable = False
+            mask = self._masks.setdefault(fingerprint, mask)
+        return mask
@@ -0,0 +1,95 @@
+import numpy as np
+
+# Group-by kernels over integer-coded keys (category codes, cell ids, ...).
+# Keys run from 0 to n_groups - 1; a negative key marks a row that belongs to
+# no group (e.g. a missing category) and is left out of every result.
+
+
+def encode_keys(codes, sizes):
+    """
+    One key per row from several code arrays (mixed radix: the first array
+    varies slowest), with n_groups = prod(sizes). A row with a negative code
+    in any array gets key -1. Returns (keys, n_groups).
+    """
+    keys = np.zeros(len(codes[0]), dtype=np.int64)
+    missing = np.zeros(len(keys), dtype=bool)
+    for column, size in zip(codes, sizes):
+        column = np.asarray(column, dtype=np.int64)
+        keys = keys * size + column
+        missing |= column < 0
+    keys[missing] = -1
+    return keys, int(np.prod(sizes, dtype=np.int64))
+
+
+def _kept(keys, values=None):
+    """keys (and values) without the rows of negative keys"""
+    keys = np.asarray(keys)
+    # min() is a cheaper check than a mask when no key is negative
+    if not len(keys) or keys.min() >= 0:
+        return keys, values
+    keep = keys >= 0
+    return keys[keep], (values[keep] if values is not None else None)
+
+
+def group_counts(keys, n_groups, weights=None):
+    """Rows per group (or the sum of weights per group), as int64 when unweighted"""
+    keys, weights = _kept(keys, None if weights is None else np.asarray(weights))
+    return np.bincount(keys, weights=weights, minlength=n_groups)
+
+
+def _weights(values):
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def group_sums(keys, values, n_groups):
+    """
+    Sum of values per group, skipping NaN. values may be 2-D (rows x
+    columns), giving an (n_groups, columns) array of per-column sums.
+    """
+    keys, values = _kept(keys, np.asarray(values))
+    if values.ndim == 1:
+        return np.bincount(keys, weights=_weights(values), minlength=n_groups)
+    # One bincount per column keeps temporaries at the size of one column
+    sums = np.zeros((n_groups, values.shape[1]), dtype=np.float64)
+    for j in range(values.shape[1]):
+        sums[:, j] = np.bincount(keys, weights=_weights(values[:, j]), minlength=n_groups)
+    return sums
+
+
+def group_means(keys, values, n_groups):
+    """Mean of the non-NaN values per group (NaN for groups without any)"""
+    keys, values = _kept(keys, np.asarray(values, dtype=np.float64))
+    if values.ndim == 2:
+        means = np.empty((n_groups, values.shape[1]), dtype=np.float64)
+        for j in range(values.shape[1]):
+            means[:, j] = group_means(keys, values[:, j], n_groups)
+        return means
+    present = ~np.isnan(values)
+    keys, values = keys[present], values[present]
+    sums = np.bincount(keys, weights=values, minlength=n_groups)
+    sizes = np.bincount(keys, minlength=n_groups)
+    return np.divide(sums, sizes, out=np.full(n_groups, np.nan), where=sizes > 0)
+
+
+def group_distinct(keys, value_codes, n_groups):
+    """Number of distinct non-negative value codes per group"""
+    keys, value_codes = _kept(keys, np.asarray(value_codes, dtype=np.int64))
+    keys = keys.astype(np.int64)
+    present = value_codes >= 0
+    n_values = int(value_codes.max(initial=0)) + 1
+    pairs = keys[present] * n_values + value_codes[present]
+    if n_groups * n_values <= len(pairs):
+        # A dense (group, value) table is no larger than the rows: mark the pairs that occur
+        seen = np.bincount(pairs, minlength=n_groups * n_values) > 0
+        return seen.reshape(n_groups, n_values).sum(axis=1)
+    # Each distinct (group, value) pair counts once toward its group
+    return np.bincount(np.unique(pairs) // n_values, minlength=n_groups)
+
+
+def top_k(counts, k=None):
+    """Positions of the k largest non-zero counts, largest first (ties keep position order)"""
+    counts = np.asarray(counts)
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    return order if k is None else order[:k]
@@ -0,0 +1,66 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_LOB = 'Unknown'
+
+# Standard LOB labels, keyed by lob_key() of the raw value ('BOP / Umb' -> 'bop/umb')
+LOB_MAPPING = {
+    'bop': 'BOP/PKG',
+    'pkg': 'BOP/PKG',
+    'bop/pkg': 'BOP/PKG',
+    'pkg/umb': 'BOP/PKG/UMB',
+    'bop/umb': 'BOP/PKG/UMB',
+    'umb': 'UMB',
+    'wc': 'WC',
+    'ba': 'BA',
+}
+
+# Raw values that mean "no LOB recorded" (astype(str) turns blank cells into 'nan')
+BLANK_LOB_KEYS = {'', 'nan', 'none'}
+
+_WHITESPACE = re.compile(r'\s+')
+_SLASH = re.compile(r'\s*/\s*')
+
+
+def lob_key(value):
+    """Case-folded, whitespace-normalized lookup key for a raw LOB value"""
+    text = _WHITESPACE.sub(' ', str(value)).strip()
+    return _SLASH.sub('/', text).casefold()
+
+
+def normalize_lob_value(value):
+    """Standard label for one raw LOB value; unmapped values keep their text, tidied"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return UNKNOWN_LOB
+    key = lob_key(value)
+    if key in BLANK_LOB_KEYS:
+        return UNKNOWN_LOB
+    return LOB_MAPPING.get(key, _WHITESPACE.sub(' ', str(value)).strip())
+
+
+def normalize_lob(values):
+    """
+    Standardize a column of raw LOB values into a categorical Series.
+
+    Each distinct raw value is normalized once and the result is broadcast
+    through integer codes, so the cost grows with the number of distinct
+    spellings rather than the number of rows.
+    """
+    values = pd.Series(values, copy=False)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values.to_numpy(), use_na_sentinel=True)
+
+    labels = [normalize_lob_value(value) for value in uniques]
+    if (codes < 0).any():
+        # Missing values have code -1, which picks this trailing entry
+        labels.append(UNKNOWN_LOB)
+    # Several raw spellings collapse into one label: re-code onto the distinct labels
+    label_codes, categories = pd.factorize(np.array(labels, dtype=object))
+    new_codes = label_codes[codes]
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=categories),
+                     index=values.index, name=values.name)
@@ -1,41 +1,85 @@
+import io
 import pandas as pd
 import logging
+import time
 from datetime import datetime
 
+from utils.excel_ingest import list_sheet_names, read_excel_sheets
+from utils.lob_normalizer import normalize_lob
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_new_excel_data(excel_file_path):
+# Standard carrier columns expected by the dashboard
+STANDARD_CARRIERS = [
+    'AmTrust', 'Bristol West', 'Chubb', 'CNA', 'Employers', 'Guard',
+    'Hanover', 'Hartford', 'Hourly', 'ICW', 'Kemper', 'Liberty Mutual',
+    'Markel', 'Philadelphia', 'Preferred', 'Stillwater', 'Travelers', 'UFG'
+]
+
+# Additional carriers found in new data
+ADDITIONAL_CARRIERS = ['Atlas', 'Attune', 'KBIC', 'Nationwide', 'Other']
+
+ALL_CARRIERS = STANDARD_CARRIERS + ADDITIONAL_CARRIERS
+
+# Standardize column names to match GitHub format
+COLUMN_MAPPING = {
+    'APPLICANT': 'Applicant',
+    'AGENCY': 'Member',
+    'Bound With Carrier': 'Bound With'
+}
+
+REQUIRED_COLUMNS = [
+    'Applicant', 'Member', 'EFF DATE', 'LOB', 'SEMSEE', 
+    'Quoted/Bound $', 'Policy Number', 'Bound With', 'NOTES'
+]
+
+# Columns of the processed output, in order
+FINAL_COLUMNS = REQUIRED_COLUMNS + ['WC Class Code'] + ALL_CARRIERS + ['RCVD', 'Source_Sheet']
+
+# Month banner rows ("JANUARY") that separate blocks inside a sheet
+MONTH_BANNERS = [
+    'JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE',
+    'JULY', 'AUGUST', 'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER'
+]
+
+INVALID_APPLICANTS = ['nan', 'NaN', '', 'None']
+
+# Rows buffered per sheet before they are converted to a typed DataFrame chunk in streaming mode
+STREAM_BATCH_ROWS = 5000
+
+def process_new_excel_data(excel_file_path, max_workers=None, engine=None, streaming=False):
     """
-    Process the new Excel file to match the GitHub repository's expected format
+    Process the new Excel file to match the GitHub repository's expected format.
+    With streaming=True rows are read one at a time in openpyxl read-only mode
+    and kept as typed DataFrame chunks, keeping memory flat as the workbook
+    grows (max_workers/engine do not apply). Streaming is used by this script
+    only; the dashboard's upload path reads sheets through its partition cache.
     """
     logger.info(f"Processing Excel file: {excel_file_path}")
     
-    # Read all sheets
-    xl = pd.ExcelFile(excel_file_path)
-    logger.info(f"Found sheets: {xl.sheet_names}")
-    
-    # Standard carrier columns expected by the dashboard
-    standard_carriers = [
-        'AmTrust', 'Bristol West', 'Chubb', 'CNA', 'Employers', 'Guard',
-        'Hanover', 'Hartford', 'Hourly', 'ICW', 'Kemper', 'Liberty Mutual',
-        'Markel', 'Philadelphia', 'Preferred', 'Stillwater', 'Travelers', 'UFG'
-    ]
-    
-    # Additional carriers found in new data
-    additional_carriers = ['Atlas', 'Attune', 'KBIC', 'Nationwide', 'Other']
+    if streaming:
+        start = time.perf_counter()
+        combined_df = _stream_excel_data(excel_file_path)
+        return _finalize_combined(combined_df, time.perf_counter() - start)
     
-    all_carriers = standard_carriers + additional_carriers
+    # Read all sheets
+    sheet_names = list_sheet_names(excel_file_path, engine)
+    logger.info(f"Found sheets: {sheet_names}")
     
     all_data = []
     
-    for sheet_name in xl.sheet_names:
-        if sheet_name == 'LOBs':  # Skip the LOBs reference sheet
-            continue
-            
+    # Skip the LOBs reference sheet; the rest are parsed in parallel when worthwhile
+    data_sheets = [sheet_name for sheet_name in sheet_names if sheet_name != 'LOBs']
+    sheet_results, total_seconds = read_excel_sheets(excel_file_path, data_sheets, max_workers=max_workers, engine=engine)
+    
+    for result in sheet_results:
+        sheet_name = result.name
         try:
-            df = pd.read_excel(xl, sheet_name=sheet_name)
-            logger.info(f"Processing sheet '{sheet_name}': {len(df)} rows")
+            if result.error is not None:
+                raise ValueError(result.error)
+            df = result.frame
+            logger.info(f"Processing sheet '{sheet_name}': {len(df)} rows (parsed in {result.seconds:.2f}s)")
             
             # Skip empty rows or header-only rows
             if len(df) == 0:
@@ -43,26 +87,14 @@ def process_new_excel_data(excel_file_path):
                 
             # Remove rows where the first column contains month names (header rows)
             if 'APPLICANT' in df.columns:
-                df = df[~df['APPLICANT'].astype(str).str.upper().isin(['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE'])]
+                df = df[~df['APPLICANT'].astype(str).str.upper().isin(MONTH_BANNERS)]
             elif 'Applicant' in df.columns:
-                df = df[~df['Applicant'].astype(str).str.upper().isin(['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE'])]
+                df = df[~df['Applicant'].astype(str).str.upper().isin(MONTH_BANNERS)]
             
-            # Standardize column names to match GitHub format
-            column_mapping = {
-                'APPLICANT': 'Applicant',
-                'AGENCY': 'Member',
-                'Bound With Carrier': 'Bound With'
-            }
-            
-            df = df.rename(columns=column_mapping)
+            df = df.rename(columns=COLUMN_MAPPING)
             
             # Ensure required columns exist
-            required_columns = [
-                'Applicant', 'Member', 'EFF DATE', 'LOB', 'SEMSEE', 
-                'Quoted/Bound $', 'Policy Number', 'Bound With', 'NOTES'
-            ]
-            
-            for col in required_columns:
+            for col in REQUIRED_COLUMNS:
                 if col not in df.columns:
                     df[col] = None
                     
@@ -75,38 +107,24 @@ def process_new_excel_data(excel_file_path):
                 df['WC Class Code'] = None
             
             # Ensure all carrier columns exist
-            for carrier in all_carriers:
+            for carrier in ALL_CARRIERS:
                 if carrier not in df.columns:
                     df[carrier] = None
             
             # Clean up data
             df['Applicant'] = df['Applicant'].astype(str).str.strip()
             df['Member'] = df['Member'].astype(str).str.strip()
-            df['LOB'] = df['LOB'].astype(str).str.strip()
             
             # Remove rows with invalid applicant names
-            df = df[~df['Applicant'].isin(['nan', 'NaN', '', 'None'])]
+            df = df[~df['Applicant'].isin(INVALID_APPLICANTS)]
             df = df[df['Applicant'].notna()]
             
-            # Standardize LOB values according to GitHub format
-            lob_mapping = {
-                'bop': 'BOP/PKG', 'BOP': 'BOP/PKG', 'pkg': 'BOP/PKG',
-                'PKG': 'BOP/PKG', 'Pkg': 'BOP/PKG', 'BOP/Pkg': 'BOP/PKG',
-                'BOP/PKG': 'BOP/PKG', 'pkg/umb': 'BOP/PKG/UMB',
-                'BOP / Umb': 'BOP/PKG/UMB', 'umb': 'UMB', 'Umb': 'UMB',
-                'UMB': 'UMB', 'wc': 'WC', 'WC': 'WC', 'ba': 'BA', 'BA': 'BA'
-            }
-            
-            df['LOB'] = df['LOB'].apply(lambda x: lob_mapping.get(x, x) if pd.notna(x) else 'Unknown')
-            
             # Add source sheet information
             df['Source_Sheet'] = sheet_name
             
             # Select only the columns we want to keep (remove unnamed columns)
-            final_columns = required_columns + ['WC Class Code'] + all_carriers + ['RCVD', 'Source_Sheet']
-            
             # Only keep columns that exist in the dataframe
-            final_columns = [col for col in final_columns if col in df.columns]
+            final_columns = [col for col in FINAL_COLUMNS if col in df.columns]
             df = df[final_columns]
             
             all_data.append(df)
@@ -117,9 +135,16 @@ def process_new_excel_data(excel_file_path):
             continue
     
     # Combine all sheets
-    if all_data:
-        combined_df = pd.concat(all_data, ignore_index=True)
-        logger.info(f"Combined data: {len(combined_df)} total rows")
+    combined_df = pd.concat(all_data, ignore_index=True) if all_data else None
+    return _finalize_combined(combined_df, total_seconds)
+
+def _finalize_combined(combined_df, total_seconds):
+    """Convert dates on the combined data and log a quality summary"""
+    if combined_df is not None and len(combined_df) > 0:
+        logger.info(f"Combined data: {len(combined_df)} total rows, sheets read in {total_seconds:.2f}s")
+        
+        # Standardize LOB values once on the combined data (same rules as the dashboard)
+        combined_df['LOB'] = normalize_lob(combined_df['LOB'])
         
         # Convert date columns to datetime
         date_columns = ['RCVD', 'EFF DATE']
@@ -140,6 +165,114 @@ def process_new_excel_data(excel_file_path):
         logger.error("No valid data found in Excel file")
         return None
 
+# Blank cells, matching the NaN pandas gives for them
+MISSING = float('nan')
+
+def _cell_text(value):
+    """Mirror pandas' astype(str).str.strip() on a raw cell (blank cells become 'nan')"""
+    return 'nan' if value is None else str(value).strip()
+
+def _stream_sheet(worksheet, sheet_name, chunks, strings, batch_rows=STREAM_BATCH_ROWS):
+    """
+    Apply the per-sheet cleaning row by row; every batch of surviving rows is
+    converted to a typed DataFrame chunk appended to chunks, so at most one
+    batch is held as Python objects. Repeated text ('decl', member and LOB
+    names) is shared through the strings dict. Returns the number of rows kept.
+    """
+    rows = worksheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return 0
+    
+    # First occurrence of each header wins, like pandas' de-duplicated column names
+    positions = {}
+    for position, name in enumerate(header):
+        if name is not None:
+            positions.setdefault(str(name), position)
+    for raw_name, name in COLUMN_MAPPING.items():
+        if raw_name in positions:
+            positions[name] = positions[raw_name]
+    
+    # RCVD falls back to EFF DATE when the sheet has no RCVD column
+    if 'RCVD' not in positions and 'EFF DATE' in positions:
+        positions['RCVD'] = positions['EFF DATE']
+    
+    sources = [positions.get(col) for col in FINAL_COLUMNS]
+    applicant_at = positions.get('Applicant')
+    text_columns = {FINAL_COLUMNS.index('Applicant'), FINAL_COLUMNS.index('Member'), FINAL_COLUMNS.index('LOB')}
+    sheet_at = FINAL_COLUMNS.index('Source_Sheet')
+    
+    kept = 0
+    batch = []
+    for row in rows:
+        width = len(row)
+        applicant = row[applicant_at] if applicant_at is not None and applicant_at < width else None
+        
+        # Remove month banner rows and rows with invalid applicant names
+        applicant_text = _cell_text(applicant)
+        if applicant_text.upper() in MONTH_BANNERS or applicant_text in INVALID_APPLICANTS:
+            continue
+        
+        record = []
+        for out_at, source_at in enumerate(sources):
+            value = row[source_at] if source_at is not None and source_at < width else None
+            if value is None:
+                value = MISSING
+            elif isinstance(value, float) and value.is_integer():
+                # pandas reads whole-number cells as integers
+                value = int(value)
+            if out_at in text_columns:
+                value = _cell_text(value)
+            if isinstance(value, str):
+                value = strings.setdefault(value, value)
+            record.append(value)
+        record[sheet_at] = sheet_name
+        batch.append(record)
+        
+        if len(batch) >= batch_rows:
+            kept += _flush_batch(batch, chunks)
+    kept += _flush_batch(batch, chunks)
+    return kept
+
+def _flush_batch(batch, chunks):
+    """Convert buffered rows into a DataFrame chunk (numbers and dates get typed columns) and clear the buffer"""
+    count = len(batch)
+    if count:
+        chunks.append(pd.DataFrame.from_records(batch, columns=FINAL_COLUMNS))
+    batch.clear()
+    return count
+
+def _stream_excel_data(excel_file_path):
+    """Read the workbook in openpyxl read-only mode and concatenate its chunks once"""
+    from openpyxl import load_workbook
+    
+    source = excel_file_path
+    if hasattr(source, 'getvalue'):
+        source = io.BytesIO(source.getvalue())
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    
+    chunks = []
+    strings = {}
+    try:
+        logger.info(f"Found sheets: {workbook.sheetnames}")
+        for sheet_name in workbook.sheetnames:
+            if sheet_name == 'LOBs':  # Skip the LOBs reference sheet
+                continue
+            sheet_start = len(chunks)
+            try:
+                kept = _stream_sheet(workbook[sheet_name], sheet_name, chunks, strings)
+                logger.info(f"Processed sheet '{sheet_name}': {kept} valid rows after cleaning")
+            except Exception as e:
+                logger.error(f"Error processing sheet '{sheet_name}': {str(e)}")
+                # Drop chunks already flushed from the failed sheet
+                del chunks[sheet_start:]
+    finally:
+        workbook.close()
+    
+    if not chunks:
+        return None
+    return pd.concat(chunks, ignore_index=True)
+
 if __name__ == "__main__":
     # Process the new Excel file
     excel_path = "/home/ubuntu/upload/EvolutionMasterSubmissionLog061325.xlsx"
@@ -0,0 +1,71 @@
+import hashlib
+import logging
+import re
+
+import numpy as np
+
+from utils.dataset import configured_cache_bytes
+from utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Memory budget and entry limit for cached search results
+DEFAULT_SEARCH_CACHE_MB = 64
+SEARCH_CACHE_ENTRIES = 512
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_query(query):
+    """Query text with surrounding and repeated whitespace removed"""
+    return _WHITESPACE.sub(' ', query).strip()
+
+
+def mask_fingerprint(row_mask):
+    """Short digest of a boolean filter mask over the dataset rows"""
+    return hashlib.blake2b(np.packbits(np.asarray(row_mask, dtype=bool)).tobytes(),
+                           digest_size=16).hexdigest()
+
+
+class SearchCache:
+    """
+    Business search results shared by all sessions, keyed by (dataset id,
+    match mode, normalized query, filter fingerprint). The dataset id already
+    changes with the data and the pipeline version, so entries never go stale;
+    the least recently used ones are dropped once the cache exceeds its memory
+    budget (SEARCH_CACHE_MB) or entry limit.
+    """
+
+    def __init__(self, max_bytes=None, max_entries=SEARCH_CACHE_ENTRIES):
+        if max_bytes is None:
+            max_bytes = configured_cache_bytes('SEARCH_CACHE_MB', DEFAULT_SEARCH_CACHE_MB)
+        # Entries are (result,) so searches with no matches (None) are cached too
+        self._cache = LRUCache(max_bytes=max_bytes, max_entries=max_entries,
+                               sizeof=lambda entry: entry[0].nbytes if entry[0] is not None else 0)
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def key(dataset_id, query, row_mask, mode='exact'):
+        return (dataset_id, mode, normalize_query(query), mask_fingerprint(row_mask))
+
+    def get_or_compute(self, key, compute):
+        """
+        The cached result for key, computing it on a miss. Incomplete results
+        (a query simplified after its time budget) are returned but not stored,
+        so one slow run is never served to other users.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            return entry[0]
+        result = compute()
+        if result is not None and not result.complete:
+            logger.debug(f"Not caching incomplete search for {key[2]!r}")
+            return result
+        entry = self._cache.setdefault(key, (result,))
+        logger.debug(f"Search cache miss for {key[2]!r}; cache {self.stats()}")
+        return entry[0]
+
+    def stats(self):
+        return self._cache.stats()
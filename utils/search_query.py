@@ -0,0 +1,406 @@
+import logging
+import re
+import time
+from functools import reduce
+
+import numpy as np
+
+from utils.lru_cache import LRUCache
+from utils.text_index import ALL_FIELDS, query_terms
+from utils.wildcard import compile_wildcard
+
+logger = logging.getLogger(__name__)
+
+# Field names usable as 'field:value' in a search query
+TEXT_FIELDS = {
+    'desc': ['Desc of Ops', 'Description of Operations', 'Description', 'Business Description', 'Business Type'],
+    'applicant': ['Applicant'],
+    'name': ['Applicant'],
+    'notes': ['NOTES', 'Notes', 'Comments'],
+}
+CATEGORY_FIELDS = {
+    'lob': 'LOB',
+    'member': 'Member',
+    'agency': 'Member',
+    'sheet': 'Source_Sheet',
+    'bound': 'bound_carrier',
+    'carrier': 'bound_carrier',
+}
+CLASS_FIELDS = ('class',)
+
+KEYWORDS = ('AND', 'OR', 'NOT')
+
+# Longer queries are rejected before parsing
+MAX_QUERY_LENGTH = 500
+MAX_QUERY_TERMS = 32
+# Seconds a query may run before it is abandoned for a plain word search
+QUERY_TIME_BUDGET = 1.0
+# Parsed plans kept for reuse across reruns and sessions
+PLAN_CACHE_ENTRIES = 1024
+# Candidate rows checked per step of a phrase match, between time-budget checks
+PHRASE_CHUNK_ROWS = 10000
+
+_TOKEN = re.compile(r'''\s*(?:
+    (?P<paren>[()])
+  | (?P<field>[A-Za-z_]+):(?:"(?P<field_phrase>[^"]*)"?|(?P<field_value>[^\s()"]+))
+  | "(?P<phrase>[^"]*)"?
+  | (?P<word>[^\s()"]+)
+)''', re.VERBOSE)
+
+
+class QuerySyntaxError(ValueError):
+    """A search query that cannot be parsed"""
+
+
+class SearchTimeout(RuntimeError):
+    """A search query that ran past its time budget"""
+
+
+_plan_cache = LRUCache(max_entries=PLAN_CACHE_ENTRIES)
+
+
+def _known_field(name):
+    name = name.lower()
+    return name in TEXT_FIELDS or name in CATEGORY_FIELDS or name in CLASS_FIELDS
+
+
+def _matches_everything(value):
+    """True for a bare wildcard ('*', '**'), which matches every row"""
+    return bool(value) and not value.strip('*')
+
+
+def _phrase_pattern(phrase):
+    """
+    Regex for the phrase's words in order, separated only by non-word
+    characters. The words are escaped ('*' alone becomes \\w*), so user text
+    never reaches the regex as syntax.
+    """
+    words = query_terms(phrase)
+    return re.compile(r'(?<!\w)' + r'\W+'.join(re.escape(word).replace(r'\*', r'\w*') for word in words)
+                      + r'(?!\w)', re.IGNORECASE)
+
+
+def tokenize_query(query):
+    """
+    Split a query into ('(' | ')' | 'AND' | 'OR' | 'NOT' | term) tokens. Terms are
+    ('term', field, value, phrase), where phrase is the compiled phrase regex for
+    quoted text and None otherwise.
+    """
+    if len(query) > MAX_QUERY_LENGTH:
+        raise QuerySyntaxError(f"Search is longer than {MAX_QUERY_LENGTH} characters")
+    tokens = []
+    for match in _TOKEN.finditer(query):
+        if match.group('paren'):
+            tokens.append(match.group('paren'))
+        elif match.group('field'):
+            field = match.group('field')
+            quoted = match.group('field_phrase') is not None
+            value = match.group('field_phrase') if quoted else match.group('field_value')
+            if _known_field(field):
+                tokens.append(('term', field.lower(), value, _phrase_pattern(value) if quoted else None))
+            else:
+                # 'dba:' and the like are ordinary text, not a field
+                value = f"{field}:{value}"
+                tokens.append(('term', None, value, _phrase_pattern(value) if quoted else None))
+        elif match.group('phrase') is not None:
+            value = match.group('phrase')
+            tokens.append(('term', None, value, _phrase_pattern(value)))
+        elif match.group('word'):
+            word = match.group('word')
+            if word in KEYWORDS:
+                tokens.append(word)
+            elif query_terms(word) or _matches_everything(word):
+                # Punctuation on its own ('&', '-') is not a search term; a bare '*' matches everything
+                tokens.append(('term', None, word, None))
+    if sum(isinstance(token, tuple) for token in tokens) > MAX_QUERY_TERMS:
+        raise QuerySyntaxError(f"Search has more than {MAX_QUERY_TERMS} terms")
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive-descent parser producing a plan of nested tuples:
+    ('or', [plans]), ('and', [plans]), ('not', plan) and term tokens.
+    NOT binds tightest, then AND (also implied between adjacent terms), then OR.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise QuerySyntaxError("No search term")
+        plan = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected '{self.peek()}'")
+        return plan
+
+    def parse_or(self):
+        children = [self.parse_and()]
+        while self.peek() == 'OR':
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and(self):
+        children = [self.parse_not()]
+        while self.peek() not in (None, 'OR', ')'):
+            if self.peek() == 'AND':
+                self.take()
+            children.append(self.parse_not())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_not(self):
+        if self.peek() == 'NOT':
+            self.take()
+            return ('not', self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        token = self.take()
+        if token is None:
+            raise QuerySyntaxError("Search ends after an operator")
+        if token == '(':
+            plan = self.parse_or()
+            if self.take() != ')':
+                raise QuerySyntaxError("Missing ')'")
+            return plan
+        if isinstance(token, tuple):
+            return token
+        raise QuerySyntaxError(f"Unexpected '{token}'")
+
+
+def parse_query(query):
+    """
+    Parse a search query into a plan, e.g. 'desc:plumb* AND lob:WC NOT notes:decline',
+    'class:8810', 'member:Buckley' or '"auto repair"'. Raises QuerySyntaxError.
+    """
+    return _Parser(tokenize_query(query)).parse()
+
+
+def compile_query(query):
+    """parse_query through an LRU cache of plans shared by all sessions"""
+    plan = _plan_cache.get(query)
+    if plan is None:
+        plan = _plan_cache.setdefault(query, parse_query(query))
+    return plan
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout("Search ran past its time budget")
+
+
+def _text_rows(text_index, words, fields):
+    """Rows having every word (by prefix/wildcard) in any of the fields"""
+    result = None
+    for word in words:
+        parts = [text_index.match_term(word, field) for field in fields]
+        rows = parts[0] if len(parts) == 1 else reduce(np.union1d, parts)
+        result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        if len(result) == 0:
+            break
+    return np.empty(0, dtype=np.int32) if result is None else result
+
+
+def _term_rows(term, dataset, deadline=None):
+    _, field, value, phrase = term
+    if field not in CATEGORY_FIELDS and field not in CLASS_FIELDS and _matches_everything(value):
+        return np.arange(len(dataset))
+    if field in CATEGORY_FIELDS:
+        return dataset.categories.rows_for_value(CATEGORY_FIELDS[field], value)
+    if field in CLASS_FIELDS:
+        pattern = compile_wildcard(value.casefold())
+        codes = [code for code in dataset.class_codes.codes if pattern.fullmatch(code.casefold())]
+        if pattern.fullmatch('unknown'):
+            codes.append('Unknown')
+        return dataset.class_codes.rows_for(codes)
+
+    text_index = dataset.text_index
+    if field is None:
+        fields, columns = [ALL_FIELDS], text_index.fields
+    else:
+        fields = columns = [col for col in TEXT_FIELDS[field] if col in text_index.postings]
+    words = query_terms(value)
+    if not words or not fields:
+        return np.empty(0, dtype=np.int32)
+    rows = _text_rows(text_index, words, fields)
+    if phrase is not None and len(rows):
+        # The index finds rows with all the words by prefix; check the exact phrase on those rows only
+        frame = dataset.view()
+        keep = np.zeros(len(rows), dtype=bool)
+        for col in columns:
+            text = frame[col].to_numpy()
+            for start in range(0, len(rows), PHRASE_CHUNK_ROWS):
+                _check_deadline(deadline)
+                chunk = slice(start, start + PHRASE_CHUNK_ROWS)
+                keep[chunk] |= [isinstance(cell, str) and phrase.search(cell) is not None
+                                for cell in text[rows[chunk]]]
+        rows = rows[keep]
+    return rows
+
+
+def execute_plan(plan, dataset, deadline=None):
+    """
+    Sorted row ids of the dataset matching a parsed plan. Raises SearchTimeout
+    once time.perf_counter() passes deadline (checked between steps).
+    """
+    _check_deadline(deadline)
+    kind = plan[0]
+    if kind == 'term':
+        return _term_rows(plan, dataset, deadline)
+    if kind == 'or':
+        return reduce(np.union1d, [execute_plan(child, dataset, deadline) for child in plan[1]])
+    if kind == 'not':
+        return np.setdiff1d(np.arange(len(dataset)), execute_plan(plan[1], dataset, deadline),
+                            assume_unique=True)
+
+    # AND: intersect the positive children, then subtract the negated ones
+    positives = [child for child in plan[1] if child[0] != 'not']
+    negatives = [child[1] for child in plan[1] if child[0] == 'not']
+    result = None
+    for child in positives:
+        rows = execute_plan(child, dataset, deadline)
+        result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        if len(result) == 0:
+            return result
+    if result is None:
+        result = np.arange(len(dataset))
+    for child in negatives:
+        result = np.setdiff1d(result, execute_plan(child, dataset, deadline), assume_unique=True)
+    return result
+
+
+def _required_terms(plan):
+    """Terms every match must satisfy: the plan's terms reachable through AND nodes only"""
+    if plan[0] == 'term':
+        return [plan]
+    if plan[0] == 'and':
+        return [term for child in plan[1] for term in _required_terms(child)]
+    return []
+
+
+def simple_search(query, dataset):
+    """
+    Cheap fallback for a query past its time budget: only the terms every
+    match must satisfy, text terms as plain word prefixes (no wildcards or
+    phrase checks). OR and NOT parts are dropped, so results can be broader.
+    """
+    result = None
+    for _, field, value, _ in _required_terms(compile_query(query)):
+        if field is None or field in TEXT_FIELDS:
+            words = ' '.join(word.replace('*', '') for word in query_terms(value))
+            term = ('term', field, words or value, None)
+        else:
+            term = ('term', field, value, None)
+        rows = _term_rows(term, dataset)
+        result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+    return np.empty(0, dtype=np.int32) if result is None else result
+
+
+def run_query(query, dataset, budget=QUERY_TIME_BUDGET):
+    """
+    Parse and execute a search query against a SubmissionDataset. Raises
+    QuerySyntaxError for a bad query and SearchTimeout when it runs longer than
+    budget seconds (None for no limit).
+    """
+    plan = compile_query(query)
+    deadline = None if budget is None else time.perf_counter() + budget
+    return execute_plan(plan, dataset, deadline)
+
+
+def _conjunction(plan):
+    """The plan's AND-ed parts (terms and negated terms), or None for any other shape"""
+    parts = plan[1] if plan[0] == 'and' else [plan]
+    for part in parts:
+        if not (part[0] == 'term' or (part[0] == 'not' and part[1][0] == 'term')):
+            return None
+    return parts
+
+
+def _narrows_term(term, previous):
+    """True if every row matching term also matches previous ('plum' narrows 'plu')"""
+    if term == previous:
+        return True
+    if term[0] != 'term' or previous[0] != 'term':
+        return False
+    _, field, value, phrase = term
+    _, previous_field, previous_value, previous_phrase = previous
+    if field != previous_field or phrase is not None or previous_phrase is not None:
+        return False
+    if field is not None and field not in TEXT_FIELDS:
+        return False
+    # Text terms match each word by prefix, so extending a plain word only narrows it
+    words = [word.rstrip('*') for word in query_terms(value)]
+    previous_words = [word.rstrip('*') for word in query_terms(previous_value)]
+    return (len(words) >= len(previous_words)
+            and all('*' not in word for word in words + previous_words)
+            and all(word.startswith(previous_word) for word, previous_word in zip(words, previous_words)))
+
+
+def refinement_terms(previous_plan, plan):
+    """
+    When plan only narrows previous_plan (both plain conjunctions, each
+    previous term kept or extended, new terms added at the end), return the
+    parts of plan that still have to be applied to previous_plan's rows;
+    otherwise None.
+    """
+    previous_parts, parts = _conjunction(previous_plan), _conjunction(plan)
+    if previous_parts is None or parts is None or len(parts) < len(previous_parts):
+        return None
+    if not all(_narrows_term(part, previous) for part, previous in zip(parts, previous_parts)):
+        return None
+    changed = [part for part, previous in zip(parts, previous_parts) if part != previous]
+    return changed + parts[len(previous_parts):]
+
+
+def narrow_rows(rows, parts, dataset, deadline=None):
+    """
+    Apply conjunction parts (terms or negated terms) to an existing sorted row
+    set. Raises SearchTimeout like execute_plan.
+    """
+    for part in parts:
+        if len(rows) == 0:
+            break
+        _check_deadline(deadline)
+        if part[0] == 'not':
+            rows = np.setdiff1d(rows, _term_rows(part[1], dataset, deadline), assume_unique=True)
+        else:
+            rows = np.intersect1d(rows, _term_rows(part, dataset, deadline), assume_unique=True)
+    return rows
+
+
+def search_with_fallback(query, dataset, budget=QUERY_TIME_BUDGET):
+    """
+    run_query, falling back to simple_search when the query runs past its time
+    budget, so one expensive query cannot hold up the shared process.
+    Returns (rows, complete); complete is False for fallback results.
+    """
+    try:
+        return run_query(query, dataset, budget), True
+    except SearchTimeout:
+        logger.warning(f"Search {query!r} ran past its {budget}s budget; falling back to a simple word search")
+        return simple_search(query, dataset), False
+
+
+def narrow_with_fallback(query, rows, parts, dataset, budget=QUERY_TIME_BUDGET):
+    """
+    narrow_rows under the same time budget as search_with_fallback. Past the
+    budget the rows are narrowed by simple_search instead. Returns (rows,
+    complete); complete is False for fallback results.
+    """
+    deadline = None if budget is None else time.perf_counter() + budget
+    try:
+        return narrow_rows(rows, parts, dataset, deadline), True
+    except SearchTimeout:
+        logger.warning(f"Search {query!r} ran past its {budget}s budget; falling back to a simple word search")
+        return np.intersect1d(rows, simple_search(query, dataset), assume_unique=True), False
@@ -0,0 +1,220 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.carrier_quotes import BLANK, QUOTED, group_status_counts
+from utils.group_kernels import group_counts, top_k
+
+
+def _codes(values, rows):
+    """(codes, labels) of a column at rows; codes are -1 for missing values"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy()[rows], np.asarray(values.cat.categories, dtype=object)
+    codes, labels = pd.factorize(values.to_numpy()[rows], use_na_sentinel=True)
+    return codes, np.asarray(labels, dtype=object)
+
+
+def _label_counts(codes, labels):
+    """Count per label as a Series, largest first, without labels that do not occur"""
+    counts = group_counts(codes, len(labels))
+    order = top_k(counts)
+    return pd.Series(counts[order], index=labels[order])
+
+
+class SearchResult:
+    """
+    Columnar result of a business search. Entry i of every array is the i-th
+    matching submission, in result order (dataset order, or best match first
+    for fuzzy search); row_ids are its positions in the dataset.
+
+    Summaries are reductions over these arrays; per-submission dicts are only
+    built for the submissions actually shown.
+    """
+
+    def __init__(self, row_ids, scores, complete, carriers, premium, status, responses,
+                 lob_codes, lob_labels, bound_codes, bound_labels, bound_source,
+                 applicant, received, source_sheet):
+        self.row_ids = row_ids
+        self.scores = scores
+        self.complete = complete
+        self.carriers = carriers
+        self.premium = premium
+        self.status = status
+        # Raw cell text of declined/other responses (None elsewhere)
+        self.responses = responses
+        self.lob_codes = lob_codes
+        self.lob_labels = lob_labels
+        self.bound_codes = bound_codes
+        self.bound_labels = bound_labels
+        self.bound_source = bound_source
+        self.applicant = applicant
+        self.received = received
+        self.source_sheet = source_sheet
+
+    @classmethod
+    def from_rows(cls, dataset, rows, scores=None, complete=True):
+        frame = dataset.view()
+        rows = np.asarray(rows, dtype=np.int64)
+        premium, status = dataset.carriers.take(rows)
+        responses = np.full(status.shape, None, dtype=object)
+        for j, carrier in enumerate(dataset.carriers.columns):
+            noted = status[:, j] > QUOTED
+            if noted.any():
+                responses[noted, j] = frame[carrier].to_numpy()[rows[noted]]
+        lob_codes, lob_labels = _codes(frame['LOB'], rows)
+        bound_codes, bound_labels = _codes(frame['bound_carrier'], rows)
+        source_codes, source_labels = _codes(frame['bound_source'], rows)
+        sheet_codes, sheet_labels = _codes(frame['Source_Sheet'], rows)
+        return cls(
+            row_ids=rows,
+            scores=scores,
+            complete=complete,
+            carriers=list(dataset.carriers.columns),
+            premium=premium,
+            status=status,
+            responses=responses,
+            lob_codes=lob_codes,
+            lob_labels=lob_labels,
+            bound_codes=bound_codes,
+            bound_labels=bound_labels,
+            bound_source=np.append(source_labels, '')[source_codes],
+            applicant=frame['Applicant'].to_numpy()[rows],
+            received=frame['RCVD'].to_numpy()[rows],
+            source_sheet=np.append(sheet_labels, None)[sheet_codes],
+        )
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @property
+    def nbytes(self):
+        """Size of the result arrays (cell values are shared with the dataset, not copied)"""
+        arrays = (self.row_ids, self.scores, self.premium, self.status, self.responses, self.lob_codes,
+                  self.bound_codes, self.bound_source, self.applicant, self.received, self.source_sheet)
+        return sum(values.nbytes for values in arrays if values is not None)
+
+    def take(self, keep):
+        """The result restricted to a boolean mask or positions, keeping its order"""
+        subset = copy.copy(self)
+        for name in ('row_ids', 'scores', 'premium', 'status', 'responses', 'lob_codes',
+                     'bound_codes', 'bound_source', 'applicant', 'received', 'source_sheet'):
+            values = getattr(self, name)
+            if values is not None:
+                setattr(subset, name, values[keep])
+        return subset
+
+    def for_lob(self, lob):
+        """Submissions of one line of business"""
+        codes = np.flatnonzero(self.lob_labels == lob)
+        return self.take(np.isin(self.lob_codes, codes))
+
+    def lob_groups(self):
+        """(lob, submissions of that LOB) pairs in lob_counts() order, split with one stable sort"""
+        order = np.argsort(self.lob_codes, kind='stable')
+        bounds = np.searchsorted(self.lob_codes[order], np.arange(len(self.lob_labels) + 1))
+        position = {lob: k for k, lob in enumerate(self.lob_labels)}
+        for lob in self.lob_counts().index:
+            k = position[lob]
+            yield lob, self.take(order[bounds[k]:bounds[k + 1]])
+
+    def lob_counts(self):
+        """Submissions per LOB, largest first"""
+        return _label_counts(self.lob_codes, self.lob_labels)
+
+    def bound_counts(self):
+        """Bound policies per carrier, largest first (submissions bound with no known carrier excluded)"""
+        counts = _label_counts(self.bound_codes, self.bound_labels)
+        return counts[counts.index != '']
+
+    @property
+    def total_quotes(self):
+        """Carrier responses of any kind (premium, decline or note)"""
+        return int((self.status != BLANK).sum())
+
+    def _carrier_table(self, codes, n_groups):
+        """
+        Carrier summary columns for every (group, carrier) pair in one pass
+        over the result, groups given by integer codes per submission
+        """
+        n_carriers = len(self.carriers)
+        counts = group_status_counts(codes, n_groups, self.status)
+        responded = (counts.sum(axis=2) - counts[:, :, BLANK]).ravel()
+        priced = counts[:, :, QUOTED].ravel()
+        bins = (codes[:, None] * n_carriers + np.arange(n_carriers)).ravel()
+        premium_sum = np.bincount(bins, weights=np.where(self.status == QUOTED, self.premium, 0.0).ravel(),
+                                  minlength=n_groups * n_carriers)
+        average = np.divide(premium_sum, priced, out=np.zeros(len(priced)), where=priced > 0)
+
+        # Bound counts per carrier column, via each bound label's column position
+        column_of = {carrier: j for j, carrier in enumerate(self.carriers)}
+        label_column = np.array([column_of.get(label, -1) for label in self.bound_labels] + [-1], dtype=np.int64)
+        bound_column = label_column[self.bound_codes]
+        has_column = bound_column >= 0
+        bound = np.bincount(codes[has_column] * n_carriers + bound_column[has_column],
+                            minlength=n_groups * n_carriers)
+
+        submissions = np.repeat(np.bincount(codes, minlength=n_groups), n_carriers)
+        return pd.DataFrame({
+            'Carrier': np.tile(np.asarray(self.carriers, dtype=object), n_groups),
+            'Number of Quotes': responded,
+            'Priced Quotes': priced,
+            'Average Quote': average,
+            'Quote Rate': responded / np.maximum(submissions, 1) * 100,
+            'Bound Policies': bound,
+            'Win Rate': np.divide(bound * 100.0, responded, out=np.zeros(len(responded)), where=responded > 0),
+        })
+
+    def carrier_summary(self):
+        """
+        One row per carrier with at least one response: number of responses,
+        number and average of quoted premiums (average 0 when none), quote rate,
+        bound policies and win rate (bound / responses), in carrier column order.
+        """
+        summary = self._carrier_table(np.zeros(len(self), dtype=np.int64), 1)
+        return summary[summary['Number of Quotes'] > 0].reset_index(drop=True)
+
+    def lob_carrier_summary(self):
+        """
+        carrier_summary() of every line of business at once, as one frame with
+        a leading LOB column (LOBs in lob_counts() order, carriers in column order)
+        """
+        # Submissions without a LOB form an extra last group, dropped from the table
+        n_lobs = len(self.lob_labels)
+        codes = np.where(self.lob_codes >= 0, self.lob_codes, n_lobs).astype(np.int64)
+        table = self._carrier_table(codes, n_lobs + 1).iloc[:n_lobs * len(self.carriers)]
+        table.insert(0, 'LOB', np.repeat(self.lob_labels, len(self.carriers)))
+        table = table[table['Number of Quotes'] > 0]
+        rank = {lob: i for i, lob in enumerate(self.lob_counts().index)}
+        table = table.iloc[np.argsort(table['LOB'].map(rank).to_numpy(), kind='stable')]
+        return table.reset_index(drop=True)
+
+    def submission(self, i):
+        """Display dict for the i-th submission"""
+        quotes = {}
+        premiums = {}
+        # Quoted carriers show their parsed premium; other responses keep their text
+        for j in np.flatnonzero(self.status[i]):
+            carrier = self.carriers[j]
+            if self.status[i, j] == QUOTED:
+                premiums[carrier] = self.premium[i, j]
+                quotes[carrier] = self.premium[i, j]
+            else:
+                quotes[carrier] = self.responses[i, j]
+        bound_carrier = self.bound_labels[self.bound_codes[i]] if self.bound_codes[i] >= 0 else ''
+        bound = ''
+        if self.bound_source[i]:
+            bound = f"Bound: {bound_carrier}" if bound_carrier else 'Bound'
+        submission = {
+            'Applicant': self.applicant[i],
+            'LOB': self.lob_labels[self.lob_codes[i]] if self.lob_codes[i] >= 0 else None,
+            'RCVD': self.received[i],
+            'Source_Sheet': self.source_sheet[i],
+            'quotes': quotes,
+            'premiums': premiums,
+            'bound': bound,
+            'bound_carrier': bound_carrier,
+        }
+        if self.scores is not None:
+            submission['match_score'] = self.scores[i]
+        return submission
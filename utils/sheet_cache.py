@@ -0,0 +1,193 @@
+import hashlib
+import io
+import logging
+import os
+import posixpath
+import re
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from utils.excel_ingest import SheetResult, read_excel_sheets, resolve_engine
+from utils.snapshot_cache import SNAPSHOT_DIR, load_snapshot, save_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached partition format changes so every sheet is re-parsed once
+PARTITION_VERSION = 2
+
+# Partitions not used by any workbook for this long are deleted
+PARTITION_MAX_AGE_DAYS = 30
+
+_MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+# A shared-string cell: <c r="A1" s="8" t="s"><v>49</v></c>
+_SHARED_CELL = re.compile(rb'(<c\b[^>]*\bt="s"[^>]*>\s*<v>)(\d+)(</v>)')
+_SHEET_DATA = re.compile(rb'<sheetData\b.*?</sheetData>|<sheetData\s*/>', re.DOTALL)
+# Row attributes besides the row number (spans, height) are layout hints, not content
+_ROW_TAG = re.compile(rb'<row\b[^>]*?(\br="\d+")[^>]*>')
+
+
+def _source_bytes(source):
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read()
+    if hasattr(source, 'getvalue'):
+        return source.getvalue()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source.read()
+
+
+def _shared_strings(archive):
+    """Return the workbook's shared string table as a list of UTF-8 byte strings"""
+    try:
+        data = archive.read('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    for _, element in ET.iterparse(io.BytesIO(data)):
+        if element.tag == f'{_MAIN_NS}si':
+            # Rich text splits one string over several <t> runs; phonetic hints are not content
+            text = ''.join(t.text or '' for t in element.iter(f'{_MAIN_NS}t'))
+            strings.append(text.encode('utf-8'))
+            element.clear()
+    return strings
+
+
+def _sheet_parts(archive):
+    """Map sheet names (workbook order) to their worksheet XML paths inside the archive"""
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    targets = {rel.get('Id'): rel.get('Target') for rel in rels.iter(f'{_PKG_REL_NS}Relationship')}
+    parts = {}
+    for sheet in workbook.iter(f'{_MAIN_NS}sheet'):
+        target = targets.get(sheet.get(f'{_REL_NS}id'))
+        if target is None:
+            continue
+        path = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+        parts[sheet.get('name')] = path
+    return parts
+
+
+def sheet_fingerprints(source):
+    """
+    Return {sheet name: content fingerprint} for an .xlsx workbook without
+    parsing it into DataFrames, or None when the source is not an .xlsx file.
+
+    The fingerprint hashes the sheet's cell data with shared-string indices
+    replaced by the strings themselves, so it only changes when the sheet's
+    contents change, not when Excel renumbers the shared string table after
+    another sheet is edited or added. View state such as the selected cell
+    and row layout are ignored. A re-save by a different tool that rewrites
+    every sheet's XML will still cause one full re-parse.
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(_source_bytes(source)))
+    except zipfile.BadZipFile:
+        return None
+
+    with archive:
+        strings = _shared_strings(archive)
+
+        def resolve(match):
+            index = int(match.group(2))
+            text = strings[index] if index < len(strings) else match.group(2)
+            return match.group(1) + text + match.group(3)
+
+        fingerprints = {}
+        for name, path in _sheet_parts(archive).items():
+            xml = archive.read(path)
+            data = _SHEET_DATA.search(xml)
+            content = _SHARED_CELL.sub(resolve, data.group(0) if data else xml)
+            content = _ROW_TAG.sub(rb'<row \1>', content)
+            fingerprints[name] = hashlib.sha256(content).hexdigest()
+        return fingerprints
+
+
+def _apply_transform(result, transform):
+    """Run the caller's per-sheet transform, turning failures into sheet errors"""
+    if result.error is not None or transform is None:
+        return result
+    try:
+        return result._replace(frame=transform(result.frame, result.name))
+    except Exception as e:
+        return result._replace(frame=None, error=str(e))
+
+
+def _prune_partitions(directory):
+    cutoff = time.time() - PARTITION_MAX_AGE_DAYS * 86400
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not name.endswith('.parquet'):
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            # Another process pruned it first
+            continue
+
+
+def read_sheets_incremental(source, namespace, transform=None, sheet_names=None,
+                            max_workers=None, engine=None, cache_dir=None):
+    """
+    Like read_excel_sheets, but each sheet's transformed frame is cached as a
+    partition keyed by the sheet's content fingerprint. Only new or modified
+    sheets are parsed (in parallel when worthwhile); unchanged sheets come
+    straight from their cached partitions and are spliced back in workbook order.
+
+    transform(frame, sheet_name) turns a parsed sheet into the partition to
+    cache. namespace separates callers whose transforms differ.
+
+    Returns (list of SheetResult, total wall-clock seconds).
+    """
+    start = time.perf_counter()
+    source = _source_bytes(source)
+    fingerprints = sheet_fingerprints(source)
+    if fingerprints is None:
+        # Not an .xlsx archive (e.g. legacy .xls): nothing to fingerprint, parse everything
+        results, _ = read_excel_sheets(source, sheet_names, max_workers=max_workers, engine=engine)
+        return [_apply_transform(result, transform) for result in results], time.perf_counter() - start
+
+    if sheet_names is None:
+        sheet_names = list(fingerprints)
+
+    directory = os.path.join(cache_dir or SNAPSHOT_DIR, 'sheets', namespace)
+    os.makedirs(directory, exist_ok=True)
+    # Engines can parse the same cells differently, so each one has its own partitions
+    engine = resolve_engine(engine)
+
+    def partition_path(sheet_name):
+        key = hashlib.sha256(
+            f"{namespace}|{PARTITION_VERSION}|{engine}|{sheet_name}|{fingerprints.get(sheet_name)}".encode()
+        ).hexdigest()
+        return os.path.join(directory, f"{key}.parquet")
+
+    results = {}
+    for sheet_name in sheet_names:
+        path = partition_path(sheet_name)
+        cached_start = time.perf_counter()
+        frame = load_snapshot(path) if sheet_name in fingerprints else None
+        if frame is not None:
+            os.utime(path)
+            results[sheet_name] = SheetResult(sheet_name, frame, time.perf_counter() - cached_start, None, True)
+
+    changed = [sheet_name for sheet_name in sheet_names if sheet_name not in results]
+    if changed:
+        parsed, _ = read_excel_sheets(source, changed, max_workers=max_workers, engine=engine)
+        for result in parsed:
+            result = _apply_transform(result, transform)
+            if result.error is None:
+                save_snapshot(result.frame, partition_path(result.name), prune_stale=False)
+            results[result.name] = result
+
+    _prune_partitions(directory)
+    total_seconds = time.perf_counter() - start
+    logger.info(f"Re-used {len(sheet_names) - len(changed)} cached sheets, parsed {len(changed)} "
+                f"new or changed sheets in {total_seconds:.3f}s")
+    return [results[sheet_name] for sheet_name in sheet_names], total_seconds
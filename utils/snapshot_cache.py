@@ -0,0 +1,238 @@
+import datetime
+import hashlib
+import json
+import logging
+import numbers
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_CACHE_DIR', os.path.join('data', '.snapshots'))
+
+# Parquet key-value metadata entry holding our own bookkeeping
+METADATA_KEY = b'evolution_snapshot'
+
+# Bump when the way frames are stored changes; snapshots in another format are rebuilt
+SNAPSHOT_FORMAT = 3
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_sha256(data):
+    """Return the SHA-256 hex digest of in-memory bytes (e.g. an uploaded file)"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def snapshot_path_for(source_path, pipeline_version, cache_dir=None, digest=None):
+    """
+    Return the snapshot location for a source file's current contents and
+    pipeline version. digest is the file's SHA-256 when the caller already has it.
+    """
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    if digest is None:
+        digest = file_sha256(source_path)
+    filename = f"{stem}.{digest}.v{pipeline_version}.parquet"
+    return os.path.join(cache_dir or SNAPSHOT_DIR, filename)
+
+
+# Object columns that are not plain text (carrier columns hold premiums and notes
+# like 'decl', SEMSEE mixes timestamps and text) are split into typed part columns
+# '<column>__<part>' plus a '<column>__kind' column naming each cell's kind; the
+# kind restores the cell's original Python type on load.
+PART_SEPARATOR = '__'
+MISSING, NONE, INTEGER, BOOLEAN, NUMBER, TEXT, DATETIME, TIMESTAMP, DATE = range(9)
+KIND_PARTS = {INTEGER: 'integer', BOOLEAN: 'integer', NUMBER: 'number', TEXT: 'text',
+              DATETIME: 'datetime', TIMESTAMP: 'datetime', DATE: 'datetime'}
+
+
+def _kind_of_type(cls):
+    if cls is type(None):
+        return NONE
+    if issubclass(cls, (bool, np.bool_)):
+        return BOOLEAN
+    if issubclass(cls, numbers.Integral):
+        return INTEGER
+    if issubclass(cls, numbers.Real):
+        return NUMBER
+    if issubclass(cls, pd.Timestamp):
+        return TIMESTAMP
+    if issubclass(cls, datetime.datetime):
+        return DATETIME
+    if issubclass(cls, datetime.date):
+        return DATE
+    # Text, and any other value kept as its text
+    return TEXT
+
+
+def _split_mixed(values):
+    """(kinds, {part: typed array}) for the cells of a mixed object column"""
+    n = len(values)
+    type_codes, types = pd.factorize(np.fromiter(map(type, values), dtype=object, count=n))
+    kinds = np.array([_kind_of_type(cls) for cls in types], dtype=np.int8)[type_codes]
+    kinds[pd.isna(values) & (kinds != NONE)] = MISSING
+
+    parts = {}
+    at = np.flatnonzero(np.isin(kinds, [INTEGER, BOOLEAN]))
+    if len(at):
+        try:
+            parts['integer'] = np.zeros(n, dtype=np.int64)
+            parts['integer'][at] = np.array(values[at].tolist(), dtype=np.int64)
+        except OverflowError:
+            # Integers beyond int64 are kept as text
+            big = np.array([not -2 ** 63 <= v < 2 ** 63 for v in values[at]])
+            kinds[at[big]] = TEXT
+            at = at[~big]
+            parts['integer'][at] = np.array(values[at].tolist(), dtype=np.int64)
+    at = np.flatnonzero(kinds == NUMBER)
+    if len(at):
+        parts['number'] = np.full(n, np.nan)
+        parts['number'][at] = values[at].astype(np.float64)
+    at = np.flatnonzero(np.isin(kinds, [DATETIME, TIMESTAMP, DATE]))
+    if len(at):
+        try:
+            stamps = pd.to_datetime(pd.Series(values[at], dtype=object), errors='coerce')
+            # Time zones and out-of-range dates don't fit a datetime64[ns] column: keep them as text
+            failed = stamps.isna().to_numpy() if stamps.dt.tz is None else np.ones(len(at), dtype=bool)
+        except (TypeError, ValueError):
+            stamps, failed = None, np.ones(len(at), dtype=bool)
+        kinds[at[failed]] = TEXT
+        if not failed.all():
+            parts['datetime'] = np.full(n, np.datetime64('NaT'), dtype='datetime64[ns]')
+            parts['datetime'][at[~failed]] = stamps.to_numpy()[~failed]
+    at = np.flatnonzero(kinds == TEXT)
+    if len(at):
+        parts['text'] = np.full(n, None, dtype=object)
+        parts['text'][at] = [value if isinstance(value, str) else str(value) for value in values[at]]
+    return kinds, parts
+
+
+def _join_mixed(kinds, parts):
+    """The object column _split_mixed split into kinds and parts"""
+    values = np.full(len(kinds), np.nan, dtype=object)
+    values[kinds == NONE] = None
+    restore = {
+        INTEGER: lambda part: part.tolist(),
+        BOOLEAN: lambda part: part.astype(bool).tolist(),
+        NUMBER: lambda part: part.tolist(),
+        TEXT: lambda part: part,
+        DATETIME: lambda part: pd.DatetimeIndex(part).to_pydatetime(),
+        TIMESTAMP: lambda part: list(pd.DatetimeIndex(part)),
+        DATE: lambda part: pd.DatetimeIndex(part).date,
+    }
+    for kind, part_name in KIND_PARTS.items():
+        at = np.flatnonzero(kinds == kind)
+        if len(at):
+            restored = np.empty(len(at), dtype=object)
+            restored[:] = restore[kind](np.asarray(parts[part_name])[at])
+            values[at] = restored
+    return values
+
+
+def _to_arrow_safe(df):
+    """
+    Prepare a frame for Arrow: mixed object columns are split into typed part
+    columns (see PART_SEPARATOR). Returns the converted frame and {column:
+    part names} of the split columns.
+    """
+    columns = {}
+    split = {}
+    for col in df.columns:
+        series = df[col]
+        if series.dtype != object or pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            columns[col] = series
+            continue
+        kinds, parts = _split_mixed(series.to_numpy())
+        columns[f"{col}{PART_SEPARATOR}kind"] = kinds
+        for part, values in parts.items():
+            columns[f"{col}{PART_SEPARATOR}{part}"] = values
+        split[str(col)] = list(parts)
+    return pd.DataFrame(columns), split
+
+
+def _from_arrow_safe(df, split, column_order):
+    """Rebuild the columns _to_arrow_safe split; missing text becomes NaN"""
+    columns = {}
+    for col in column_order:
+        if col in split:
+            parts = {part: df[f"{col}{PART_SEPARATOR}{part}"].to_numpy() for part in split[col]}
+            columns[col] = _join_mixed(df[f"{col}{PART_SEPARATOR}kind"].to_numpy(), parts)
+            continue
+        series = df[col]
+        if series.dtype != object:
+            columns[col] = series
+        else:
+            # Arrow hands back None for missing text; the pipeline expects NaN like read_csv gives
+            values = series.to_numpy(copy=True)
+            values[pd.isna(values)] = np.nan
+            columns[col] = values
+    return pd.DataFrame(columns, columns=column_order)
+
+
+def load_snapshot(path):
+    """Load a processed snapshot, returning None when it is missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        meta = json.loads((table.schema.metadata or {}).get(METADATA_KEY, b'{}'))
+        if meta.get('format') != SNAPSHOT_FORMAT:
+            logger.info(f"Ignoring snapshot {path} in an older format")
+            return None
+        df = table.to_pandas()
+        df = _from_arrow_safe(df, meta.get('split_columns', {}), meta.get('columns', list(df.columns)))
+        logger.info(f"Loaded snapshot {path}: {len(df)} rows")
+        return df
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {str(e)}")
+        return None
+
+
+def save_snapshot(df, path, prune_stale=True):
+    """Persist a processed frame as Parquet and remove stale snapshots of the same source"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+
+        safe_df, split = _to_arrow_safe(df)
+        table = pa.Table.from_pandas(safe_df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[METADATA_KEY] = json.dumps({'format': SNAPSHOT_FORMAT, 'columns': [str(col) for col in df.columns],
+                                            'split_columns': split}).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        # Write to a temporary file first so concurrent sessions never see a partial snapshot
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved snapshot {path}: {len(df)} rows")
+
+        if prune_stale:
+            # Snapshot names are '<stem>.<sha256>.v<version>.parquet'
+            stem = os.path.basename(path).rsplit('.', 3)[0]
+            for name in os.listdir(directory):
+                stale = os.path.join(directory, name)
+                if name.startswith(f"{stem}.") and name.endswith('.parquet') and stale != path:
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        # Another process pruned it first
+                        pass
+        return True
+    except Exception as e:
+        logger.warning(f"Could not save snapshot {path}: {str(e)}")
+        return False
@@ -0,0 +1,130 @@
+import logging
+import os
+
+import pandas as pd
+
+from utils.bound_carriers import resolve_bound_carriers
+from utils.date_index import sort_by_received
+from utils.lob_normalizer import normalize_lob
+from utils.sheet_cache import read_sheets_incremental
+from utils.snapshot_cache import load_snapshot, save_snapshot, snapshot_path_for
+from utils.submission_schema import categorize_columns, coalesce_aliases, read_submission_csv
+
+logger = logging.getLogger(__name__)
+
+# Version of the process_submissions output format. Bump whenever it changes
+# what it produces so persisted snapshots of the processed frame are rebuilt.
+PIPELINE_VERSION = 6
+
+# Sheet partition namespace shared with the dashboard's Excel loader
+SHEET_NAMESPACE = 'dashboard'
+
+
+def tag_source_sheet(df, sheet_name):
+    """Record which workbook sheet each row came from"""
+    df['Source_Sheet'] = sheet_name
+    return df
+
+
+def process_submissions(df):
+    """Clean a raw submission log into the processed frame every analysis works on"""
+    # Merge per-sheet column variants (APPLICANT, AGENCY, ...) into their canonical columns
+    df = coalesce_aliases(df)
+
+    # Convert date columns to datetime with better error handling
+    date_columns = ['RCVD', 'EFF DATE', 'Effective Date']
+    for col in date_columns:
+        if col in df.columns:
+            # First, ensure the column exists and has data
+            if not df[col].empty:
+                df[col] = pd.to_datetime(df[col], errors='coerce')
+
+                # For records with invalid dates, use the EFF DATE if available. Dates still
+                # missing stay NaT here (the frame is persisted); SubmissionDataset dates them today
+                if col == 'RCVD' and df[col].isna().any():
+                    # If RCVD is missing but EFF DATE exists, use EFF DATE
+                    if 'EFF DATE' in df.columns and not df['EFF DATE'].empty:
+                        mask = df[col].isna() & df['EFF DATE'].notna()
+                        df.loc[mask, col] = df.loc[mask, 'EFF DATE']
+            else:
+                # If column is empty, create with today's date
+                df[col] = pd.Timestamp.now()
+
+    # Standardize LOB values (each distinct spelling is mapped once)
+    df['LOB'] = normalize_lob(df['LOB'])
+
+    # Resolve which carrier each submission was bound with, once per dataset
+    df['bound_carrier'], df['bound_source'] = resolve_bound_carriers(df)
+
+    # Standardize WC Class Code columns
+    wc_code_columns = ['WC Class Code', 'Workers Comp Class Code', 'Work Comp Class']
+    df['WC_Class_Code'] = None
+    for col in wc_code_columns:
+        if col in df.columns:
+            mask = df['WC_Class_Code'].isnull() & df[col].notna()
+            df.loc[mask, 'WC_Class_Code'] = df.loc[mask, col]
+
+    # Clean up WC_Class_Code ('8834.0' and 8834 are the same code)
+    df['WC_Class_Code'] = (df['WC_Class_Code'].fillna('Unknown').astype(str).str.strip()
+                           .str.replace(r'\.0$', '', regex=True))
+
+    # Add month-year column for trending
+    try:
+        if 'RCVD' in df.columns and not df['RCVD'].empty:
+            # Ensure RCVD is datetime before using .dt accessor
+            df['RCVD'] = pd.to_datetime(df['RCVD'], errors='coerce')
+            df['Month_Year'] = df['RCVD'].dt.to_period('M')
+        else:
+            df['Month_Year'] = pd.Period.now('M')
+    except Exception as e:
+        # Fallback: create Month_Year with current month
+        df['Month_Year'] = pd.Period.now('M')
+
+    # Low-cardinality text columns are stored as categoricals
+    df = categorize_columns(df)
+
+    # Rows are kept in RCVD order with a day-number column, so a date range is a row slice
+    df = sort_by_received(df)
+
+    return df
+
+
+def read_submission_workbook(source):
+    """All sheets of a submission workbook combined into one raw frame (None when no sheet loads)"""
+    sheet_results, total_seconds = read_sheets_incremental(source, SHEET_NAMESPACE, tag_source_sheet)
+    frames = []
+    for result in sheet_results:
+        if result.error is not None:
+            logger.warning(f"Skipping sheet {result.name}: {result.error}")
+            continue
+        frames.append(result.frame)
+    if not frames:
+        return None
+    logger.info(f"Read {len(frames)} sheets in {total_seconds:.2f}s")
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_submission_file(file_path):
+    """Raw submission log from a CSV export or an Excel workbook"""
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        return read_submission_csv(file_path)
+    return read_submission_workbook(file_path)
+
+
+def load_processed_file(file_path, loader=read_submission_file, process=process_submissions, digest=None):
+    """
+    Load and process a local data file, reusing the processed snapshot when the
+    file is unchanged. digest is the file's SHA-256 if already computed.
+    """
+    snapshot_path = snapshot_path_for(file_path, PIPELINE_VERSION, digest=digest)
+    df = load_snapshot(snapshot_path)
+    if df is not None:
+        return df
+
+    raw_df = loader(file_path)
+    if raw_df is None:
+        return None
+    df = process(raw_df)
+    if df is not None:
+        save_snapshot(df, snapshot_path)
+    return df
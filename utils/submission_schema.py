@@ -0,0 +1,140 @@
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Dates in the combined submission log are written by pandas as '2025-01-15 00:00:00'.
+# Other writers are handled by parse_date_column's fallbacks.
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_COLUMNS = ['RCVD', 'EFF DATE']
+
+# Share of non-blank dates in a column that may still fail to parse before a warning is logged
+DATE_FAILURE_WARN_SHARE = 0.05
+
+CARRIER_COLUMNS = [
+    'AmTrust', 'Atlas', 'Attune', 'Bristol West', 'Chubb', 'CNA', 'Employers', 'Guard',
+    'Hanover', 'Hartford', 'Hourly', 'ICW', 'KBIC', 'Kemper', 'Liberty Mutual',
+    'Markel', 'Nationwide', 'Philadelphia', 'Preferred', 'Stillwater', 'Travelers', 'UFG', 'Other'
+]
+
+# Declared dtypes for the columns kept from the CSV. Dates are read as text and
+# parsed once (DATE_FORMAT first). Carrier columns are not listed: they mix premiums
+# with responses like 'decl', and an all-numeric carrier column must stay numeric
+# so its premiums still count as quotes.
+COLUMN_DTYPES = {
+    'Applicant': str,
+    'Member': str,
+    'RCVD': str,
+    'EFF DATE': str,
+    'LOB': str,
+    'SEMSEE': str,
+    'Quoted/Bound $': str,
+    'Policy Number': str,
+    'NOTES': str,
+    'Desc of Ops': str,
+    'WC Class Code': str,
+    'Source_Sheet': str,
+    'Bound With': str,
+}
+
+# Sheets of the master log name some columns differently. Each alias is merged
+# into its canonical column (filling only blanks) and then dropped.
+COLUMN_ALIASES = {
+    'Applicant': ['APPLICANT', 'N'],
+    'Member': ['AGENCY'],
+    'EFF DATE': ['Effective Date'],
+    'Bound With': ['Bound With Carrier'],
+    'Desc of Ops': ['Description of Operations'],
+    'WC Class Code': ['Workers Comp Class Code', 'Work Comp Class'],
+}
+
+# Low-cardinality columns stored as pandas categoricals once processing is done
+CATEGORICAL_COLUMNS = ['LOB', 'Member', 'Source_Sheet', 'WC_Class_Code']
+
+
+def wanted_columns():
+    """Every column the loader keeps from the CSV, aliases included"""
+    columns = set(COLUMN_DTYPES) | set(CARRIER_COLUMNS)
+    for aliases in COLUMN_ALIASES.values():
+        columns.update(aliases)
+    return columns
+
+
+def read_dtypes():
+    """read_csv dtypes for the declared columns and their aliases"""
+    dtypes = dict(COLUMN_DTYPES)
+    for target, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            dtypes[alias] = COLUMN_DTYPES[target]
+    return dtypes
+
+
+def coalesce_aliases(df):
+    """Merge alias columns into their canonical column and drop them"""
+    merged = []
+    for target, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias not in df.columns:
+                continue
+            if target in df.columns:
+                df[target] = df[target].where(df[target].notna(), df[alias])
+            else:
+                df[target] = df[alias]
+            merged.append(alias)
+    return df.drop(columns=merged) if merged else df
+
+
+def parse_date_column(values, name='date'):
+    """
+    Parse one text date column: DATE_FORMAT first, then ISO 8601 for values it
+    misses ('2025-07-01 00:00:00.000000000', '2025-07-01'), then per-value
+    inference ('1/15/2025'). Unparseable values become NaT, with a warning when
+    more than DATE_FAILURE_WARN_SHARE of the non-blank values fail.
+    """
+    parsed = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+    for fallback in ('ISO8601', 'mixed'):
+        missed = parsed.isna() & values.notna()
+        if not missed.any():
+            break
+        parsed[missed] = pd.to_datetime(values[missed], format=fallback, errors='coerce')
+    failed = int((parsed.isna() & values.notna()).sum())
+    present = int(values.notna().sum())
+    if failed and failed > DATE_FAILURE_WARN_SHARE * present:
+        logger.warning(f"{failed} of {present} {name} values could not be parsed as dates")
+    return parsed
+
+
+def parse_dates(df):
+    """Parse the date columns that are still text (see parse_date_column)"""
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = parse_date_column(df[col], col)
+    return df
+
+
+def categorize_columns(df, columns=None):
+    """Store the given columns (default CATEGORICAL_COLUMNS) as categoricals with text categories"""
+    for col in columns or CATEGORICAL_COLUMNS:
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        values = df[col]
+        # Excel sheets can hold numbers in these columns; mixed categories can't be persisted
+        df[col] = values.where(values.isna(), values.astype(str)).astype('category')
+    return df
+
+
+def read_submission_csv(source):
+    """
+    Read the combined submission log using the declared schema: only known
+    columns are parsed, aliases are merged, dates are parsed once and Member,
+    Source_Sheet and the raw LOB spellings are categoricals (process_data
+    standardizes LOB and categorizes WC_Class_Code).
+    """
+    columns = wanted_columns()
+    df = pd.read_csv(source, usecols=lambda col: col in columns, dtype=read_dtypes())
+    df = coalesce_aliases(df)
+    df = parse_dates(df)
+    df = categorize_columns(df, ['LOB', 'Member', 'Source_Sheet'])
+    logger.info(f"Read {len(df)} rows x {len(df.columns)} columns from the submission log")
+    return df
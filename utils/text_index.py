@@ -0,0 +1,146 @@
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from utils.wildcard import compile_wildcard
+
+# Text columns searched by the Quick Business Search (missing ones are skipped)
+SEARCH_COLUMNS = [
+    'Desc of Ops', 'Description of Operations', 'Applicant',
+    'Description', 'Business Description', 'NOTES', 'Notes',
+    'Comments', 'Business Type'
+]
+
+# Postings key holding the union of every indexed column
+ALL_FIELDS = '*'
+
+_TOKEN = re.compile(r'\w+')
+_QUERY_TERM = re.compile(r'[\w*]+')
+# Sorts after every character, so [prefix, prefix + _MAX_CHAR) spans all terms starting with prefix
+_MAX_CHAR = '\U0010ffff'
+
+
+def tokenize(text):
+    """Distinct lower-case word tokens of a cell value"""
+    if text is None or (isinstance(text, float) and np.isnan(text)):
+        return []
+    return list(dict.fromkeys(_TOKEN.findall(str(text).casefold())))
+
+
+def query_terms(query):
+    """Lower-case search terms of a query; '*' is kept as a wildcard"""
+    return [term for term in _QUERY_TERM.findall(query.casefold()) if term.strip('*')]
+
+
+def _pair_keys(codes, tokens, term_ids, n_rows):
+    """
+    Encode every (term, row) pair of one column as term_id * n_rows + row,
+    sorted and de-duplicated. codes are factorize codes of the column and
+    tokens the token list of each distinct value.
+    """
+    lens = np.array([len(value_tokens) for value_tokens in tokens] + [0], dtype=np.int64)
+    flat = np.array([term_ids[token] for value_tokens in tokens for token in value_tokens], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(lens)[:-1]])
+    # Missing cells have code -1, which picks the trailing zero-length entry
+    row_lens = lens[codes]
+    total = int(row_lens.sum())
+    rows = np.repeat(np.arange(n_rows, dtype=np.int64), row_lens)
+    within = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(row_lens) - row_lens, row_lens)
+    term_of_pair = flat[np.repeat(starts[codes], row_lens) + within]
+    return np.unique(term_of_pair * n_rows + rows)
+
+
+def _to_postings(keys, n_terms, n_rows):
+    """Split sorted pair keys into (offsets, rows): term i's rows are rows[offsets[i]:offsets[i + 1]]"""
+    term_of_pair = keys // max(n_rows, 1)
+    offsets = np.searchsorted(term_of_pair, np.arange(n_terms + 1))
+    return offsets, (keys % max(n_rows, 1)).astype(np.int32)
+
+
+class TextIndex:
+    """
+    Inverted index over the searchable text columns, built once per dataset.
+
+    terms is the sorted vocabulary shared by all columns, so every term
+    starting with a prefix is one contiguous range found by binary search.
+    postings maps each column (and ALL_FIELDS) to (offsets, rows), with each
+    term's row ids sorted. Row ids are positions in the dataset.
+    """
+
+    def __init__(self, terms, postings, n_rows):
+        self.terms = terms
+        self.postings = postings
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        columns = [col for col in (columns or SEARCH_COLUMNS) if col in df.columns]
+        n_rows = len(df)
+
+        # Tokenize each distinct value once
+        per_column = {}
+        vocabulary = set()
+        for col in columns:
+            codes, uniques = pd.factorize(df[col].to_numpy(), use_na_sentinel=True)
+            tokens = [tokenize(value) for value in uniques]
+            for value_tokens in tokens:
+                vocabulary.update(value_tokens)
+            per_column[col] = (codes, tokens)
+
+        terms = sorted(vocabulary)
+        term_ids = {term: i for i, term in enumerate(terms)}
+        postings = {}
+        all_keys = []
+        for col, (codes, tokens) in per_column.items():
+            keys = _pair_keys(codes, tokens, term_ids, n_rows)
+            postings[col] = _to_postings(keys, len(terms), n_rows)
+            all_keys.append(keys)
+        combined = np.unique(np.concatenate(all_keys)) if all_keys else np.empty(0, dtype=np.int64)
+        postings[ALL_FIELDS] = _to_postings(combined, len(terms), n_rows)
+        return cls(terms, postings, n_rows)
+
+    @property
+    def fields(self):
+        return [field for field in self.postings if field != ALL_FIELDS]
+
+    @property
+    def nbytes(self):
+        return sum(offsets.nbytes + rows.nbytes for offsets, rows in self.postings.values())
+
+    def prefix_range(self, prefix):
+        """(lo, hi) term positions of every term starting with prefix"""
+        return bisect_left(self.terms, prefix), bisect_left(self.terms, prefix + _MAX_CHAR)
+
+    def rows_for_terms(self, term_positions, field=ALL_FIELDS):
+        """Sorted unique row ids containing any of the terms at these positions"""
+        offsets, rows = self.postings[field]
+        parts = [rows[offsets[i]:offsets[i + 1]] for i in term_positions]
+        if not parts:
+            return np.empty(0, dtype=np.int32)
+        if len(parts) == 1:
+            return parts[0]
+        return np.unique(np.concatenate(parts))
+
+    def rows_for_prefix(self, prefix, field=ALL_FIELDS):
+        """Sorted unique row ids with a term starting with prefix"""
+        lo, hi = self.prefix_range(prefix)
+        offsets, rows = self.postings[field]
+        if hi - lo == 1:
+            return rows[offsets[lo]:offsets[hi]]
+        # The range's postings are contiguous: one slice, then de-duplicate
+        return np.unique(rows[offsets[lo]:offsets[hi]])
+
+    def match_term(self, term, field=ALL_FIELDS):
+        """
+        Row ids for one search term. Terms match words by prefix ('plumb' and
+        'plumb*' both match 'plumbing'); a '*' elsewhere is a wildcard checked
+        against the vocabulary ('*plumb' matches 'replumbing').
+        """
+        pattern = compile_wildcard(term.rstrip('*'))
+        if not pattern.has_wildcard:
+            return self.rows_for_prefix(pattern.prefix, field)
+        lo, hi = self.prefix_range(pattern.prefix)
+        positions = [i for i in range(lo, hi) if pattern.match_prefix(self.terms[i])]
+        return self.rows_for_terms(positions, field)
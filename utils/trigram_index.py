@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from utils.text_index import query_terms
+
+# Columns whose words are matched by fuzzy search
+FUZZY_COLUMNS = [
+    'Desc of Ops', 'Description of Operations', 'Applicant',
+    'Description', 'Business Description', 'Business Type'
+]
+
+# Minimum Dice similarity between a query word and an indexed word
+DEFAULT_THRESHOLD = 0.4
+DEFAULT_TOP_K = 200
+
+
+def trigrams(word):
+    """Distinct character trigrams of a word, padded so short words and word edges count"""
+    padded = f"  {word} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class TrigramIndex:
+    """
+    Character-trigram index over the words of a TextIndex, used for typo-tolerant
+    search ('plumbng' -> 'plumbing'). It indexes the vocabulary rather than the
+    rows, so its size follows the number of distinct words, not submissions.
+
+    Candidate words come from the posting lists of the query word's trigrams;
+    only those are scored, by Dice similarity of the trigram sets. Matching
+    words are then turned into rows through the text index.
+    """
+
+    def __init__(self, text_index, term_positions, term_sizes, gram_offsets, gram_terms, grams, fields):
+        self.text_index = text_index
+        self.term_positions = term_positions
+        self.term_sizes = term_sizes
+        self.gram_offsets = gram_offsets
+        self.gram_terms = gram_terms
+        self.grams = grams
+        self.fields = fields
+
+    @classmethod
+    def from_text_index(cls, text_index, columns=None):
+        fields = [col for col in (columns or FUZZY_COLUMNS) if col in text_index.postings]
+        # Words that occur in at least one of the fuzzy columns
+        in_fields = np.zeros(len(text_index.terms), dtype=bool)
+        for field in fields:
+            offsets, _ = text_index.postings[field]
+            in_fields |= np.diff(offsets) > 0
+        term_positions = np.flatnonzero(in_fields)
+
+        word_grams = [trigrams(text_index.terms[i]) for i in term_positions]
+        term_sizes = np.array([len(word) for word in word_grams], dtype=np.int32)
+        flat = [gram for word in word_grams for gram in word]
+        gram_codes, grams = pd.factorize(pd.Series(flat, dtype=object), sort=True)
+        local_terms = np.repeat(np.arange(len(term_positions), dtype=np.int32), term_sizes)
+        # Group term ids by trigram; the stable sort keeps each posting list sorted
+        order = np.argsort(gram_codes, kind='stable')
+        gram_terms = local_terms[order]
+        gram_offsets = np.concatenate([[0], np.cumsum(np.bincount(gram_codes, minlength=len(grams)))])
+        return cls(text_index, term_positions, term_sizes, gram_offsets, gram_terms,
+                   {gram: i for i, gram in enumerate(grams)}, fields)
+
+    @property
+    def nbytes(self):
+        return (self.term_positions.nbytes + self.term_sizes.nbytes
+                + self.gram_offsets.nbytes + self.gram_terms.nbytes)
+
+    def similar_terms(self, word, threshold=DEFAULT_THRESHOLD):
+        """(text index term positions, similarity) of indexed words similar to word, best first"""
+        query_grams = [self.grams[gram] for gram in trigrams(word) if gram in self.grams]
+        if not query_grams:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates = np.concatenate([self.gram_terms[self.gram_offsets[g]:self.gram_offsets[g + 1]]
+                                     for g in query_grams])
+        terms, shared = np.unique(candidates, return_counts=True)
+        scores = 2 * shared / (len(trigrams(word)) + self.term_sizes[terms])
+        keep = scores >= threshold
+        order = np.argsort(-scores[keep], kind='stable')
+        return self.term_positions[terms[keep][order]], scores[keep][order]
+
+    def _word_rows(self, word, threshold):
+        """(rows, score) for one query word: each row scores its best-matching word"""
+        positions, scores = self.similar_terms(word, threshold)
+        row_parts, score_parts = [], []
+        for position, score in zip(positions, scores):
+            rows = np.unique(np.concatenate([self.text_index.rows_for_terms([position], field)
+                                             for field in self.fields]))
+            row_parts.append(rows)
+            score_parts.append(np.full(len(rows), score))
+        if not row_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows = np.concatenate(row_parts)
+        scores = np.concatenate(score_parts)
+        # Terms arrive best first, so the first occurrence of a row carries its best score
+        rows, first = np.unique(rows, return_index=True)
+        return rows, scores[first]
+
+    def search(self, query, threshold=DEFAULT_THRESHOLD, top_k=DEFAULT_TOP_K, row_mask=None):
+        """
+        Rows similar to every word of the query, ranked by mean word similarity.
+        row_mask (a boolean array over all rows) restricts the rows before the
+        top_k cut. Returns (rows, scores), best first.
+        """
+        rows, total = None, None
+        words = [term.replace('*', '') for term in query_terms(query)]
+        for word in words:
+            word_rows, word_scores = self._word_rows(word, threshold)
+            if rows is None:
+                rows, total = word_rows, word_scores
+            else:
+                rows, left, right = np.intersect1d(rows, word_rows, assume_unique=True, return_indices=True)
+                total = total[left] + word_scores[right]
+            if len(rows) == 0:
+                break
+        if rows is None or len(rows) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if row_mask is not None:
+            keep = row_mask[rows]
+            rows, total = rows[keep], total[keep]
+        scores = total / len(words)
+        # Best score first; ties keep dataset order
+        order = np.lexsort((rows, -scores))[:top_k]
+        return rows[order], scores[order]
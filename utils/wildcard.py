@@ -0,0 +1,63 @@
+import re
+
+from utils.lru_cache import LRUCache
+
+# Compiled patterns kept for reuse across queries and sessions
+PATTERN_CACHE_ENTRIES = 4096
+
+_STARS = re.compile(r'\*+')
+
+_pattern_cache = LRUCache(max_entries=PATTERN_CACHE_ENTRIES)
+
+
+class WildcardPattern:
+    """
+    A user pattern in which '*' matches any run of characters and every other
+    character is literal. Matching scans the literal pieces left to right with
+    str.find, so its cost is linear in the text whatever the input: no regex
+    is built from user text and nothing can backtrack.
+    """
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.pieces = _STARS.sub('*', pattern).split('*')
+
+    @property
+    def prefix(self):
+        """Literal text every match starts with"""
+        return self.pieces[0]
+
+    @property
+    def has_wildcard(self):
+        return len(self.pieces) > 1
+
+    def _find_in_order(self, pieces, text, start, end):
+        """True if pieces occur in text[start:end] in order without overlapping"""
+        for piece in pieces:
+            found = text.find(piece, start, end)
+            if found < 0:
+                return False
+            start = found + len(piece)
+        return True
+
+    def match_prefix(self, text):
+        """True if the pattern matches the start of text ('plumb' matches 'plumbing')"""
+        return (text.startswith(self.pieces[0])
+                and self._find_in_order(self.pieces[1:], text, len(self.pieces[0]), len(text)))
+
+    def fullmatch(self, text):
+        """True if the pattern matches all of text"""
+        if len(self.pieces) == 1:
+            return text == self.pieces[0]
+        first, last = self.pieces[0], self.pieces[-1]
+        if len(text) < len(first) + len(last) or not text.startswith(first) or not text.endswith(last):
+            return False
+        return self._find_in_order(self.pieces[1:-1], text, len(first), len(text) - len(last))
+
+
+def compile_wildcard(pattern):
+    """The WildcardPattern for pattern, shared through an LRU cache"""
+    compiled = _pattern_cache.get(pattern)
+    if compiled is None:
+        compiled = _pattern_cache.setdefault(pattern, WildcardPattern(pattern))
+    return compiled